@@ -0,0 +1,55 @@
+"""
+Measures the time it takes to import the package in a new interpreter, and which of the heavy or hardware
+modules each step loads.
+
+Usage: python benchmarks/import_bench.py [repetitions]
+"""
+import os
+import subprocess
+import sys
+
+# The interpreters run in the checkout, so they import its package without installing it
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+STEPS = [
+    ("import raspberrypi_epd", "import raspberrypi_epd"),
+    ("+ DisplayBuffer", "import raspberrypi_epd; raspberrypi_epd.DisplayBuffer"),
+    ("+ Render", "import raspberrypi_epd, numpy; raspberrypi_epd.Render(8, 1, numpy.zeros(1, numpy.uint8)).render()"),
+    ("+ WeAct213", "import raspberrypi_epd; raspberrypi_epd.WeAct213"),
+    ("import *", "from raspberrypi_epd import *"),
+]
+WATCHED = ("numpy", "PIL", "bdfparser", "asyncio", "spidev", "RPi")
+PROBE = """
+import sys, time
+start = time.perf_counter()
+{code}
+elapsed = time.perf_counter() - start
+print(elapsed, ','.join(name for name in {watched!r} if name in sys.modules))
+"""
+
+
+def measure(code: str, repetitions: int):
+    """
+    Runs the code in new interpreters and keeps the fastest run
+    :param code: The statements to time
+    :param repetitions: Number of interpreters to start
+    :return: The best time in seconds and the watched modules that were loaded
+    """
+    best, loaded = None, ""
+    for _ in range(repetitions):
+        output = subprocess.run([sys.executable, "-c", PROBE.format(code=code, watched=WATCHED)],
+                                capture_output=True, text=True, check=True, cwd=ROOT).stdout.split()
+        elapsed = float(output[0])
+        loaded = output[1] if len(output) > 1 else ""
+        best = elapsed if best is None else min(best, elapsed)
+    return best, loaded
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    for name, code in STEPS:
+        elapsed, loaded = measure(code, repetitions)
+        print(f"{name:>24}: {elapsed * 1e3:8.1f} ms  loads: {loaded or '-'}")
+
+
+if __name__ == "__main__":
+    main()
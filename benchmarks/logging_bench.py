@@ -0,0 +1,120 @@
+"""
+Measures what the debug logging of the driver costs in the per-frame paths. Each path is timed:
+- as it was before the messages were guarded: the debug messages are formatted eagerly even with DEBUG off
+- as it is now with DEBUG off, when the messages aren't formatted
+- as it is now with DEBUG on, when they are formatted and handled (by a handler that drops them)
+
+The eager paths run the steps of each path with the messages the driver used to format, where a path is a single
+call they format its messages and then make the call (whose guards cost a level check each).
+
+Usage: python benchmarks/logging_bench.py [repetitions]
+"""
+import logging
+import os
+import sys
+import timeit
+# Import the package of this checkout, so the benchmarks run without installing it
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+import raspberrypi_epd.commands as cmd
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.simulator import SSD1680Simulator
+
+
+def legacy_write_buffer(display: WeAct213):
+    """
+    write_buffer with the messages it formatted before they were guarded
+    :param display: The display
+    :return: None
+    """
+    bw_buffer_bytes, red_buffer_bytes = display.canvas.serialize_planes()
+    logging.debug(red_buffer_bytes)
+    display.canvas.clear_dirty()
+    display.write_planes(bw_buffer_bytes, red_buffer_bytes, force=True)
+    logging.debug(f"Display was busy for {display.last_busy_time:.1f} ms")
+
+
+def legacy_fill(display: WeAct213, color: Color):
+    """
+    fill with the messages it formatted before they were guarded
+    :param display: The display
+    :param color: The Color to paint the screen
+    :return: None
+    """
+    logging.debug(f"Filling the screen with {color.name}")
+    display.canvas.clear_screen(color.value)
+    logging.debug(f"Sampling B&W RAM (0,0): 0x{display.canvas.get_pixel_byte(0, 0).tobytes().hex()}")
+    legacy_write_buffer(display)
+
+
+def legacy_write_command(display: WeAct213, command):
+    """
+    _write_command with the message it formatted before it was guarded
+    :param display: The display
+    :param command: The command byte
+    :return: None
+    """
+    logging.debug(f"Sending command: 0x{command.tobytes().hex()}")
+    display._write_command(command)
+
+
+def legacy_serialize_area(buffer, x: int, y: int, width: int, height: int):
+    """
+    serialize_area with the messages it formatted before they were guarded
+    :return np.array: The bytes of the area
+    """
+    slice_start, _, _ = buffer._get_slice(x, y)
+    _, slice_end, _ = buffer._get_slice(x + width, y + height)
+    logging.debug(f"Serializing the area ({x}, {y}, {width}, {height}) at [{slice_start}:{slice_end}]")
+    logging.debug(f"Expecting {int((slice_end - slice_start) / 8)} bytes")
+    return buffer.serialize_area(x, y, width, height)
+
+
+def cases():
+    """
+    Cases of the paths that log, each one as it was and as it is now
+    :return list: (name, eager function, current function)
+    """
+    display = WeAct213(transport=SSD1680Simulator())
+    display.init()
+    colors = [Color.WHITE, Color.BLACK]
+
+    def fill():
+        colors.reverse()
+        display.fill(colors[0])
+
+    def eager_fill():
+        colors.reverse()
+        legacy_fill(display, colors[0])
+
+    return [
+        ("fill", eager_fill, fill),
+        ("write_buffer", lambda: legacy_write_buffer(display), lambda: display.write_buffer(force=True)),
+        ("_write_command", lambda: legacy_write_command(display, cmd.NOP), lambda: display._write_command(cmd.NOP)),
+        ("serialize_area", lambda: legacy_serialize_area(display.canvas, 8, 16, 64, 100),
+         lambda: display.canvas.serialize_area(8, 16, 64, 100)),
+    ]
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    root = logging.getLogger()
+    root.addHandler(logging.NullHandler())
+
+    def best(function):
+        return min(timeit.repeat(function, number=repetitions, repeat=5)) / repetitions
+
+    timings = {}
+    root.setLevel(logging.WARNING)
+    for name, eager, current in cases():
+        timings[name] = [best(eager), best(current)]
+    root.setLevel(logging.DEBUG)
+    for name, eager, current in cases():
+        timings[name].append(best(current))
+    print(f"{'':>16}  {'eager, off':>12}  {'guarded, off':>12}  {'DEBUG on':>12}")
+    for name, (eager, off, on) in timings.items():
+        print(f"{name:>16}: {eager * 1e6:9.1f} us  {off * 1e6:9.1f} us ({off / eager:4.2f}x)  {on * 1e6:9.1f} us")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Benchmarks of the hot paths of the buffer, the local render and the driver. Each case reports its time per
+operation, operations per second and (when it moves data) bytes per second. The results can be saved as a
+baseline, and compared against one to catch regressions.
+
+The driver cases run against SSD1680Simulator, so they measure the host side of a frame (serialization,
+command building and the transport calls) without the SPI wire time or the refresh of the panel.
+
+Usage: python benchmarks/run.py [-k filter] [--save baseline.json] [--compare baseline.json] [--tolerance 0.25]
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import timeit
+import numpy as np
+# Import the package of this checkout, so the benchmarks run without installing it
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+from raspberrypi_epd.buffer import DisplayBuffer, TriColorBuffer
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.fonts import load_font
+from raspberrypi_epd.localrender import Render
+from raspberrypi_epd.simulator import SSD1680Simulator
+
+WIDTH = 128
+HEIGHT = 250
+FRAME_BYTES = WIDTH * HEIGHT // 8
+FONT = os.path.join(ROOT, "fonts", "helvB14.bdf")
+
+
+def buffer_cases(packed: bool):
+    """
+    Cases of the drawing and serialization of a DisplayBuffer
+    :param packed: Use a packed buffer
+    :return list: (name, function, bytes per operation)
+    """
+    kind = "packed" if packed else "unpacked"
+    buffer = DisplayBuffer(WIDTH, HEIGHT, packed=packed)
+    buffer.clear_screen(1)
+    bitmap = np.random.default_rng(0).integers(0, 256, 72 * 72 // 8, dtype=np.uint8)
+    font = load_font(FONT)
+    xs = np.arange(0, 5000) % WIDTH
+    ys = np.arange(0, 5000) % HEIGHT
+    return [
+        (f"{kind}.draw_pixel", lambda: buffer.draw_pixel(60, 100, 0), 0),
+        (f"{kind}.draw_points[5000]", lambda: buffer.draw_points(xs, ys, 0), 0),
+        (f"{kind}.draw_line", lambda: buffer.draw_line(3, 7, 120, 240, 0), 0),
+        (f"{kind}.draw_circle", lambda: buffer.draw_circle(64, 125, 50, 0), 0),
+        (f"{kind}.fill_rectangle", lambda: buffer.fill_rectangle(10, 10, 100, 200, 0), 0),
+        (f"{kind}.draw_bitmap[72x72]", lambda: buffer.draw_bitmap(bitmap, 27, 35, 72, 72, 0), 0),
+        (f"{kind}.draw_text", lambda: buffer.draw_text("Raspberry Pi", font, 4, 100, 0), 0),
+        (f"{kind}.serialize", buffer.serialize, FRAME_BYTES),
+        (f"{kind}.serialize_area", lambda: buffer.serialize_area(8, 16, 64, 100), 64 * 100 // 8),
+    ]
+
+
+def tricolor_cases():
+    buffer = TriColorBuffer(WIDTH, HEIGHT)
+    buffer.draw_circle(64, 125, 50, TriColorBuffer.RED)
+    buffer.draw_line(0, 0, 127, 249, TriColorBuffer.BLACK)
+    return [("tricolor.serialize_planes", buffer.serialize_planes, 2 * FRAME_BYTES)]
+
+
+def render_cases():
+    planes = TriColorBuffer(WIDTH, HEIGHT).serialize_planes()
+    mono = Render(WIDTH, HEIGHT, planes[0])
+    color = Render(WIDTH, HEIGHT, planes[0], red=planes[1])
+    return [
+        ("render.mono", mono.render, FRAME_BYTES),
+        ("render.tricolor", color.render, 2 * FRAME_BYTES),
+    ]
+
+
+def driver_frame(partial: bool):
+    """
+    Builds a frame of WeAct213 against the simulator, alternating two images
+    :param partial: Partial frame (a small area and write_dirty) instead of a complete write_buffer
+    :return tuple: The frame function and the bytes it sends
+    """
+    simulator = SSD1680Simulator()
+    display = WeAct213(transport=simulator)
+    display.init()
+    if partial:
+        display.write_buffer(force=True)
+        display.init_partial()
+    frames = [0]
+
+    def frame():
+        frames[0] += 1
+        color = Color.BLACK if frames[0] % 2 else Color.WHITE
+        if partial:
+            display.fill_rectangle(8, 8, 32, 24, color)
+            display.write_dirty()
+        else:
+            display.draw_rectangle(2, 2, 120, 240, color)
+            display.fill_circle(64, 125, 30, Color.RED)
+            display.write_buffer(force=True)
+
+    frame()
+    written = simulator.bytes_written
+    frame()
+    return frame, simulator.bytes_written - written
+
+
+def driver_cases():
+    full_frame, full_bytes = driver_frame(partial=False)
+    partial_frame, partial_bytes = driver_frame(partial=True)
+    return [
+        ("driver.full_frame", full_frame, full_bytes),
+        ("driver.partial_frame", partial_frame, partial_bytes),
+    ]
+
+
+def all_cases():
+    return buffer_cases(False) + buffer_cases(True) + tricolor_cases() + render_cases() + driver_cases()
+
+
+def measure(function, repeat: int = 5, min_time: float = 0.2):
+    """
+    Times a function, running it enough times for each measurement to take at least min_time
+    :param function: The function to time
+    :param repeat: Number of measurements, the fastest one is kept
+    :param min_time: Minimum time of each measurement in seconds
+    :return float: Seconds per call
+    """
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time / 10:
+        number *= 10
+    number = max(1, int(number * min_time / max(timer.timeit(number), 1e-9)))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def run(cases, repeat: int, min_time: float):
+    """
+    Runs the cases and prints their results
+    :return dict: The results by case name, with the seconds per operation and bytes per operation
+    """
+    results = {}
+    for name, function, size in cases:
+        elapsed = measure(function, repeat, min_time)
+        results[name] = {"seconds": elapsed, "bytes": size}
+        throughput = f"{size / elapsed / 1e6:10.2f} MB/s" if size else ""
+        print(f"{name:>32}: {elapsed * 1e6:12.2f} us/op {1 / elapsed:12.0f} ops/s {throughput}")
+    return results
+
+
+def compare(results: dict, baseline: dict, tolerance: float):
+    """
+    Compares results against a baseline
+    :param tolerance: Allowed slowdown as a fraction (0.25 is 25% slower)
+    :return list: Names of the cases that regressed
+    """
+    regressions = []
+    print(f"\nCompared to the baseline ({baseline.get('python', '?')} on {baseline.get('machine', '?')}):")
+    for name, result in results.items():
+        reference = baseline["results"].get(name)
+        if reference is None:
+            print(f"{name:>32}: new")
+            continue
+        ratio = result["seconds"] / reference["seconds"]
+        regressed = ratio > 1 + tolerance
+        if regressed:
+            regressions.append(name)
+        print(f"{name:>32}: {ratio:6.2f}x time {'REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks of the buffer, render and driver hot paths")
+    parser.add_argument("-k", "--filter", default="", help="Only run the cases whose name contains this text")
+    parser.add_argument("--repeat", type=int, default=5, help="Measurements per case, the fastest is kept")
+    parser.add_argument("--min-time", type=float, default=0.2, help="Minimum seconds of each measurement")
+    parser.add_argument("--save", help="Write the results as a baseline JSON file")
+    parser.add_argument("--compare", help="Baseline JSON file to compare the results against")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown against the baseline")
+    arguments = parser.parse_args()
+    cases = [case for case in all_cases() if arguments.filter in case[0]]
+    results = run(cases, arguments.repeat, arguments.min_time)
+    if arguments.save:
+        with open(arguments.save, "w") as file:
+            json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                      file, indent=2)
+    if arguments.compare:
+        with open(arguments.compare) as file:
+            regressions = compare(results, json.load(file), arguments.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} cases regressed: {', '.join(regressions)}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Measures the time it takes to serialize a full 128x250 frame, comparing the per byte Python loop
+that DisplayBuffer.serialize used to run against the current vectorized implementation.
+
+Usage: python benchmarks/serialize_bench.py [repetitions]
+"""
+import os
+import sys
+import timeit
+import numpy as np
+# Import the package of this checkout, so the benchmarks run without installing it
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+from raspberrypi_epd.buffer import DisplayBuffer
+
+WIDTH = 128
+HEIGHT = 250
+
+
+def legacy_serialize(buffer: DisplayBuffer):
+    """
+    Per byte serialization, as it was done before using np.packbits
+    :param buffer: An unpacked DisplayBuffer
+    :return: The buffer as an array of bytes
+    """
+    bytelist = []
+    for byte in range(int(buffer.WIDTH * buffer.HEIGHT / 8)):
+        start = byte * 8
+        byte_nbr = DisplayBuffer.create_byte_from_array(buffer._buffer[start : start + 8])
+        bytelist.append(np.uint8(byte_nbr))
+    return np.array(bytelist, dtype=np.uint8)
+
+
+def sample_buffer(packed=False):
+    buffer = DisplayBuffer(WIDTH, HEIGHT, packed=packed)
+    buffer.clear_screen(1)
+    buffer.draw_rectangle(2, 2, 120, 240, 0)
+    buffer.draw_circle(64, 125, 50, 0)
+    buffer.draw_line(0, 0, 127, 249, 0)
+    return buffer
+
+
+def main():
+    repetitions = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    buffer = sample_buffer()
+    packed = sample_buffer(packed=True)
+    assert np.array_equal(legacy_serialize(buffer), buffer.serialize())
+    assert np.array_equal(buffer.serialize(), packed.serialize())
+    cases = [
+        ("legacy loop", lambda: legacy_serialize(buffer)),
+        ("np.packbits", buffer.serialize),
+        ("packed view", packed.serialize),
+        ("serialize_area", lambda: buffer.serialize_area(0, 0, WIDTH - 8, HEIGHT - 1)),
+    ]
+    baseline = None
+    for name, function in cases:
+        elapsed = min(timeit.repeat(function, number=repetitions, repeat=3)) / repetitions
+        baseline = baseline or elapsed
+        print(f"{name:>16}: {elapsed * 1e6:10.1f} us/frame  ({baseline / elapsed:8.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
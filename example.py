@@ -86,14 +86,10 @@ def main():
     # Rota la pantalla 90º y dibuja texto
     display.set_rotation(90)
     display.draw_text('Texto a 90', 35, 0, raspberrypi_epd.Color.RED)
-    # Dibuja una linea rotada a 180º
+    # Dibuja dos franjas rotadas a 180º
     display.set_rotation(180)
-    display.draw_line(0, 0, 119, 0, raspberrypi_epd.Color.BLACK)
-    display.draw_line(0, 1, 119, 1, raspberrypi_epd.Color.BLACK)
-    display.draw_line(0, 2, 119, 2, raspberrypi_epd.Color.BLACK)
-    display.draw_line(0, 3, 119, 3, raspberrypi_epd.Color.RED)
-    display.draw_line(0, 4, 119, 4, raspberrypi_epd.Color.RED)
-    display.draw_line(0, 5, 119, 5, raspberrypi_epd.Color.RED)
+    display.fill_rectangle(0, 0, 120, 3, raspberrypi_epd.Color.BLACK)
+    display.fill_rectangle(0, 3, 120, 3, raspberrypi_epd.Color.RED)
     # Rota a 270º
     display.set_rotation(270)
     # Para centrar se calcula (Display.WIDTH/2-(bitmap.width/2)) y (Display.HEIGHT/2-(bitmap.height/2))
@@ -105,8 +105,8 @@ weact_gh = np.array([0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff, 0xff,
 
 def test_drawing():
     """
-    Para usar unicamente la renderizacion local hay que extraer buffer.py y localrender.py
-    debido a que la dependencia RPi.GPIO dará problemas
+    Renderizacion local. DisplayBuffer y Render no necesitan RPi.GPIO ni spidev, el paquete solo
+    importa los modulos de la pantalla cuando se usan (p. ej. raspberrypi_epd.WeAct213)
     :return:
     """
     buffer = raspberrypi_epd.DisplayBuffer(128, 250, bg=0, fg=1)
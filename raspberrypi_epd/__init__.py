@@ -1,4 +1,36 @@
+import importlib
+from raspberrypi_epd import commands as _commands, transport as _transport
 from raspberrypi_epd.commands import *
-from raspberrypi_epd.epd_display import *
-from raspberrypi_epd.buffer import *
-from raspberrypi_epd.localrender import *
+from raspberrypi_epd.transport import *
+
+# The rest of the modules are imported the first time one of their names is used, so rendering off the
+# device doesn't load the display driver, asyncio or PIL until they are needed
+_LAZY_NAMES = {
+    "raspberrypi_epd.simulator": ("SSD1680Simulator",),
+    "raspberrypi_epd.sequence": ("CommandSequence",),
+    "raspberrypi_epd.metrics": ("Metrics", "StageStats"),
+    "raspberrypi_epd.epd_display": ("Color", "BLACK", "WHITE", "RED", "WeAct213"),
+    "raspberrypi_epd.async_display": ("AsyncWeAct213",),
+    "raspberrypi_epd.pipeline": ("FramePipeline",),
+    "raspberrypi_epd.group": ("PanelGroup",),
+    "raspberrypi_epd.fonts": ("FontAtlas", "CompiledFont", "compile_font", "load_font", "read_bdf"),
+    "raspberrypi_epd.buffer": ("DisplayBuffer", "TriColorBuffer"),
+    "raspberrypi_epd.localrender": ("Render",),
+    "raspberrypi_epd.chart": ("Sparkline",),
+}
+_LAZY_MODULES = {name: module for module, names in _LAZY_NAMES.items() for name in names}
+
+__all__ = _commands.__all__ + _transport.__all__ + list(_LAZY_MODULES)
+
+
+def __getattr__(name):
+    module = _LAZY_MODULES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_MODULES))
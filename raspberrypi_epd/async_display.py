@@ -0,0 +1,187 @@
+import asyncio
+import functools
+import time
+from raspberrypi_epd.epd_display import WeAct213, Color
+
+
+class AsyncWeAct213:
+    """
+    asyncio front-end of WeAct213. The canvas is serialized on the event loop and the commands and data are
+    sent in the default executor, and while the display is refreshing (BUSY high) the event loop keeps running
+    instead of blocking the thread.
+    Drawing methods (draw_*, set_rotation, set_font...) are the ones of WeAct213, as they don't wait
+    for the display
+    """
+    # Seconds between reads of the BUSY line
+    POLL_INTERVAL = 0.01
+
+    def __init__(self, *args, display: WeAct213 = None, **kwargs):
+        """
+        Class constructor. Takes the same parameters as WeAct213
+        :param display: An already created WeAct213 to use instead of creating one
+        """
+        self._display = display if display is not None else WeAct213(*args, **kwargs)
+        # Created on first use, so it belongs to the running event loop
+        self._lock = None
+
+    @property
+    def display(self):
+        """The synchronous WeAct213 being driven"""
+        return self._display
+
+    def __getattr__(self, name):
+        return getattr(self._display, name)
+
+    def _operation_lock(self):
+        """
+        Gives the lock that keeps the operations on the display from interleaving
+        :return asyncio.Lock: The lock
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    async def _run_in_executor(self, function, *args, **kwargs):
+        """
+        Runs a blocking function of the display in the default executor
+        :return: What the function returns
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(function, *args, **kwargs))
+
+    async def _wait_while_busy(self):
+        """
+        Waits for the refresh in progress to finish, yielding to the event loop while BUSY is high
+        :raises TimeoutError: If the display is still busy after the busy timeout
+        :return: None
+        """
+        display = self._display
+        if not display.refresh_pending:
+            return
+        start = time.monotonic()
+        deadline = start + display.busy_timeout / 1000
+        while display.is_busy():
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"The display is still busy after {display.busy_timeout} ms")
+            await asyncio.sleep(self.POLL_INTERVAL)
+        # What runs after the refresh can write to the display (e.g. the previous image of write_dirty)
+        await self._run_in_executor(display.busy_finished, start)
+
+    async def wait_until_idle(self):
+        """
+        Waits until a refresh started with wait=False finishes
+        :return: None
+        """
+        async with self._operation_lock():
+            await self._wait_while_busy()
+
+    async def init(self):
+        """
+        Do the initial configuration of the display. It is run in the default executor, as the
+        reset and power on sequences sleep between commands
+        :return: None
+        """
+        async with self._operation_lock():
+            await self._wait_while_busy()
+            await self._run_in_executor(self._display.init)
+
+    async def close(self):
+        """
+        Frees up the resources used by the display, once the refresh in progress finishes
+        :return: None
+        """
+        async with self._operation_lock():
+            await self._wait_while_busy()
+            self._display.close()
+
+    async def _start(self, prepare, wait: bool):
+        """
+        Starts an operation of the display without blocking on the refresh, then waits for it if asked to
+        :param prepare: Function called on the event loop once the previous operations are done. It reads what
+                        it needs from the canvas and returns the function that sends it and starts the refresh,
+                        which is called with wait=False in the default executor, or None if there is nothing to do
+        :param wait: Wait until the refresh finishes
+        :return: None
+        """
+        async with self._operation_lock():
+            await self._wait_while_busy()
+            operation = prepare()
+            if operation is not None:
+                await self._run_in_executor(operation, wait=False)
+            if wait:
+                await self._wait_while_busy()
+
+    def _write_planes(self, force=False):
+        """
+        Serializes the canvas for a write_buffer
+        :param force: Write the complete buffers and refresh even if they didn't change
+        :return: The function that writes the planes
+        """
+        return functools.partial(self._display.write_planes, *self._display.snapshot(), force)
+
+    async def write_buffer(self, force=False, wait=True):
+        """
+        Writes the buffers (B&W and Red) to the display, see WeAct213.write_buffer
+        :param force: Write the complete buffers and refresh even if they didn't change
+        :param wait: Wait until the refresh finishes. Otherwise the next operation waits for it
+        :return: None
+        """
+        await self._start(functools.partial(self._write_planes, force), wait)
+
+    async def write_dirty(self, wait=True):
+        """
+        Writes only the areas drawn since the last write, see WeAct213.write_dirty
+        :param wait: Wait until the refresh finishes. Otherwise the next operation waits for it
+        :return: None
+        """
+        display = self._display
+
+        def prepare():
+            rects = display.canvas.dirty_rects()
+            if not rects:
+                return None
+            if not display.has_shadow:
+                # Without knowing what is on the screen the partial waveform can't be used
+                return self._write_planes()
+            bw_plane = display.canvas.serialize()
+            display.canvas.clear_dirty()
+            return functools.partial(display.write_windows, rects, bw_plane)
+
+        await self._start(prepare, wait)
+
+    async def fill(self, color: Color, wait=True):
+        """
+        Fills the whole screen with the specified color
+        :param color: The Color to paint the screen
+        :param wait: Wait until the refresh finishes. Otherwise the next operation waits for it
+        :return: None
+        """
+        def prepare():
+            self._display.canvas.clear_screen(color.value)
+            return self._write_planes()
+
+        await self._start(prepare, wait)
+
+    async def refresh(self, partial_mode=True, wait=True):
+        """
+        Refreshes the screen, see WeAct213.refresh
+        :param partial_mode:
+        :param wait: Wait until the refresh finishes. Otherwise the next operation waits for it
+        :return: None
+        """
+        if partial_mode:
+            await self.refresh_area(0, 0, self._display.WIDTH, self._display.HEIGHT, wait)
+        else:
+            await self._start(lambda: functools.partial(self._display.refresh, False), wait)
+
+    async def refresh_area(self, x, y, width, height, wait=True):
+        """
+        Refreshes a partial area of the screen
+        :param x: X Coordinate of the upper left corner
+        :param y: Y Coordinate of the upper left corner
+        :param width: Area width
+        :param height: Area height
+        :param wait: Wait until the refresh finishes. Otherwise the next operation waits for it
+        :return: None
+        """
+        await self._start(lambda: functools.partial(self._display.refresh_area, x, y, width, height), wait)
@@ -1,14 +1,17 @@
 import numpy as np
 import logging
-from bdfparser import Font
+from raspberrypi_epd.fonts import FontAtlas
+from raspberrypi_epd.metrics import Metrics, timed
 
 
 class DisplayBuffer:
     """
     Class to act as an abstraction of a display
     """
+    # Number of separate dirty rectangles kept before collapsing them into their bounding box
+    MAX_DIRTY_RECTS = 8
 
-    def __init__(self, width, height, bg=1, fg=0):
+    def __init__(self, width, height, bg=1, fg=0, packed=False, metrics: Metrics = None):
         """
         Initializes the display buffer. Each pixel is modeled in one bit, the default color is "white" background and
         "black" foreground
@@ -16,19 +19,35 @@ class DisplayBuffer:
         :param height: Height of the display this buffer models
         :param bg: Background value (default is 1=white)
         :param fg: Foreground value (default is 0=black)
+        :param packed: Store the pixels packed in the panel RAM format (1 bit per pixel, MSB first) instead of
+                       one byte per pixel. Uses 8 times less memory and makes serialize() a view of the buffer
+        :param metrics: Metrics to record the draw and serialize times in, None doesn't measure them
         """
         # Pad the buffer to have whole bytes
         self.WIDTH = width if width % 8 == 0 else (int(width / 8) + 1) * 8
         self.HEIGHT = height
-        self._BYTE_WIDTH = self.WIDTH / 8
+        self._BYTE_WIDTH = self.WIDTH // 8
         self._BYTE_HEIGHT = self.HEIGHT / 8
-        self._buffer = np.zeros((self.WIDTH * self.HEIGHT), dtype=np.uint8)
+        self._packed = packed
+        if packed:
+            self._buffer = np.zeros((self._BYTE_WIDTH * self.HEIGHT), dtype=np.uint8)
+        else:
+            self._buffer = np.zeros((self.WIDTH * self.HEIGHT), dtype=np.uint8)
         self._out_of_bounds_error = False
         self._foreground = fg
         self._background = bg
         self._rotation = 0
         self.x_length = self.WIDTH
         self.y_length = self.HEIGHT
+        self._set_dirty([])
+        self.metrics = metrics
+        self._timing = False
+        self._build_rotation_maps()
+
+    @property
+    def packed(self):
+        """True if the buffer is stored packed (1 bit per pixel)"""
+        return self._packed
 
     def rotate(self, degrees: int):
         """Virtually rotates the display to draw in different modes. The
@@ -46,6 +65,62 @@ class DisplayBuffer:
             self.x_length = self.WIDTH
             self.y_length = self.HEIGHT
         self._rotation = degrees
+        self._build_rotation_maps()
+
+    def _build_rotation_maps(self):
+        """
+        Precomputes how the drawing coordinates map to the buffer in the current rotation, so drawing costs
+        the same in every rotation:
+        - The index of the pixel (x, y) in the buffer is _x_index[x] + _y_index[y], as each rotated axis
+          maps to a single axis of the buffer. In the packed mode it is the byte, with the bit mask
+          _x_bit[x] | _y_bit[y]
+        - When not packed, _view is the buffer as a (y_length, x_length) strided view in drawing coordinates
+        - _base_maps has the base coordinates as lists, (x from x, x from y, y from x, y from y), so the base
+          coordinates of (x, y) are (map[0][x] + map[1][y], map[2][x] + map[3][y]). They mark areas as dirty
+          without going through numpy
+        """
+        xs = np.arange(self.x_length)
+        ys = np.arange(self.y_length)
+        zeros_x = np.zeros(self.x_length, dtype=int)
+        zeros_y = np.zeros(self.y_length, dtype=int)
+        # Base coordinates each axis maps to, as (base x from x, base x from y, base y from x, base y from y)
+        if self._rotation == 90:
+            base = (zeros_x, self.WIDTH - 1 - ys, xs, zeros_y)
+        elif self._rotation == 180:
+            base = (self.WIDTH - 1 - xs, zeros_y, zeros_x, self.HEIGHT - 1 - ys)
+        elif self._rotation == 270:
+            base = (zeros_x, ys, self.HEIGHT - 1 - xs, zeros_y)
+        else:
+            base = (xs, zeros_y, zeros_x, ys)
+        base_x_from_x, base_x_from_y, base_y_from_x, base_y_from_y = base
+        self._base_maps = tuple(axis.tolist() for axis in base)
+        if self._packed:
+            self._x_index = base_y_from_x * self._BYTE_WIDTH + base_x_from_x // 8
+            self._y_index = base_y_from_y * self._BYTE_WIDTH + base_x_from_y // 8
+            x_maps_x = self._rotation in (0, 180)
+            self._x_bit = (0x80 >> (base_x_from_x % 8)).astype(np.uint8) * np.uint8(x_maps_x)
+            self._y_bit = (0x80 >> (base_x_from_y % 8)).astype(np.uint8) * np.uint8(not x_maps_x)
+            self._view = None
+        else:
+            self._x_index = base_y_from_x * self.WIDTH + base_x_from_x
+            self._y_index = base_y_from_y * self.WIDTH + base_x_from_y
+            self._x_bit = self._y_bit = None
+            self._view = self._oriented(self._buffer.reshape(self.HEIGHT, self.WIDTH))
+
+    def _oriented(self, pixels: np.array):
+        """
+        Gives a view of pixels in base coordinates with the rows and columns as they are drawn in the
+        current rotation
+        :param np.array pixels: 2-dimensional array of pixels in base coordinates
+        :return np.array: The view, the pixel (x, y) of the rotated area is view[y, x]
+        """
+        if self._rotation == 90:
+            return pixels[:, ::-1].T
+        if self._rotation == 180:
+            return pixels[::-1, ::-1]
+        if self._rotation == 270:
+            return pixels[::-1, :].T
+        return pixels
 
     def draw_pixel(self, x: int, y: int, value: np.uint8):
         """
@@ -57,18 +132,96 @@ class DisplayBuffer:
         """
         if not self._valid_coords(x, y):
             return
-        xr, yr = self.rotate_coords(x, y)
-        start, end, bit = self._get_slice(xr, yr)
-        self._buffer[start + bit] = value
+        self._draw_base_pixel(*self._mark_dirty_pixel(x, y), value)
 
-    def draw_pixels(self, pixels: list, value: np.uint8):
+    def _draw_base_pixel(self, x: int, y: int, value: np.uint8):
+        """
+        Draws a single pixel in base coordinates without marking it as dirty
+        :param int x: X coordinate of the pixel to draw (base coordinates)
+        :param int y: Y Coordinate of the pixel to draw (base coordinates)
+        :param np.uint8 value: Value to set the pixel to (1 or 0)
+        """
+        if not self._packed:
+            self._buffer[y * self.WIDTH + x] = value
+        elif value:
+            self._buffer[y * self._BYTE_WIDTH + (x >> 3)] |= 0x80 >> (x & 7)
+        else:
+            self._buffer[y * self._BYTE_WIDTH + (x >> 3)] &= 0xFF ^ (0x80 >> (x & 7))
+
+    def draw_pixels(self, pixels, value: np.uint8):
         """
         Draws the pixels specified in a list of 2-tuples with the value specified
-        :param list pixels: List of 2-tuples that indicate each pixel, the tuples are in the form (x, y)
+        :param pixels: List of 2-tuples that indicate each pixel in the form (x, y), or an array with shape (N, 2)
+        :param np.uint8 value: The value to set the pixels to
+        """
+        points = np.asarray(pixels, dtype=int).reshape(-1, 2)
+        self.draw_points(points[:, 0], points[:, 1], value)
+
+    @timed("draw")
+    def draw_points(self, xs, ys, value: np.uint8):
+        """
+        Draws a batch of pixels given as separate arrays of coordinates. The pixels outside the visible area
+        are clipped
+        :param xs: Array (or list) of X coordinates
+        :param ys: Array (or list) of Y coordinates, with the same length as xs
         :param np.uint8 value: The value to set the pixels to
         """
-        for pixel in pixels:
-            self.draw_pixel(pixel[0], pixel[1], value)
+        xs = np.asarray(xs, dtype=int).ravel()
+        ys = np.asarray(ys, dtype=int).ravel()
+        if xs.size == 0:
+            return
+        x_min, y_min = xs.min(), ys.min()
+        self._mark_dirty(int(x_min), int(y_min), int(xs.max() - x_min) + 1, int(ys.max() - y_min) + 1)
+        self._draw_points(xs, ys, value)
+
+    def _draw_points(self, xs: np.array, ys: np.array, value: np.uint8):
+        """
+        Draws a batch of pixels without marking them as dirty: clips them to the visible area, rotates them
+        and writes them in one pass
+        :param np.array xs: Array of X coordinates
+        :param np.array ys: Array of Y coordinates, with the same length as xs
+        :param np.uint8 value: The value to set the pixels to
+        """
+        visible = (xs >= 0) & (xs < self.x_length) & (ys >= 0) & (ys < self.y_length)
+        if self._out_of_bounds_error and not visible.all():
+            raise ValueError("Coordinates out of bounds")
+        xs, ys = xs[visible], ys[visible]
+        indexes = self._x_index[xs] + self._y_index[ys]
+        if not self._packed:
+            self._buffer[indexes] = value
+            return
+        masks = self._x_bit[xs] | self._y_bit[ys]
+        for plane, on in self._planes(value):
+            if on:
+                np.bitwise_or.at(plane, indexes, masks)
+            else:
+                np.bitwise_and.at(plane, indexes, ~masks)
+
+    def _write_bits(self, xs: np.array, ys: np.array, value: np.uint8):
+        """
+        Writes the value of a batch of pixels in the base (not rotated) coordinates
+        :param np.array xs: Array of X coordinates, inside the buffer
+        :param np.array ys: Array of Y coordinates, inside the buffer
+        :param np.uint8 value: Value to set the pixels to
+        """
+        if self._packed:
+            addresses = ys * self._BYTE_WIDTH + xs // 8
+            masks = (0x80 >> (xs % 8)).astype(np.uint8)
+            for plane, on in self._planes(value):
+                if on:
+                    np.bitwise_or.at(plane, addresses, masks)
+                else:
+                    np.bitwise_and.at(plane, addresses, ~masks)
+        else:
+            self._buffer[ys * self.WIDTH + xs] = value
+
+    def _planes(self, value: np.uint8):
+        """
+        Gives the packed planes that hold the pixels, and how a value is written in each one
+        :param np.uint8 value: Value of the pixels to write
+        :return tuple: 2-tuples of (plane, True to set the bits of the pixels or False to clear them)
+        """
+        return ((self._buffer, bool(value)),)
 
     def set_pixel(self, x, y):
         """Draws a single pixel by setting its representing bit in the buffer to the foreground value
@@ -77,8 +230,8 @@ class DisplayBuffer:
         """
         if not self._valid_coords(x, y):
             return
-        s, e, b = self._get_slice(x, y)
-        self._buffer[s + b] = self._foreground
+        self._mark_dirty_base(x, y, 1, 1)
+        self._write_bit(x, y, self._foreground)
 
     def set_background(self, value: np.uint8):
         """
@@ -97,12 +250,12 @@ class DisplayBuffer:
         """
         self._foreground = value
 
+    @timed("draw")
     def set_group_pixels(self, list_of_pixels):
         """Sets the pixels in the given list
-        :param list list_of_pixels: List of 2-tuples with the points (x, y)
+        :param list_of_pixels: List of 2-tuples with the points (x, y), or an array with shape (N, 2)
         """
-        for pixel in list_of_pixels:
-            self.set_pixel(pixel[0], pixel[1])
+        self._write_group(list_of_pixels, self._foreground)
 
     def clear_pixel(self, x, y):
         """Erases a pixel on the display by clearing its representing bit in the buffer
@@ -111,22 +264,46 @@ class DisplayBuffer:
         """
         if not self._valid_coords(x, y):
             return
-        s, e, b = self._get_slice(x, y)
-        self._buffer[s + b] = self._background
+        self._mark_dirty_base(x, y, 1, 1)
+        self._write_bit(x, y, self._background)
 
+    @timed("draw")
     def clear_group_pixels(self, list_of_pixels: list):
         """Clears the pixels/bits in the buffer
-        :param list list_of_pixels: A list of 2-tuples with the points (x, y)
+        :param list_of_pixels: A list of 2-tuples with the points (x, y), or an array with shape (N, 2)
+        """
+        self._write_group(list_of_pixels, self._background)
+
+    def _write_group(self, list_of_pixels, value: np.uint8):
         """
-        for pixel in list_of_pixels:
-            self.clear_pixel(pixel[0], pixel[1])
+        Writes a value to a group of pixels in the base (not rotated) coordinates, like set_pixel and
+        clear_pixel do with a single one
+        :param list_of_pixels: A list of 2-tuples with the points (x, y), or an array with shape (N, 2)
+        :param np.uint8 value: Value to set the pixels to
+        """
+        points = np.asarray(list_of_pixels, dtype=int).reshape(-1, 2)
+        xs, ys = points[:, 0], points[:, 1]
+        visible = (xs >= 0) & (xs < self.WIDTH) & (ys >= 0) & (ys < self.HEIGHT)
+        if self._out_of_bounds_error and not visible.all():
+            raise ValueError("Coordinates out of bounds")
+        xs, ys = xs[visible], ys[visible]
+        if xs.size == 0:
+            return
+        x_min, y_min = xs.min(), ys.min()
+        self._mark_dirty_base(int(x_min), int(y_min), int(xs.max() - x_min) + 1, int(ys.max() - y_min) + 1)
+        self._write_bits(xs, ys, value)
 
+    @timed("draw")
     def clear_screen(self, value=0):
         """Sets all the pixels in the screen to the same value
         :param int value: the value to fill the screen with (0 or 1)
         """
         if value == 1 or value == 0:
-            self._buffer.fill(np.uint8(value))
+            self._set_dirty([(0, 0, self.WIDTH, self.HEIGHT)])
+            if self._packed:
+                self._buffer.fill(np.uint8(0xFF * value))
+            else:
+                self._buffer.fill(np.uint8(value))
         else:
             logging.warning(f"Incorrect color value {value}")
 
@@ -136,8 +313,12 @@ class DisplayBuffer:
         :param int y: Y Coordinate of the point
         :return np.uint8: The bit as it exists in the buffer
         """
-        if not self._valid_coords(x, y):
+        if not (0 <= x < self.WIDTH and 0 <= y < self.HEIGHT):
+            # The point is in base (not rotated) coordinates
             return np.uint8(0x00)
+        if self._packed:
+            address, mask = self._bit_address(x, y)
+            return np.uint8(1) if self._buffer[address] & mask else np.uint8(0)
         s, e, b = self._get_slice(x, y)
         return self._buffer[s + b]
 
@@ -147,174 +328,552 @@ class DisplayBuffer:
         :param int y: Y coordinate of the pixel to read
         :return np.uint8: A single byte representation containing the pixel
         """
+        if self._packed:
+            address, _ = self._bit_address(x, y)
+            return self._buffer[address]
         # Calculate x1 and x2 to get the slice from the buffer
         x1, x2, _ = self._get_slice(x, y)
         # logging.debug(f'Slicing buffer[{x1}:{x2}]')
         pixel_byte = DisplayBuffer.create_byte_from_array(self._buffer[x1:x2])
         return pixel_byte
 
-    def draw_line(self, x1, y1, x2, y2, value: np.uint8):
+    @timed("draw")
+    def draw_line(self, x1, y1, x2, y2, value: np.uint8, line_width: int = 1):
         """Implements the Bresenham algorithm to draw a line from (x1, y1) to (x2, y2)
         :param int x1: Starting x component
         :param int y1: Starting y component
         :param int x2: Final x component
         :param int y2: Final y component
         :param int value: Value (color) to set the bit to
+        :param int line_width: Width of the line in pixels, centered on the line
         """
-        dx = x2 - x1
-        dy = y2 - y1
-
-        if dy >= 0:
-            y_incr = 1
-        else:
-            dy = -dy
-            y_incr = -1
-
-        if dx >= 0:
-            x_incr = 1
-        else:
-            dx = -dx
-            x_incr = -1
+        if line_width > 1:
+            self._draw_thick_line(x1, y1, x2, y2, value, line_width)
+            return
+        self._mark_dirty(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)
+        xs, ys = self._line_coords(x1, y1, x2, y2)
+        self._draw_points(xs, ys, value)
 
+    @staticmethod
+    def _line_coords(x1: int, y1: int, x2: int, y2: int):
+        """
+        Computes the pixels of the line from (x1, y1) to (x2, y2) with the Bresenham algorithm. The pixel i
+        along the major axis is offset floor((2 * i * d_minor + d_major) / (2 * d_major)) in the minor axis
+        :param int x1: Starting x component
+        :param int y1: Starting y component
+        :param int x2: Final x component
+        :param int y2: Final y component
+        :return tuple: Arrays with the X and Y coordinates, from the start to the end of the line
+        """
+        dx, dy = abs(x2 - x1), abs(y2 - y1)
+        x_incr = 1 if x2 >= x1 else -1
+        y_incr = 1 if y2 >= y1 else -1
+        major, minor = max(dx, dy), min(dx, dy)
+        steps = np.arange(major + 1)
+        offsets = (2 * steps * minor + major) // (2 * major) if major else steps
         if dx >= dy:
-            y_incr_s = 0
-            x_incr_s = x_incr
-        else:
-            y_incr_s = y_incr
-            x_incr_s = 0
-            # Switch dX and dY
-            k = dx
-            dx = dy
-            dy = k
-
-        x = x1
-        y = y1
-        a = 2 * dy
-        b = a - dx
-        p = b - dx
-        while True:
-            self.draw_pixel(x, y, value)
-            if b >= 0:
-                x = x + x_incr
-                y = y + y_incr
-                b = b + p
-            else:
-                x = x + x_incr_s
-                y = y + y_incr_s
-                b = b + a
-            if x == x2 and y == y2:
-                break
-        self.draw_pixel(x, y, value)
-
-    def draw_circle(self, xc: int, yc: int, r: int, value: np.uint8):
+            return x1 + x_incr * steps, y1 + y_incr * offsets
+        return x1 + x_incr * offsets, y1 + y_incr * steps
+
+    @timed("draw")
+    def draw_circle(self, xc: int, yc: int, r: int, value: np.uint8, line_width: int = 1):
         """Draws a circle with the Midpoint Algorithm
         :param int xc: X coordinate of the circle's center
         :param int yc: Y coordinate of the circle's center
         :param int r: Circle's radius
         :param np.uint8 value: Value to set the bit in the buffer
+        :param int line_width: Width of the line in pixels, drawn inwards from the radius
         """
-        if r == 0:
-            self.draw_pixel(xc, yc, value)
+        self._mark_dirty(xc - r, yc - r, 2 * r + 1, 2 * r + 1)
+        if line_width > 1:
+            ring = self._disc_mask(r)
+            if line_width <= r:
+                ring[line_width:-line_width, line_width:-line_width] &= ~self._disc_mask(r - line_width)
+            self._draw_mask(ring, xc - r, yc - r, value)
             return
+        xs, ys = self._circle_coords(xc, yc, r)
+        self._draw_points(xs, ys, value)
 
-        xk, yk = (r, 0)
-        pk = 1 - r
-        self.draw_pixels(
-            [
-                (xk + xc, yk + yc),
-                (-xk + xc, yk + yc),
-                (xk + xc, -yk + yc),
-                (-xk + xc, -yk + yc),
-            ],
-            value,
-        )
-        self.draw_pixels([(xc, yc + r), (xc, yc - r)], value)
-        while xk > yk:
-            yk = yk + 1
-            if pk <= 0:
-                pk = pk + 2 * yk + 1
-            else:
-                xk -= 1
-                pk = pk + 2 * yk - 2 * xk + 1
-
-            if xk < yk:
-                break
-
-            # self.draw_pixel(xk + xc, yk + yc)
-            self.draw_pixels(
-                [
-                    (xk + xc, yk + yc),
-                    (-xk + xc, yk + yc),
-                    (xk + xc, -yk + yc),
-                    (-xk + xc, -yk + yc),
-                ],
-                value,
-            )
-            if xk != yk:
-                self.draw_pixels(
-                    [
-                        (yk + xc, xk + yc),
-                        (-yk + xc, xk + yc),
-                        (yk + xc, -xk + yc),
-                        (-yk + xc, -xk + yc),
-                    ],
-                    value,
-                )
+    @staticmethod
+    def _circle_coords(xc: int, yc: int, r: int):
+        """
+        Computes the pixels of a circle as the Midpoint Algorithm (with p0 = 1 - r) does. In the first octant
+        it keeps the largest x where x * (x - 1) <= r^2 - y^2, the rest are its reflections
+        :param int xc: X coordinate of the circle's center
+        :param int yc: Y coordinate of the circle's center
+        :param int r: Circle's radius
+        :return tuple: Arrays with the X and Y coordinates, a pixel can be repeated
+        """
+        if r <= 0:
+            return np.array([xc]), np.array([yc])
+        ys = np.arange(r + 1)
+        discriminant = 1 + 4 * (r * r - ys * ys)
+        roots = np.floor(np.sqrt(discriminant)).astype(int)
+        # Corrects the rounding of the floating point square root
+        roots -= roots * roots > discriminant
+        roots += (roots + 1) * (roots + 1) <= discriminant
+        xs = (1 + roots) // 2
+        octant = xs >= ys
+        xs, ys = xs[octant], ys[octant]
+        xs, ys = np.concatenate((xs, ys)), np.concatenate((ys, xs))
+        return (np.concatenate((xs, -xs, xs, -xs)) + xc,
+                np.concatenate((ys, ys, -ys, -ys)) + yc)
 
+    @timed("draw")
     def draw_bitmap(self, bitmap: np.array, x: int, y: int, w: int, h: int, value: np.uint8):
         """Draws a bitmap on the buffer. The bitmap starts at the upper left corner (x, y)
-        and the lower right corner is (x+w, y+h)
-        :param np.array bitmap: A 1-dimmensional array of bytes, has to have at least shape of (w, h)
+        and the lower right corner is (x+w, y+h). Only the set bits are painted, and the parts outside the
+        visible area are clipped
+        :param np.array bitmap: A 1-dimmensional array of bytes, has to have at least shape of (w, h).
+                                Each row starts in a new byte
         :param int x: X coordinate where to start drawing the bitmap
         :param int y: Y coordinate where to start drawing the bitmap
         :param int w: Width of the bitmap
         :param int h: Height of the bitmap
         :param np.uint8 value: Value to set in the buffer
         """
-        x_p = 0
-        y_p = 0
-        for byte in bitmap:
-            bitmasks = np.array(
-                [0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01], dtype=np.uint8
-            )
-            bit = 0
-            for mask in bitmasks:
-                if mask & byte:
-                    self.draw_pixel(x_p + x, y_p + y, value)
-                bit = bit + 1
-                x_p = x_p + 1
-            if x_p == w:
-                y_p = y_p + 1
-                x_p = 0
-
-    def draw_text(self, text: str, font: Font, x: int, y: int, value: np.uint8):
+        self._mark_dirty(x, y, w, h)
+        row_bits = ((w + 7) // 8) * 8
+        bits = np.unpackbits(np.asarray(bitmap, dtype=np.uint8))[: row_bits * h]
+        if bits.size < row_bits * h:
+            bits = np.concatenate((bits, np.zeros(row_bits * h - bits.size, dtype=np.uint8)))
+        mask = bits.reshape(h, row_bits)[:, :w].astype(bool)
+        self._draw_mask(mask, x, y, value)
+
+    def _draw_mask(self, mask: np.array, x: int, y: int, value: np.uint8):
+        """
+        Sets the pixels where a boolean mask is True to the value, the rest are left untouched.
+        The mask is clipped to the visible area and rotated to the base coordinates of the buffer
+        :param np.array mask: 2-dimensional boolean array with shape (height, width)
+        :param int x: X coordinate of the upper left corner of the mask
+        :param int y: Y coordinate of the upper left corner of the mask
+        :param np.uint8 value: Value to set in the buffer
+        """
+        h, w = mask.shape
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.x_length), min(y + h, self.y_length)
+        if x0 >= x1 or y0 >= y1:
+            return
+        mask = mask[y0 - y : y1 - y, x0 - x : x1 - x]
+        if not self._packed:
+            self._view[y0:y1, x0:x1][mask] = value
+        elif self._rotation == 90:
+            self._write_block(self.WIDTH - y1, x0, mask.T[:, ::-1], value)
+        elif self._rotation == 180:
+            self._write_block(self.WIDTH - x1, self.HEIGHT - y1, mask[::-1, ::-1], value)
+        elif self._rotation == 270:
+            self._write_block(y0, self.HEIGHT - x1, mask.T[::-1, :], value)
+        else:
+            self._write_block(x0, y0, mask, value)
+
+    def _write_block(self, x: int, y: int, mask: np.array, value: np.uint8):
+        """
+        Sets the pixels where a boolean mask is True, in the base (not rotated) coordinates
+        :param int x: X coordinate of the upper left corner of the mask
+        :param int y: Y coordinate of the upper left corner of the mask
+        :param np.array mask: 2-dimensional boolean array that fits in the buffer
+        :param np.uint8 value: Value to set in the buffer
+        """
+        h, w = mask.shape
+        if self._packed:
+            first_byte = x // 8
+            last_byte = (x + w + 7) // 8
+            offset = x - first_byte * 8
+            # The mask packed as the bytes it covers, so it is applied to each plane with a single operation
+            bits = np.zeros((h, (last_byte - first_byte) * 8), dtype=bool)
+            bits[:, offset : offset + w] = mask
+            masks = np.packbits(bits, axis=1)
+            for plane, on in self._planes(value):
+                region = plane.reshape(self.HEIGHT, self._BYTE_WIDTH)[y : y + h, first_byte:last_byte]
+                if on:
+                    region |= masks
+                else:
+                    region &= ~masks
+        else:
+            region = self._buffer.reshape(self.HEIGHT, self.WIDTH)[y : y + h, x : x + w]
+            region[mask] = value
+
+    @timed("draw")
+    def draw_text(self, text: str, font, x: int, y: int, value: np.uint8):
         """
         Render a bitmap of the text with the provided font and draw it in the buffer
         :param text: The string to render
-        :param font: The Font object to use
+        :param font: The Font object to use, or its FontAtlas
         :param x: X coordinate of the upper left corner of the bitmap
         :param y: Y Coordinate of the upper left corner of the bitmap
         :param value: Value to set the pixels in the buffer to
         :return: None
         """
-        text_bitmap = font.draw(text)
-        array, width, height = self._bitmap_to_bytearray(text_bitmap.todata(4))
-        self.draw_bitmap(array, x, y, width, height, value)
+        atlas = font if isinstance(font, FontAtlas) else FontAtlas.of(font)
+        self.draw_mask(atlas.render(text), x, y, value)
+
+    @timed("draw")
+    def draw_mask(self, mask: np.array, x: int, y: int, value: np.uint8):
+        """
+        Draws a boolean mask on the buffer, the pixels where it is True are set to the value
+        :param np.array mask: 2-dimensional boolean array with shape (height, width)
+        :param int x: X coordinate of the upper left corner of the mask
+        :param int y: Y coordinate of the upper left corner of the mask
+        :param np.uint8 value: Value to set in the buffer
+        :return: None
+        """
+        self._mark_dirty(x, y, mask.shape[1], mask.shape[0])
+        self._draw_mask(mask, x, y, value)
 
-    def draw_rectangle(self, x: int, y: int, w: int, h: int, value: np.uint8):
+    @timed("draw")
+    def draw_rectangle(self, x: int, y: int, w: int, h: int, value: np.uint8, line_width: int = 1):
         """
-        Draws a rectangle with 1-px wide lines, and no fill
+        Draws a rectangle with no fill. The lines go from (x, y) to (x + w, y + h), both included
         :param int x: X Coordinate of the upper left corner
         :param int y: Y Coordinate of the upper left corner
         :param int w: Rectangle's width
         :param int h: Rectangle's height
         :param np.uint8 value: Value to set the pixels to
+        :param int line_width: Width of the lines in pixels, drawn inwards
+        :return: None
+        """
+        if w < 0:
+            x, w = x + w, -w
+        if h < 0:
+            y, h = y + h, -h
+        t = max(1, min(line_width, w // 2 + 1, h // 2 + 1))
+        self.fill_rectangle(x, y, w + 1, t, value)
+        self.fill_rectangle(x, y + h + 1 - t, w + 1, t, value)
+        self.fill_rectangle(x, y + t, t, h + 1 - 2 * t, value)
+        self.fill_rectangle(x + w + 1 - t, y + t, t, h + 1 - 2 * t, value)
+
+    @timed("draw")
+    def fill_rectangle(self, x: int, y: int, w: int, h: int, value: np.uint8):
+        """
+        Fills the rectangle of w by h pixels with its upper left corner in (x, y)
+        :param int x: X Coordinate of the upper left corner
+        :param int y: Y Coordinate of the upper left corner
+        :param int w: Rectangle's width
+        :param int h: Rectangle's height
+        :param np.uint8 value: Value to set the pixels to
+        :return: None
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.x_length), min(y + h, self.y_length)
+        if x0 >= x1 or y0 >= y1:
+            return
+        self._mark_dirty(x0, y0, x1 - x0, y1 - y0)
+        if self._packed:
+            self._fill_block(*self._base_area(x0, y0, x1, y1), value)
+        else:
+            self._view[y0:y1, x0:x1] = value
+
+    def _base_area(self, x0: int, y0: int, x1: int, y1: int):
+        """
+        Converts a visible area to the base (not rotated) coordinates
+        :param int x0: X Coordinate of the upper left corner
+        :param int y0: Y Coordinate of the upper left corner
+        :param int x1: X Coordinate past the right side
+        :param int y1: Y Coordinate past the bottom side
+        :return: 4-tuple with (x, y, width, height) in the base coordinates
+        """
+        if self._rotation == 90:
+            return self.WIDTH - y1, x0, y1 - y0, x1 - x0
+        if self._rotation == 180:
+            return self.WIDTH - x1, self.HEIGHT - y1, x1 - x0, y1 - y0
+        if self._rotation == 270:
+            return y0, self.HEIGHT - x1, y1 - y0, x1 - x0
+        return x0, y0, x1 - x0, y1 - y0
+
+    @timed("draw")
+    def scroll(self, x: int, y: int, w: int, h: int, dx: int, value: np.uint8):
+        """
+        Moves the contents of an area dx pixels to the left (to the right if dx is negative), the columns
+        left behind are set to the value
+        :param int x: X Coordinate of the upper left corner of the area
+        :param int y: Y Coordinate of the upper left corner of the area
+        :param int w: Area width
+        :param int h: Area height
+        :param int dx: Number of pixels to move the contents
+        :param np.uint8 value: Value to set the uncovered pixels to
+        :return: None
+        """
+        x0, y0 = max(x, 0), max(y, 0)
+        x1, y1 = min(x + w, self.x_length), min(y + h, self.y_length)
+        if x0 >= x1 or y0 >= y1 or dx == 0:
+            return
+        self._mark_dirty(x0, y0, x1 - x0, y1 - y0)
+        if not self._packed:
+            self._scroll_area(self._view[y0:y1, x0:x1], dx, value)
+            return
+        bx, by, bw, bh = self._base_area(x0, y0, x1, y1)
+        first_byte = bx // 8
+        last_byte = (bx + bw + 7) // 8
+        offset = bx - first_byte * 8
+        for plane, on in self._planes(value):
+            region = plane.reshape(self.HEIGHT, self._BYTE_WIDTH)[by : by + bh, first_byte:last_byte]
+            bits = np.unpackbits(region, axis=1)
+            self._scroll_area(self._oriented(bits[:, offset : offset + bw]), dx, 1 if on else 0)
+            region[:] = np.packbits(bits, axis=1)
+
+    @staticmethod
+    def _scroll_area(area: np.array, dx: int, value: np.uint8):
+        """
+        Moves the columns of an area dx places to the left (to the right if dx is negative)
+        :param np.array area: 2-dimensional view of the area, in drawing coordinates
+        :param int dx: Number of columns to move
+        :param np.uint8 value: Value to set the uncovered columns to
+        """
+        area[:] = np.roll(area, -dx, axis=1)
+        if dx > 0:
+            area[:, max(area.shape[1] - dx, 0) :] = value
+        else:
+            area[:, : -dx] = value
+
+    def _fill_block(self, x: int, y: int, w: int, h: int, value: np.uint8):
+        """
+        Sets every pixel of a rectangle to the value, in the base (not rotated) coordinates
+        :param int x: X coordinate of the upper left corner
+        :param int y: Y coordinate of the upper left corner
+        :param int w: Width of the rectangle, it has to fit in the buffer
+        :param int h: Height of the rectangle, it has to fit in the buffer
+        :param np.uint8 value: Value to set in the buffer
+        """
+        if not self._packed:
+            self._buffer.reshape(self.HEIGHT, self.WIDTH)[y : y + h, x : x + w] = value
+            return
+        first_byte, last_byte = x // 8, (x + w - 1) // 8
+        # Mask of the pixels of each row: whole bytes in the middle, only the bytes at the edges keep some of
+        # their pixels. It covers the whole rows, as numpy is faster on them than on a strided block
+        span = np.zeros(self._BYTE_WIDTH, dtype=np.uint8)
+        span[first_byte : last_byte + 1] = 0xFF
+        span[first_byte] &= 0xFF >> (x % 8)
+        span[last_byte] &= (0xFF << (7 - (x + w - 1) % 8)) & 0xFF
+        for plane, on in self._planes(value):
+            rows = plane.reshape(self.HEIGHT, self._BYTE_WIDTH)[y : y + h]
+            if on:
+                rows |= span
+            else:
+                rows &= ~span
+
+    @timed("draw")
+    def fill_circle(self, xc: int, yc: int, r: int, value: np.uint8):
+        """
+        Fills a circle, covering the same pixels as its outline drawn with draw_circle and those inside it
+        :param int xc: X coordinate of the circle's center
+        :param int yc: Y coordinate of the circle's center
+        :param int r: Circle's radius
+        :param np.uint8 value: Value to set the pixels to
         :return: None
         """
-        self.draw_line(x, y, x + w, y, value)
-        self.draw_line(x + w, y, x + w, y + h, value)
-        self.draw_line(x + w, y + h, x, y + h, value)
-        self.draw_line(x, y + h, x, y, value)
+        if r < 0:
+            return
+        self.draw_mask(self._disc_mask(r), xc - r, yc - r, value)
+
+    @timed("draw")
+    def fill_polygon(self, points: list, value: np.uint8):
+        """
+        Fills a polygon, covering its outline (as drawn with draw_line) and the pixels inside it.
+        The inside follows the even-odd rule, so self-intersecting polygons are supported
+        :param list points: List of 2-tuples with the vertices (x, y), the polygon is closed automatically
+        :param np.uint8 value: Value to set the pixels to
+        :return: None
+        """
+        if len(points) == 0:
+            return
+        vertices = np.asarray(points)
+        x0, y0 = vertices.min(axis=0)
+        x1, y1 = vertices.max(axis=0)
+        mask = self._polygon_mask(vertices[:, 0] - x0, vertices[:, 1] - y0, x1 - x0 + 1, y1 - y0 + 1)
+        self.draw_mask(mask, int(x0), int(y0), value)
+        for (xa, ya), (xb, yb) in zip(points, list(points[1:]) + [points[0]]):
+            self.draw_line(xa, ya, xb, yb, value)
+
+    def _draw_thick_line(self, x1: int, y1: int, x2: int, y2: int, value: np.uint8, width: int):
+        """
+        Draws a line wider than a pixel. Horizontal and vertical lines are filled rectangles, the rest
+        are filled as the rectangle around the line
+        :param int x1: Starting x component
+        :param int y1: Starting y component
+        :param int x2: Final x component
+        :param int y2: Final y component
+        :param np.uint8 value: Value to set the pixels to
+        :param int width: Width of the line in pixels
+        """
+        before = (width - 1) // 2
+        if y1 == y2:
+            self.fill_rectangle(min(x1, x2), y1 - before, abs(x2 - x1) + 1, width, value)
+            return
+        if x1 == x2:
+            self.fill_rectangle(x1 - before, min(y1, y2), width, abs(y2 - y1) + 1, value)
+            return
+        # Corners of the line, half a pixel past the ends so they are included
+        length = np.hypot(x2 - x1, y2 - y1)
+        ux, uy = (x2 - x1) / length / 2, (y2 - y1) / length / 2
+        nx, ny = -uy * width, ux * width
+        xs = np.array([x1 - ux + nx, x2 + ux + nx, x2 + ux - nx, x1 - ux - nx])
+        ys = np.array([y1 - uy + ny, y2 + uy + ny, y2 + uy - ny, y1 - uy - ny])
+        left, top = int(np.floor(xs.min())), int(np.floor(ys.min()))
+        right, bottom = int(np.ceil(xs.max())), int(np.ceil(ys.max()))
+        mask = self._polygon_mask(xs - left, ys - top, right - left + 1, bottom - top + 1)
+        self.draw_mask(mask, left, top, value)
+
+    @staticmethod
+    def _disc_mask(r: int):
+        """
+        Builds the mask of a filled circle with the same boundary as the Midpoint Algorithm
+        :param int r: Circle's radius
+        :return np.array: Boolean array with shape (2r + 1, 2r + 1), empty if r is negative
+        """
+        if r < 0:
+            return np.zeros((0, 0), dtype=bool)
+        offsets = np.arange(-r, r + 1)
+        return offsets[:, np.newaxis] ** 2 + offsets[np.newaxis, :] ** 2 <= r * r + r
+
+    @staticmethod
+    def _polygon_mask(xs: np.array, ys: np.array, width: int, height: int):
+        """
+        Builds the mask of the pixels whose center is inside a polygon (even-odd rule)
+        :param np.array xs: X coordinates of the vertices, relative to the mask
+        :param np.array ys: Y coordinates of the vertices, relative to the mask
+        :param int width: Width of the mask
+        :param int height: Height of the mask
+        :return np.array: Boolean array with shape (height, width)
+        """
+        py = np.arange(height)[:, np.newaxis]
+        px = np.arange(width)[np.newaxis, :]
+        inside = np.zeros((int(height), int(width)), dtype=bool)
+        for xa, ya, xb, yb in zip(xs, ys, np.roll(xs, -1), np.roll(ys, -1)):
+            if ya == yb:
+                continue
+            crosses = (ya > py) != (yb > py)
+            x_cross = xa + (py - ya) * (xb - xa) / (yb - ya)
+            inside ^= crosses & (px < x_cross)
+        return inside
+
+    def dirty_rects(self):
+        """
+        Gives the areas of the buffer modified since the last call to clear_dirty. The areas are in the
+        base (not rotated) coordinates of the buffer
+        :return list: List of 4-tuples (x, y, width, height)
+        """
+        self._merge_pending()
+        return [(x1, y1, x2 - x1, y2 - y1) for x1, y1, x2, y2 in self._dirty]
+
+    def clear_dirty(self):
+        """
+        Forgets the modified areas, usually after they were sent to the display
+        :return: None
+        """
+        self._set_dirty([])
+
+    def _set_dirty(self, rects: list):
+        """
+        Replaces the modified areas
+        :param list rects: List of 4-tuples (x1, y1, x2, y2) in base coordinates, the ends are exclusive
+        :return: None
+        """
+        self._dirty = rects
+        # The area being drawn, not merged with the rest yet, and the last area that was merged
+        self._pending = None
+        self._last_merged = rects[-1] if rects else None
+
+    def _mark_dirty_pixel(self, x: int, y: int):
+        """
+        Marks a single visible pixel as modified. Usually the pixel is in the area being drawn, so this is
+        kept to a few comparisons
+        :param int x: X Coordinate of the pixel (rotated coordinates)
+        :param int y: Y Coordinate of the pixel (rotated coordinates)
+        :return tuple: The base coordinates of the pixel, as (x, y)
+        """
+        x_from_x, x_from_y, y_from_x, y_from_y = self._base_maps
+        base_x = x_from_x[x] + x_from_y[y]
+        base_y = y_from_x[x] + y_from_y[y]
+        pending = self._pending
+        if pending is None or not (pending[0] <= base_x < pending[2] and pending[1] <= base_y < pending[3]):
+            self._add_dirty(base_x, base_y, base_x + 1, base_y + 1)
+        return base_x, base_y
+
+    def _mark_dirty(self, x: int, y: int, w: int, h: int):
+        """
+        Marks an area as modified
+        :param int x: X Coordinate of the upper left corner (rotated coordinates)
+        :param int y: Y Coordinate of the upper left corner (rotated coordinates)
+        :param int w: Area width
+        :param int h: Area height
+        :return: None
+        """
+        # Clipping the rotated area is the same as clipping the base one, and keeps the corners in the maps
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + w, self.x_length) - 1, min(y + h, self.y_length) - 1
+        if x1 > x2 or y1 > y2:
+            return
+        x_from_x, x_from_y, y_from_x, y_from_y = self._base_maps
+        base_x1, base_x2 = x_from_x[x1] + x_from_y[y1], x_from_x[x2] + x_from_y[y2]
+        base_y1, base_y2 = y_from_x[x1] + y_from_y[y1], y_from_x[x2] + y_from_y[y2]
+        self._add_dirty(min(base_x1, base_x2), min(base_y1, base_y2),
+                        max(base_x1, base_x2) + 1, max(base_y1, base_y2) + 1)
+
+    def _mark_dirty_base(self, x: int, y: int, w: int, h: int):
+        """
+        Marks an area as modified
+        :param int x: X Coordinate of the upper left corner (base coordinates)
+        :param int y: Y Coordinate of the upper left corner (base coordinates)
+        :param int w: Area width
+        :param int h: Area height
+        :return: None
+        """
+        x1, y1 = max(x, 0), max(y, 0)
+        x2, y2 = min(x + w, self.WIDTH), min(y + h, self.HEIGHT)
+        if x1 < x2 and y1 < y2:
+            self._add_dirty(x1, y1, x2, y2)
+
+    def _add_dirty(self, x1: int, y1: int, x2: int, y2: int):
+        """
+        Adds a modified area. Areas that touch the one being drawn are joined to it, and it is only merged with
+        the rest when an area that doesn't touch it is drawn or the areas are read
+        :param int x1: X Coordinate of the upper left corner (base coordinates)
+        :param int y1: Y Coordinate of the upper left corner (base coordinates)
+        :param int x2: X Coordinate past the lower right corner
+        :param int y2: Y Coordinate past the lower right corner
+        :return: None
+        """
+        last = self._last_merged
+        if last is not None and last[0] <= x1 and last[1] <= y1 and x2 <= last[2] and y2 <= last[3]:
+            return
+        pending = self._pending
+        if pending is not None:
+            px1, py1, px2, py2 = pending
+            if x1 <= px2 and px1 <= x2 and y1 <= py2 and py1 <= y2:
+                self._pending = (min(x1, px1), min(y1, py1), max(x2, px2), max(y2, py2))
+                return
+            self._merge_pending()
+        self._pending = (x1, y1, x2, y2)
+
+    def _merge_pending(self):
+        """
+        Merges the area being drawn with the modified areas it touches. When there are more than
+        MAX_DIRTY_RECTS areas they are joined in one
+        :return: None
+        """
+        if self._pending is None:
+            return
+        x1, y1, x2, y2 = self._pending
+        self._pending = None
+        merged = True
+        while merged:
+            merged = False
+            for rect in self._dirty:
+                rx1, ry1, rx2, ry2 = rect
+                if x1 <= rx2 and rx1 <= x2 and y1 <= ry2 and ry1 <= y2:
+                    x1, y1 = min(x1, rx1), min(y1, ry1)
+                    x2, y2 = max(x2, rx2), max(y2, ry2)
+                    self._dirty.remove(rect)
+                    merged = True
+                    break
+        self._dirty.append((x1, y1, x2, y2))
+        if len(self._dirty) > self.MAX_DIRTY_RECTS:
+            x1 = min(r[0] for r in self._dirty)
+            y1 = min(r[1] for r in self._dirty)
+            x2 = max(r[2] for r in self._dirty)
+            y2 = max(r[3] for r in self._dirty)
+            self._dirty = [(x1, y1, x2, y2)]
+        self._last_merged = self._dirty[-1]
 
     def _get_slice(self, x, y):
         """
@@ -328,6 +887,44 @@ class DisplayBuffer:
         bit = x % 8
         return start, end, bit
 
+    def _bit_address(self, x, y):
+        """
+        Locates the byte and the bit mask of a pixel in the packed buffer
+        :param int x: X coordinate of the pixel
+        :param int y: Y coordinate of the pixel
+        :return tuple: byte address, bit mask (MSB is the leftmost pixel)
+        """
+        address = (y * self._BYTE_WIDTH) + (x // 8)
+        mask = 0x80 >> (x % 8)
+        return address, mask
+
+    def _write_bit(self, x, y, value):
+        """
+        Writes the value of a single pixel in the base (not rotated) coordinates
+        :param int x: X coordinate of the pixel
+        :param int y: Y coordinate of the pixel
+        :param np.uint8 value: Value to set the pixel to (1 or 0)
+        """
+        if self._packed:
+            address, mask = self._bit_address(x, y)
+            for plane, on in self._planes(value):
+                if on:
+                    plane[address] |= mask
+                else:
+                    plane[address] &= ~mask & 0xFF
+        else:
+            start, end, bit = self._get_slice(x, y)
+            self._buffer[start + bit] = value
+
+    def _unpacked(self):
+        """
+        Gives the buffer with one element per pixel, unpacking it if needed
+        :return np.array[np.uint8]: Array of WIDTH*HEIGHT with 1s and 0s
+        """
+        if self._packed:
+            return np.unpackbits(self._buffer)
+        return self._buffer
+
     def pixel_address(self, x: int, y: int):
         """
         Obtains the byte addr that contains the bit representing the pixel at (x, y)
@@ -338,20 +935,25 @@ class DisplayBuffer:
         s, e, b = self._get_slice(x, y)
         return s
 
-    def _valid_coords(self, x, y):
+    def _valid_coords(self, x, y, end=False):
         """
         Validates that the given coordinates are within the display (and buffer) bounds.
 
         :param int x: X coordinate
         :param int y: Y coordinate
+        :param bool end: Also accept the coordinates just past the last pixel, for the end of an area
 
         :raises ValueError: If the flag DisplayBuffer._out_of_bounds_error is set to True and
                             the coordinates are outside of the visible screen
 
         :returns bool: True if they are valid (visible) coordinates, False otherwise
         """
-        within_x = 0 <= x <= self.x_length
-        within_y = 0 <= y <= self.y_length
+        if end:
+            within_x = 0 <= x <= self.x_length
+            within_y = 0 <= y <= self.y_length
+        else:
+            within_x = 0 <= x < self.x_length
+            within_y = 0 <= y < self.y_length
         if within_x and within_y:
             return True
         else:
@@ -363,8 +965,8 @@ class DisplayBuffer:
         """
         Does a tramslation according to the current rotation
 
-        :param int x: X Coordinate to transform
-        :param int y: Y Coordinate to transform
+        :param int x: X Coordinate to transform (or an array of them)
+        :param int y: Y Coordinate to transform (or an array of them)
 
         :return tuple:  The coordinate pair of the base buffer that corresponds to the input
         """
@@ -384,22 +986,20 @@ class DisplayBuffer:
 
         return xn, yn
 
+    @timed("serialize")
     def serialize(self):
         """
         Converts the internal buffer to an array of bytes
 
         :returns np.array[np.uint8]: The internal buffer as an array of bytes
         """
-        bytelist = []
-        total_pixels = self.WIDTH * self.HEIGHT
-        logging.debug(f"The size of serialized buffer is {total_pixels}")
-        for byte in range(int(total_pixels / 8)):
-            start = byte * 8
-            byte_nbr = self.create_byte_from_array(self._buffer[start : start + 8])
-            bytelist.append(np.uint8(byte_nbr))
-        logging.debug(f"Final size of list: {len(bytelist)}")
-        return np.array(bytelist, dtype=np.uint8)
+        if self._packed:
+            view = self._buffer.view()
+            view.flags.writeable = False
+            return view
+        return np.packbits(self._buffer)
 
+    @timed("serialize")
     def serialize_area(self, x: int, y: int, width: int, height: int):
         """
         Serializes an area of the screen
@@ -410,25 +1010,22 @@ class DisplayBuffer:
         :returns: The array of bytes
         :rtype np.array[np.uint8]
         """
-        if not self._valid_coords(x, y) or not self._valid_coords(
-            x + width, y + height
+        if not self._valid_coords(x, y, end=True) or not self._valid_coords(
+            x + width, y + height, end=True
         ):
             logging.warning(f"The specified coordinates are invalid")
             return
         slice_start, _, _ = self._get_slice(x, y)
         _, slice_end, _ = self._get_slice(x + width, y + height)
-        logging.debug(
-            f"Serializing the area ({x}, {y}, {width}, {height}) at [{slice_start}:{slice_end}]"
-        )
         total_bytes = int((slice_end - slice_start) / 8)
-        logging.debug(f"Expecting {total_bytes} bytes")
-        byte_list = []
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Serializing the area ({x}, {y}, {width}, {height}) at [{slice_start}:{slice_end}], "
+                          f"expecting {total_bytes} bytes")
         byte_offset = int(slice_start / 8)
-        for byte in range(byte_offset, byte_offset + total_bytes):
-            start = byte * 8
-            byte_value = self.create_byte_from_array(self._buffer[start : start + 8])
-            byte_list.append(byte_value)
-        return np.array(byte_list, dtype=np.uint8)
+        if self._packed:
+            return self._buffer[byte_offset : byte_offset + total_bytes].copy()
+        start = byte_offset * 8
+        return np.packbits(self._buffer[start : start + total_bytes * 8])
 
     @staticmethod
     def create_byte_from_array(bitarray: np.array):
@@ -477,9 +1074,10 @@ class DisplayBuffer:
         """
         Prints the buffer in a matrix of WIDTH*HEIGHT
         """
+        pixels = self._unpacked()
         for y in range(self.HEIGHT):
             line_offset = y * self.WIDTH
-            logging.debug(self._buffer[line_offset : line_offset + self.WIDTH])
+            logging.debug(pixels[line_offset : line_offset + self.WIDTH])
 
     # █●
     def render(self, on_pixel="█", off_pixel=" "):
@@ -492,38 +1090,109 @@ class DisplayBuffer:
         :rtype str
         """
         lines = []
+        pixels = self._unpacked()
         for line in range(self.HEIGHT):
             line_offset = line * self.WIDTH
-            sliced_buffer = self._buffer[line_offset : line_offset + self.WIDTH]
+            sliced_buffer = pixels[line_offset : line_offset + self.WIDTH]
             ascii_list = [on_pixel if p == 1 else off_pixel for p in sliced_buffer]
             ascii_line = "".join(ascii_list)
             lines.append(ascii_line)
         return "\n".join(lines)
 
-    @staticmethod
-    def _bitmap_to_bytearray(bitmap: list):
+
+class TriColorBuffer(DisplayBuffer):
+    """
+    Display buffer that stores the color of each pixel (black, white or red), so every shape is drawn once
+    for the two RAM planes of a tri-color display. The pixels are stored packed in the two planes, so they are
+    serialized without converting them
+    """
+    BLACK = np.uint8(0)
+    WHITE = np.uint8(1)
+    RED = np.uint8(2)
+
+    def __init__(self, width, height, bg=1, fg=0, metrics: Metrics = None):
+        """
+        Initializes the buffer. The pixels are stored as the B&W plane (1 for white and red pixels) and the RED
+        plane (1 for red pixels), 1 bit per pixel each
+        :param width: Width of the display this buffer models
+        :param height: Height of the display this buffer models
+        :param bg: Background color value (default is 1=white)
+        :param fg: Foreground color value (default is 0=black)
+        :param metrics: Metrics to record the draw and serialize times in, None doesn't measure them
         """
-        Converts a bitmap from a font into a bitmap
+        super().__init__(width, height, bg=bg, fg=fg, packed=True, metrics=metrics)
+        self._red = np.zeros_like(self._buffer)
 
-        :param list bitmap: A list of hex strings, each one represents a line
+    def _planes(self, value: np.uint8):
+        """
+        Gives the packed planes that hold the pixels, and how a color is written in each one: red pixels are
+        white in the B&W plane
+        :param np.uint8 value: Color of the pixels to write
+        :return tuple: 2-tuples of (plane, True to set the bits of the pixels or False to clear them)
+        """
+        return (self._buffer, value != self.BLACK), (self._red, value == self.RED)
 
-        :returns: np.array(np.uint8): The byte array
-                int: The width in bits (pixels) of the bitmap as it might be padded to complete a byte
-                int: The height in bits (pixels) of the bitmap
+    def _draw_base_pixel(self, x: int, y: int, value: np.uint8):
         """
-        byte_list = []
-        bytes_per_line = 0
-        for line in bitmap:
-            nibbles = len(line)
-            bytes_per_line = 0
-            for byte in range(int(nibbles / 2)):
-                first_nibble = line[byte * 2]
-                if byte == nibbles:
-                    second_nibble = 0
-                else:
-                    second_nibble = line[byte * 2 + 1]
-                hex_byte = first_nibble + second_nibble
-                byte_value = np.uint8(int(hex_byte, base=16))
-                byte_list.append(byte_value)
-                bytes_per_line = bytes_per_line + 1
-        return np.array(byte_list), bytes_per_line * 8, len(bitmap)
+        Draws a single pixel in base coordinates without marking it as dirty
+        :param int x: X coordinate of the pixel to draw (base coordinates)
+        :param int y: Y Coordinate of the pixel to draw (base coordinates)
+        :param np.uint8 value: Color of the pixel
+        """
+        index = y * self._BYTE_WIDTH + (x >> 3)
+        bit = 0x80 >> (x & 7)
+        for plane, on in self._planes(value):
+            if on:
+                plane[index] |= bit
+            else:
+                plane[index] &= 0xFF ^ bit
+
+    @timed("draw")
+    def clear_screen(self, value=1):
+        """Sets all the pixels in the screen to the same color
+        :param int value: the color value to fill the screen with (0=black, 1=white or 2=red)
+        """
+        if value in (self.BLACK, self.WHITE, self.RED):
+            self._set_dirty([(0, 0, self.WIDTH, self.HEIGHT)])
+            for plane, on in self._planes(value):
+                plane.fill(0xFF if on else 0x00)
+        else:
+            logging.warning(f"Incorrect color value {value}")
+
+    def get_pixel_value(self, x, y):
+        """Reads the color of the given point (x, y)
+        :param int x: X coordinate of the point
+        :param int y: Y Coordinate of the point
+        :return np.uint8: The color value (0=black, 1=white or 2=red)
+        """
+        value = super().get_pixel_value(x, y)
+        if value:
+            address, mask = self._bit_address(x, y)
+            if self._red[address] & mask:
+                return self.RED
+        return value
+
+    def _unpacked(self):
+        """
+        Gives the buffer with one element per pixel
+        :return np.array[np.uint8]: Array of WIDTH*HEIGHT with the color of each pixel
+        """
+        return np.unpackbits(self._buffer) + np.unpackbits(self._red)
+
+    @timed("serialize")
+    def serialize(self):
+        """
+        Gives the B&W plane of the display. Red pixels are white in this plane
+
+        :returns np.array[np.uint8]: A copy of the B&W plane as an array of bytes
+        """
+        return self._buffer.copy()
+
+    @timed("serialize")
+    def serialize_planes(self):
+        """
+        Gives the B&W and RED planes of the display, in the format of serialize
+
+        :returns tuple: Copies of the B&W and RED planes as arrays of bytes
+        """
+        return self._buffer.copy(), self._red.copy()
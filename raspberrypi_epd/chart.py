@@ -0,0 +1,139 @@
+import numpy as np
+from raspberrypi_epd.buffer import DisplayBuffer
+
+
+class Sparkline:
+    """
+    Rolling time series drawn in an area of a DisplayBuffer, one sample per column. New samples are
+    added on the right: while the area isn't full only their columns are drawn, once it is full the plot
+    is scrolled to the left and only the new columns are drawn.
+    After each draw changed_rect holds the (x, y, width, height) area that changed in the base (not rotated)
+    coordinates of the display, as refresh_area expects it
+    """
+
+    def __init__(self, buffer: DisplayBuffer, x: int, y: int, width: int, height: int,
+                 minimum: float, maximum: float, value: np.uint8 = 0, background: np.uint8 = 1):
+        """
+        Creates the chart. The area isn't cleared until the first call to draw or add
+        :param buffer: The buffer to draw on (e.g. WeAct213.canvas)
+        :param x: X Coordinate of the upper left corner of the chart
+        :param y: Y Coordinate of the upper left corner of the chart
+        :param width: Width of the chart, it is also the number of samples shown
+        :param height: Height of the chart
+        :param minimum: Sample value at the bottom of the chart, lower samples are clipped
+        :param maximum: Sample value at the top of the chart, higher samples are clipped
+        :param value: Value (color) of the trace in the buffer
+        :param background: Value (color) of the background in the buffer
+        """
+        if width <= 0 or height <= 0:
+            raise ValueError("The chart needs a width and height of at least 1 pixel")
+        if maximum <= minimum:
+            raise ValueError("The maximum of the chart has to be greater than its minimum")
+        self._buffer = buffer
+        self.x, self.y = x, y
+        self.width, self.height = width, height
+        self.minimum, self.maximum = minimum, maximum
+        self._value = value
+        self._background = background
+        # Ring buffer of samples, _start is the oldest one
+        self._samples = np.full(width, np.nan)
+        self._start = 0
+        self._count = 0
+        self._drawn = False
+        self.changed_rect = None
+
+    def samples(self):
+        """
+        Gives the samples in the chart
+        :return np.array: The samples from the oldest to the newest, NaN for gaps
+        """
+        return np.roll(self._samples, -self._start)[: self._count]
+
+    def add(self, sample: float):
+        """
+        Adds a sample and draws it. NaN leaves a gap in the trace
+        :param sample: The new sample
+        :return: None
+        """
+        self.extend([sample])
+
+    def extend(self, samples):
+        """
+        Adds a batch of samples and draws them
+        :param samples: List or array with the new samples, oldest first
+        :return: None
+        """
+        samples = np.asarray(samples, dtype=float).ravel()
+        count = samples.size
+        if count == 0:
+            return
+        if count > self.width:
+            # Only the last samples are kept, the trace starts from the sample before them
+            previous = samples[-self.width - 1]
+            samples = samples[-self.width :]
+            count = self.width
+        else:
+            previous = self._samples[(self._start + self._count - 1) % self.width] if self._count else np.nan
+        end = self._start + self._count
+        positions = np.arange(end, end + count) % self.width
+        self._samples[positions] = samples
+        overflow = max(0, self._count + count - self.width)
+        self._start = (self._start + overflow) % self.width
+        self._count = min(self._count + count, self.width)
+        if not self._drawn:
+            self.draw()
+            return
+        if overflow:
+            self._buffer.scroll(self.x, self.y, self.width, self.height, overflow, self._background)
+        column = self._count - count
+        self._draw_columns(column, np.concatenate(([previous], samples)))
+        if overflow:
+            self._set_changed(self.x, self.width)
+        else:
+            self._set_changed(self.x + column, count)
+
+    def draw(self):
+        """
+        Clears the area of the chart and draws all the samples
+        :return: None
+        """
+        self._buffer.fill_rectangle(self.x, self.y, self.width, self.height, self._background)
+        self._drawn = True
+        self._set_changed(self.x, self.width)
+        if self._count:
+            self._draw_columns(0, np.concatenate(([np.nan], self.samples())))
+
+    def _set_changed(self, x: int, width: int):
+        """
+        Sets changed_rect to a range of columns of the chart
+        :param x: X Coordinate of the first column (rotated coordinates)
+        :param width: Number of columns
+        :return: None
+        """
+        self.changed_rect = self._buffer._base_area(x, self.y, x + width, self.y + self.height)
+
+    def _rows(self, samples: np.array):
+        """
+        Scales samples to rows of the chart
+        :param samples: Array of samples
+        :return np.array: The rows (0 is the top), -1 for NaN
+        """
+        scaled = (np.clip(samples, self.minimum, self.maximum) - self.minimum) / (self.maximum - self.minimum)
+        rows = np.rint((self.height - 1) * (1 - scaled))
+        return np.where(np.isnan(samples), -1, rows).astype(int)
+
+    def _draw_columns(self, column: int, samples: np.array):
+        """
+        Draws the trace in a range of columns. Each column covers the rows from its sample to the sample
+        before it, so the trace is connected
+        :param column: First column to draw
+        :param samples: The sample before the first column followed by the samples of the columns
+        :return: None
+        """
+        rows = self._rows(samples)
+        current, previous = rows[1:], rows[:-1]
+        previous = np.where(previous < 0, current, previous)
+        low, high = np.minimum(current, previous), np.maximum(current, previous)
+        row_numbers = np.arange(self.height)[:, np.newaxis]
+        mask = (row_numbers >= low) & (row_numbers <= high) & (current >= 0)
+        self._buffer.draw_mask(mask, self.x + column, self.y, self._value)
@@ -1,5 +1,19 @@
 import numpy as np
 
+__all__ = [
+    "DRIVER_OUTPUT_CONTROL", "GATE_DRIVING_VOLTAGE_CONTROL", "SOURCE_DRIVING_VOLTAGE_CONTRO",
+    "INITIAL_CODE_SETTING_OTP", "WRITE_REGISTER_FOR_ICS", "READ_REGISTER_FOR_ICS", "BOOSTER_SOFT_START_CONTROL",
+    "DEEP_SLEEP_MODE", "DATA_ENTRY_MODE", "SW_RESET", "HV_READY_DETECTION", "VCI_DETECTION", "TEMP_SENSOR_CONTROL",
+    "TEMP_SENSOR_CONTROL_WRITE", "TEMP_SENSOR_CONTROL_READ", "TEMP_SENSOR_CONTROL_EXT", "MASTER_ACTIVATION",
+    "DISPLAY_UPDATE_CONTROL", "DISPLAY_UPDATE_CONTROL_2", "WRITE_RAM_BW", "WRITE_RAM_RED", "READ_RAM",
+    "READ_RAM_OPTION", "SET_RAM_X_STARTEND", "SET_RAM_Y_STARTEND", "AUTO_WRITE_RED_RAM", "AUTO_WRITE_BW_RAM",
+    "SET_RAM_X_ADDR_COUNTER", "SET_RAM_Y_ADDR_COUNTER", "VCOM_SENSE", "VCOM_SENSE_DURATION", "PROGRAM_VCOM_OTP",
+    "WRITE_VCOM_CONTROL", "WRITE_VCOM", "OTP_REG_READ", "USER_ID_READ", "STATUS_BIT_READ", "PROGRAM_WS_OTP",
+    "LOAD_WS_OTP", "WRITE_LUT_REG", "CRC_CALCULATION", "CRC_STATUS_READ", "PROGRAM_OTP_SELECTION", "WRITE_REG_DISPLAY",
+    "WRITE_REG_USERID", "OTP_PROGRAM_MODE", "BORDER_WAVEFORM_CONTROL", "END_OPTION", "NOP", "DEEP_SLEEP_MODE_NORMAL",
+    "DEEP_SLEEP_MODE_ENTER_DSM1", "DEEP_SLEEP_MODE_ENTER_DSM2",
+]
+
 DRIVER_OUTPUT_CONTROL = np.uint8(0x01)
 GATE_DRIVING_VOLTAGE_CONTROL = np.uint8(0x03)
 SOURCE_DRIVING_VOLTAGE_CONTRO = np.uint8(0x04)
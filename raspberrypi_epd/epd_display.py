@@ -2,11 +2,12 @@ import numpy as np
 import raspberrypi_epd.commands as cmd
 import logging
 import time
-import spidev
-import RPi.GPIO as GPIO
 from enum import Enum
-from raspberrypi_epd.buffer import DisplayBuffer
-from bdfparser import Font
+from raspberrypi_epd.buffer import TriColorBuffer
+from raspberrypi_epd.transport import Transport, RPiTransport, LOW, HIGH
+from raspberrypi_epd.fonts import load_font
+from raspberrypi_epd.sequence import CommandSequence
+from raspberrypi_epd.metrics import Metrics
 
 
 class Color(Enum):
@@ -20,6 +21,32 @@ WHITE = np.uint8(0xFF)
 RED = np.uint8(0xFF)
 
 
+def _ram_window_sequence(x: int, y: int, width: int, height: int):
+    """
+    Builds the commands that set a window of the RAM and put the address counters at its start
+    :param x: X Coordinate of the upper left corner
+    :param y: Y Coordinate of the upper left corner
+    :param width: Window width
+    :param height: Window height
+    :return CommandSequence: The commands
+    """
+    start_x_address = x // 8
+    end_x_address = (x + width - 1) // 8
+    end_y = y + height - 1
+    return (
+        CommandSequence()
+        # Set how the addr counter increases: X increase (until WIDTH) then Y increase
+        .add(cmd.DATA_ENTRY_MODE, 0x03)
+        # Start/end positions of the window address in the X direction by 8 times address unit
+        .add(cmd.SET_RAM_X_STARTEND, start_x_address, end_x_address)
+        # Start/end positions of the window address in the Y direction by an address unit
+        .add(cmd.SET_RAM_Y_STARTEND, y % 256, y // 256, end_y % 256, end_y // 256)
+        # X and Y RAM offsets
+        .add(cmd.SET_RAM_X_ADDR_COUNTER, start_x_address)
+        .add(cmd.SET_RAM_Y_ADDR_COUNTER, y % 256, y // 256)
+    )
+
+
 class WeAct213:
     """
     Provides the low level control/writing operations on the display
@@ -34,6 +61,14 @@ class WeAct213:
     FULL_REFRESH_TIME = 4100
     PARTIAL_REFRESH_TIME = 750
     RESET_WAIT_TIME = 10
+    # Longest time the display can be busy before it is considered unresponsive
+    BUSY_TIMEOUT = 10000
+    # Largest single SPI transfer, matches the default buffer size of the spidev kernel driver
+    MAX_TRANSFER_SIZE = 4096
+    # SPI clock speeds tried by probe_spi_speed, the SSD1680 takes writes up to 20 MHz
+    SPI_PROBE_SPEEDS = (1000000, 2000000, 4000000, 8000000, 10000000, 16000000, 20000000)
+    # Changed rows closer than this are sent in the same RAM window
+    WINDOW_JOIN_ROWS = 4
     LUT_PARTIAL = np.array(
         [
             0x00, 0x40, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x80, 0x80, 0x00, 0x00,
@@ -46,37 +81,77 @@ class WeAct213:
             0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
             0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00, 0x00,
             0x22, 0x22, 0x22, 0x22, 0x22, 0x22, 0x00, 0x00, 0x00], dtype=np.uint8)
-
-    def __init__(self, dc: int, cs: int, busy: int, reset: int):
+    # Fixed command sequences, built once
+    STARTUP_SEQUENCE = (
+        CommandSequence()
+        # Set gate driver output
+        .add(cmd.DRIVER_OUTPUT_CONTROL, 0x27, 0x01, 0x00)
+        # Set display RAM size
+        .add(cmd.DATA_ENTRY_MODE, 0x03)
+        # Set panel border
+        .add(cmd.BORDER_WAVEFORM_CONTROL, 0x05)
+        # Sense temp
+        .add(cmd.TEMP_SENSOR_CONTROL, 0x80)
+        # Display update control
+        .add(cmd.DISPLAY_UPDATE_CONTROL, 0x00, 0x80)
+    )
+    PARTIAL_LUT_SEQUENCE = CommandSequence().add(cmd.WRITE_LUT_REG, LUT_PARTIAL)
+    POWER_ON_SEQUENCE = CommandSequence().add(cmd.DISPLAY_UPDATE_CONTROL_2, 0xF8).add(cmd.MASTER_ACTIVATION)
+    POWER_OFF_SEQUENCE = CommandSequence().add(cmd.DISPLAY_UPDATE_CONTROL_2, 0x83).add(cmd.MASTER_ACTIVATION)
+    UPDATE_FULL_SEQUENCE = CommandSequence().add(cmd.DISPLAY_UPDATE_CONTROL_2, 0xF4).add(cmd.MASTER_ACTIVATION)
+    UPDATE_PARTIAL_SEQUENCE = CommandSequence().add(cmd.DISPLAY_UPDATE_CONTROL_2, 0xCC).add(cmd.MASTER_ACTIVATION)
+    FULL_WINDOW_SEQUENCE = _ram_window_sequence(0, 0, WIDTH, HEIGHT)
+
+    def __init__(self, dc: int = None, cs: int = None, busy: int = None, reset: int = None,
+                 transport: Transport = None, busy_timeout: int = None, spi_bus: int = 0, spi_device: int = 0,
+                 spi_speed: int = None, spi_mode: int = 0, max_transfer_size: int = None, metrics: Metrics = None,
+                 spi=None):
         """
         Class constructor. Pin Numbering should be set outside this class (see GPIO.setmode)
         :param dc: Data/Command pin number
         :param cs: Chip Select pin number
         :param busy: BUSY pin number
         :param reset: RESET pin number
-        """
-        self._DC = dc
-        self._CS = cs
-        self._RESET = reset
-        self._BUSY = busy
-        GPIO.setup(self._DC, GPIO.OUT)
-        GPIO.setup(self._CS, GPIO.OUT)
-        GPIO.setup(self._RESET, GPIO.OUT)
-        GPIO.output(self._RESET, GPIO.HIGH)
-        self.BUSY = busy
-        GPIO.setup(self.BUSY, GPIO.IN)
-        self._spi = spidev.SpiDev()
-        self._spi.open(bus=0, device=0)
-        self._spi.max_speed_hz = 500000  # 500KHz
-        self._spi.mode = 0  # Clock polarity/phase
-        self._bw_buffer = DisplayBuffer(self.WIDTH, self.HEIGHT)
-        self._red_buffer = DisplayBuffer(self.WIDTH, self.HEIGHT, bg=0, fg=1)
+        :param transport: Transport to reach the display through. When not given, the pins are used to
+                          create a RPiTransport
+        :param busy_timeout: Time in ms to wait for the display while it is busy (default BUSY_TIMEOUT)
+        :param spi_bus: SPI bus number of the RPiTransport
+        :param spi_device: SPI device number of the RPiTransport
+        :param spi_speed: SPI clock speed in Hz of the RPiTransport (default RPiTransport.DEFAULT_SPI_SPEED),
+                          see probe_spi_speed to find the fastest one for the wiring
+        :param spi_mode: SPI clock polarity/phase mode of the RPiTransport
+        :param max_transfer_size: Largest single SPI transfer in bytes (default MAX_TRANSFER_SIZE), has to fit
+                                  in the buffer of the spidev driver (bufsiz module parameter)
+        :param metrics: Metrics to record the timings, bytes and SPI transactions of the frames in (see the
+                        metrics property)
+        :param spi: An open spidev.SpiDev shared with other displays, for the RPiTransport (see PanelGroup)
+        """
+        if transport is None:
+            transport = RPiTransport(dc=dc, cs=cs, busy=busy, reset=reset, spi_bus=spi_bus, spi_device=spi_device,
+                                     spi_speed=spi_speed, spi_mode=spi_mode, spi=spi)
+        self._transport = transport
+        self._busy_timeout = self.BUSY_TIMEOUT if busy_timeout is None else busy_timeout
+        self._max_transfer_size = self.MAX_TRANSFER_SIZE if max_transfer_size is None else max_transfer_size
+        # Measured time in ms of the last wait for the display and the sum of all of them
+        self.last_busy_time = 0.0
+        self.total_busy_time = 0.0
+        # A refresh was started and hasn't been waited for, and what has to run once it finishes
+        self._refreshing = False
+        self._after_refresh = []
+        # Holds the color of each pixel, as the B&W and RED planes that are written to the display
+        self._canvas = TriColorBuffer(self.WIDTH, self.HEIGHT, metrics=metrics)
+        self._metrics = metrics
+        # perf_counter() when the update being measured was started
+        self._update_started = None
         self.powered = False
         self._using_partial_mode = False
         self._partial_area = (0, 0, 0, 0)
         self._initial_refresh = True
         self._font = None
         self._rotation = 0
+        # Copies of what was last written to the B&W and RED RAM of the display, None when unknown
+        self._bw_ram = None
+        self._red_ram = None
 
     def init(self):
         """
@@ -96,9 +171,7 @@ class WeAct213:
         """
         # Power on
         if not self.powered:
-            self._write_command(cmd.DISPLAY_UPDATE_CONTROL_2)
-            self._write_data_byte(np.uint8(0xF8))
-            self._write_command(cmd.MASTER_ACTIVATION)
+            self._run_sequence(self.POWER_ON_SEQUENCE)
             self._wait_while_busy()
         self.powered = True
         logging.debug("Power on complete")
@@ -109,26 +182,24 @@ class WeAct213:
         :return: None
         """
         if self.powered:
-            self._write_command(cmd.DISPLAY_UPDATE_CONTROL_2)
-            self._write_data_byte(np.uint8(0x83))
-            self._write_command(cmd.MASTER_ACTIVATION)
+            self._run_sequence(self.POWER_OFF_SEQUENCE)
             self._wait_while_busy()
         self.powered = False
         self._using_partial_mode = False
 
     def init_partial(self):
         """
-        Configures the display to initialize the partial update mode
-
-        CURRENTLY DOES NOT WORK
+        Configures the display to initialize the partial update mode. The partial waveform compares the
+        B&W RAM (new image) against the RED RAM (previous image), so the RED RAM is loaded with the
+        B&W image that is on the screen. Partial updates only work with black and white
         :return: None
         """
         logging.debug("Initializing partial update mode")
         self._startup()
-        # self._set_partial_area(0, 0, self.WIDTH, self.HEIGHT)
-        self._write_command(cmd.WRITE_LUT_REG)
-        self._write_data(self.LUT_PARTIAL)
+        self._run_sequence(self.PARTIAL_LUT_SEQUENCE)
         self._power_on()
+        previous = self._bw_ram if self._bw_ram is not None else self._canvas.serialize().reshape(self.HEIGHT, -1)
+        self._write_ram_window(cmd.WRITE_RAM_RED, previous, 0, 0, self.WIDTH, self.HEIGHT)
         self._using_partial_mode = True
 
     def reset(self):
@@ -136,10 +207,14 @@ class WeAct213:
         Hard resets and then Soft reset the display
         """
         logging.debug("Reseting the display")
+        self.wait_until_idle()
+        # The RAM contents are unknown after a reset
+        self._bw_ram = None
+        self._red_ram = None
         # Do a HW Reset
-        GPIO.output(self._RESET, GPIO.LOW)
+        self._transport.set_reset(LOW)
         time.sleep(0.01)
-        GPIO.output(self._RESET, GPIO.HIGH)
+        self._transport.set_reset(HIGH)
         # SW Reset (command 0x12)
         self._write_command(cmd.SW_RESET)
         self._wait_while_busy()
@@ -154,48 +229,96 @@ class WeAct213:
         Frees up the resources used by this class. Must be called once this class is no longer needed
         :return:
         """
-        self._spi.close()
-        GPIO.cleanup()
+        self.wait_until_idle()
+        self._transport.close()
 
     def _wait_while_busy(self):
         """
         Blocks and waits for the display to be able to receibe commands
+        :raises TimeoutError: If the display is still busy after the busy timeout
+        :return: None
+        """
+        start = time.monotonic()
+        if not self._transport.wait_while_busy(self._busy_timeout / 1000):
+            raise TimeoutError(f"The display is still busy after {self._busy_timeout} ms")
+        self.busy_finished(start)
+
+    def busy_finished(self, start: float):
+        """
+        Records the time the display was busy and runs what was waiting for a refresh to finish. Code that
+        waits for the BUSY line itself (e.g. AsyncWeAct213) calls it once the line is low
+        :param start: time.monotonic() when the wait started
         :return: None
         """
-        counter = 0
-        while True:
-            busy = GPIO.input(self.BUSY)
-            if busy == 0:
-                break
-            time.sleep(0.005)
-            counter = counter + 1
-        logging.debug(f"Display was busy for {counter*5} ms")
+        self.last_busy_time = (time.monotonic() - start) * 1000
+        self.total_busy_time += self.last_busy_time
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Display was busy for {self.last_busy_time:.1f} ms")
+        metrics = self._metrics
+        if metrics is not None:
+            metrics.record("busy", self.last_busy_time)
+            if self._refreshing and self._update_started is not None:
+                metrics.record("refresh", (time.perf_counter() - self._update_started) * 1000)
+                self._update_started = None
+                # The frame ends with its refresh, so its busy and refresh times are part of it
+                metrics.end_frame()
+        self._refreshing = False
+        after_refresh, self._after_refresh = self._after_refresh, []
+        for action in after_refresh:
+            action()
+
+    @property
+    def metrics(self):
+        """The Metrics the frames are measured in, None when they aren't measured. It can be changed at any time"""
+        return self._metrics
+
+    @metrics.setter
+    def metrics(self, metrics: Metrics):
+        self._metrics = metrics
+        self._canvas.metrics = metrics
+        self._update_started = None
+
+    @property
+    def refresh_pending(self):
+        """True if a refresh was started without waiting for it to finish"""
+        return self._refreshing
+
+    @property
+    def busy_timeout(self):
+        """Time in ms to wait for the display to be idle before raising TimeoutError"""
+        return self._busy_timeout
+
+    @property
+    def partial_mode(self):
+        """True if the display is set up for the partial waveform (init_partial), False for the full one"""
+        return self._using_partial_mode
+
+    @property
+    def has_shadow(self):
+        """True once what is in the B&W RAM of the display is known, which write_dirty and write_windows need"""
+        return self._bw_ram is not None
+
+    def is_busy(self):
+        """
+        Reads the BUSY line of the display
+        :return: True while the display is busy
+        """
+        return self._transport.read_busy() == HIGH
+
+    def wait_until_idle(self):
+        """
+        Blocks until a refresh started without waiting (wait=False) finishes
+        :return: None
+        """
+        if self._refreshing:
+            self._wait_while_busy()
 
     def _startup(self):
         """
         Initial configuration commands sequence
         :return: None
         """
-        # Send init code
-        #   Set gate driver output (0x01)
-        self._write_command(cmd.DRIVER_OUTPUT_CONTROL)
-        self._write_data_byte(np.uint8(0x27))
-        self._write_data_byte(np.uint8([0x01]))
-        self._write_data_byte(np.uint8([0x00]))
-        #   Set display RAM size (0x11, 0x44, 0x45)
-        self._write_command(cmd.DATA_ENTRY_MODE)
-        self._write_data_byte(np.uint8([0x03]))
-        #   Set panel border (0x3C)
-        self._write_command(cmd.BORDER_WAVEFORM_CONTROL)
-        self._write_data_byte(np.uint8(0x05))
-        #   Sense temp (0x18)
-        self._write_command(cmd.TEMP_SENSOR_CONTROL)
-        self._write_data_byte(np.uint8(0x80))
-        #   Load waveform LUT (0x22, 0x20)
-        # Display update control
-        self._write_command(cmd.DISPLAY_UPDATE_CONTROL)
-        self._write_data_byte(np.uint8(0x00))
-        self._write_data_byte(np.uint8(0x80))
+        self._run_sequence(self.STARTUP_SEQUENCE)
         self._partial_area = (0, 0, self.WIDTH, self.HEIGHT)
 
     def _set_partial_area(self, x, y, width, height):
@@ -207,56 +330,59 @@ class WeAct213:
         :param height: Area height
         :return: None
         """
-        # Set how the addr counter increases: X increase (until WIDTH) then Y increase
-        self._write_command(cmd.DATA_ENTRY_MODE)
-        self._write_data_byte(np.uint8(0x03))
-        # Specify the start/end positions of the window address in the X direction by 8 times address unit
-        self._write_command(cmd.SET_RAM_X_STARTEND)
-        start_x_address = np.uint8(x / 8)
-        end_x_address = np.uint8((x + width - 1) / 8)
-        self._write_data_byte(start_x_address)
-        self._write_data_byte(end_x_address)
-        # Specify the start / end positions of the window address in the Y direction by an address unit.
-        self._write_command(cmd.SET_RAM_Y_STARTEND)
-        start_y_mod = np.uint8(y % 256)
-        start_y_mult = np.uint8(y / 256)
-        self._write_data_byte(start_y_mod)
-        self._write_data_byte(start_y_mult)
-        end_y_mod = np.uint8((y + height - 1) % 256)
-        end_y_mult = np.uint8((y + height - 1) / 256)
-        self._write_data_byte(end_y_mod)
-        self._write_data_byte(end_y_mult)
-        # X RAM Offset
-        self._write_command(cmd.SET_RAM_X_ADDR_COUNTER)
-        self._write_data_byte(start_x_address)
-        # Y RAM Offset
-        self._write_command(cmd.SET_RAM_Y_ADDR_COUNTER)
-        self._write_data_byte(start_y_mod)
-        self._write_data_byte(start_y_mult)
+        self._run_sequence(self._window_sequence(x, y, width, height))
 
-    def _write_command(self, command: np.uint8):
+    def _window_sequence(self, x, y, width, height):
         """
-        Writes a command through the SPI interface to the display with its control lines
-        :param command: The command (byte) to write
+        Gives the commands that set a window of the RAM, the one of the whole screen is built only once
+        :param x: X Coordinate of the upper left corner
+        :param y: Y Coordinate of the upper left corner
+        :param width: Area width
+        :param height: Area height
+        :return CommandSequence: The commands
+        """
+        if x == 0 and y == 0 and width == self.WIDTH and height == self.HEIGHT:
+            return self.FULL_WINDOW_SEQUENCE
+        return _ram_window_sequence(x, y, width, height)
+
+    def _run_sequence(self, sequence: CommandSequence):
+        """
+        Sends a sequence of commands and their data to the display
+        :param sequence: The sequence to send
         :return: None
         """
-        logging.debug(f"Sending command: 0x{command.tobytes().hex()}")
-        GPIO.output(self._DC, GPIO.LOW)
-        GPIO.output(self._CS, GPIO.LOW)
-        self._spi.xfer2(command.tobytes())
-        GPIO.output(self._CS, GPIO.HIGH)
-        GPIO.output(self._DC, GPIO.HIGH)
+        if self._refreshing:
+            # The display doesn't take commands until the refresh in progress is finished
+            self._wait_while_busy()
+        logging.debug("Sending %s", sequence)
+        metrics = self._metrics
+        if metrics is None:
+            sequence.run(self._transport, self._max_transfer_size)
+            return
+        start = time.perf_counter()
+        transfers = sequence.run(self._transport, self._max_transfer_size)
+        metrics.record_transfer((time.perf_counter() - start) * 1000, transfers, sent=sequence.byte_count)
 
-    def _write_data_byte(self, data: np.uint8):
+    def _write_command(self, command: np.uint8):
         """
-        Writes a single byte of data to the SPI bus
-        :param data: The data byte
+        Writes a command through the SPI interface to the display with its control lines
+        :param command: The command (byte) to write
         :return: None
         """
-        # logging.debug(f'Sending data byte: 0x{data.tobytes().hex()}')
-        GPIO.output(self._CS, GPIO.LOW)
-        self._spi.xfer2(data.tobytes())
-        GPIO.output(self._CS, GPIO.HIGH)
+        if self._refreshing:
+            # The display doesn't take commands until the refresh in progress is finished
+            self._wait_while_busy()
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Sending command: 0x{command.tobytes().hex()}")
+        metrics = self._metrics
+        start = time.perf_counter() if metrics is not None else None
+        self._transport.set_dc(LOW)
+        self._transport.set_cs(LOW)
+        self._transport.spi_write(command.tobytes())
+        self._transport.set_cs(HIGH)
+        self._transport.set_dc(HIGH)
+        if metrics is not None:
+            metrics.record_transfer((time.perf_counter() - start) * 1000, 1, sent=1)
 
     def _write_data(self, data: np.array):
         """
@@ -264,50 +390,82 @@ class WeAct213:
         :param data: A sequence of data bytes
         :return: None
         """
-        for byte in data:
-            self._write_data_byte(byte)
-
-    def _update_full(self):
+        payload = np.asarray(data, dtype=np.uint8).tobytes()
+        metrics = self._metrics
+        started = time.perf_counter() if metrics is not None else None
+        self._transport.set_cs(LOW)
+        for start in range(0, len(payload), self._max_transfer_size):
+            self._transport.spi_write(payload[start : start + self._max_transfer_size])
+        self._transport.set_cs(HIGH)
+        if metrics is not None:
+            transfers = -(-len(payload) // self._max_transfer_size)
+            metrics.record_transfer((time.perf_counter() - started) * 1000, transfers, sent=len(payload))
+
+    def _read_data(self, count: int):
+        """
+        Reads multiple data bytes in a sequence from the display
+        :param count: Number of bytes to read
+        :return bytes: The bytes read
+        """
+        data = bytearray()
+        metrics = self._metrics
+        started = time.perf_counter() if metrics is not None else None
+        self._transport.set_cs(LOW)
+        for start in range(0, count, self._max_transfer_size):
+            data += self._transport.spi_read(min(self._max_transfer_size, count - start))
+        self._transport.set_cs(HIGH)
+        if metrics is not None:
+            transfers = -(-count // self._max_transfer_size)
+            metrics.record_transfer((time.perf_counter() - started) * 1000, transfers, received=count)
+        return bytes(data)
+
+    def _update_full(self, wait=True):
         """
         Updates the whole screen
+        :param wait: Block until the refresh finishes
         :return: None
         """
-        self._write_command(cmd.DISPLAY_UPDATE_CONTROL_2)
-        self._write_data_byte(np.uint8(0xF4))
-        self._write_command(cmd.MASTER_ACTIVATION)
-        self._wait_while_busy()
+        self._start_update(self.UPDATE_FULL_SEQUENCE, wait)
 
-    def _update_partial(self):
+    def _update_partial(self, wait=True):
         """
         Make a partial update on the screen
+        :param wait: Block until the refresh finishes
         :return:
         """
-        self._write_command(cmd.DISPLAY_UPDATE_CONTROL_2)
-        self._write_data_byte(np.uint8(0xCC))  # F7
-        self._write_command(cmd.MASTER_ACTIVATION)
-        self._wait_while_busy()
+        self._start_update(self.UPDATE_PARTIAL_SEQUENCE, wait)
 
-    def fill(self, color: Color):
+    def _start_update(self, sequence: CommandSequence, wait=True):
+        """
+        Sends a sequence that ends activating an update of the screen
+        :param sequence: The sequence to send
+        :param wait: Block until the refresh finishes
+        :return: None
+        """
+        self._run_sequence(sequence)
+        self._refreshing = True
+        if self._metrics is not None:
+            self._update_started = time.perf_counter()
+        if wait:
+            self._wait_while_busy()
+
+    def fill(self, color: Color, wait=True):
         """
         Fills the whole screen with the specified color
         :param color: The Color to paint the screen
+        :param wait: Block until the refresh finishes
         :return: None
         """
-        if color == Color.RED:
-            logging.debug("Filling the screen with RED color")
-            self._bw_buffer.clear_screen(0)
-            self._red_buffer.clear_screen(1)
-        else:
-            logging.debug(f"Filling the screen with {color.value}")
-            self._bw_buffer.clear_screen(color.value)
-            self._red_buffer.clear_screen(0)
-        logging.debug(
-            f"Sampling B&W RAM (0,0): 0x{self._bw_buffer.get_pixel_byte(0, 0).tobytes().hex()}"
-        )
-        logging.debug(
-            f"Sampling RED RAM (0,0): 0x{self._red_buffer.get_pixel_byte(0, 0).tobytes().hex()}"
-        )
-        self.write_buffer()
+        self._canvas.clear_screen(color.value)
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Filling the screen with {color.name}, "
+                          f"B&W RAM (0,0): 0x{self._canvas.get_pixel_byte(0, 0).tobytes().hex()}")
+        self.write_buffer(wait=wait)
+
+    @property
+    def canvas(self):
+        """The TriColorBuffer that is drawn on, for widgets that draw on a buffer (e.g. Sparkline)"""
+        return self._canvas
 
     def set_rotation(self, degrees: int):
         """
@@ -315,60 +473,254 @@ class WeAct213:
         :param degrees: One of [0, 90, 180, 270]
         :return: None
         """
-        self._bw_buffer.rotate(degrees)
-        self._red_buffer.rotate(degrees)
+        self._canvas.rotate(degrees)
 
-    def write_buffer(self):
+    def write_buffer(self, force=False, wait=True):
         """
-        Writes the complete buffers (B&W and Red) to the display
+        Writes the buffers (B&W and Red) to the display. Only the rows and bytes that changed since the
+        last write are sent, and if nothing changed the display isn't refreshed
+        :param force: Write the complete buffers and refresh even if they didn't change
+        :param wait: Block until the refresh finishes
         :return: None
         """
-        self._set_partial_area(0, 0, self.WIDTH, self.HEIGHT)
-        # After this command, data entries will be written into the BW RAM until another command is written.
-        self._write_command(cmd.WRITE_RAM_BW)
-        bw_buffer_bytes = self._bw_buffer.serialize()
-        self._write_data(bw_buffer_bytes)
-        self._write_command(cmd.WRITE_RAM_RED)
-        red_buffer_bytes = self._red_buffer.serialize()
-        logging.debug(red_buffer_bytes)
-        self._write_data(red_buffer_bytes)
-        self._update_partial()
+        bw_buffer_bytes, red_buffer_bytes = self._canvas.serialize_planes()
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"RED plane: {red_buffer_bytes}")
+        self._canvas.clear_dirty()
+        self.write_planes(bw_buffer_bytes, red_buffer_bytes, force, wait)
+
+    def snapshot(self):
+        """
+        Serializes the canvas as it is now, so drawing can go on while the planes are written with write_planes
+        :return tuple: The B&W and RED planes, in the format of DisplayBuffer.serialize
+        """
+        planes = self._canvas.serialize_planes()
+        self._canvas.clear_dirty()
+        return planes
 
-    def refresh(self, partial_mode=True):
+    def write_planes(self, bw_buffer_bytes: np.array, red_buffer_bytes: np.array, force=False, wait=True):
+        """
+        Writes already serialized planes to the display, like write_buffer does with the buffers. Only the rows
+        and bytes that changed since the last write are sent
+        :param bw_buffer_bytes: The B&W plane, in the format of DisplayBuffer.serialize
+        :param red_buffer_bytes: The RED plane, in the format of DisplayBuffer.serialize
+        :param force: Write the complete planes and refresh even if they didn't change
+        :param wait: Block until the refresh finishes
+        :return: None
+        """
+        if self._using_partial_mode:
+            # The partial waveform and the RED RAM contents of the partial mode can't show the red plane
+            self.init()
+        bw_plane = bw_buffer_bytes.reshape(self.HEIGHT, -1)
+        red_plane = red_buffer_bytes.reshape(self.HEIGHT, -1)
+        bw_windows = self._changed_windows(None if force else self._bw_ram, bw_plane)
+        red_windows = self._changed_windows(None if force else self._red_ram, red_plane)
+        if not bw_windows and not red_windows:
+            logging.debug("The buffers didn't change, skipping the update")
+            return
+        for window in bw_windows:
+            self._write_ram_window(cmd.WRITE_RAM_BW, bw_plane, *window)
+        for window in red_windows:
+            self._write_ram_window(cmd.WRITE_RAM_RED, red_plane, *window)
+        self._update_partial(wait)
+
+    def _changed_windows(self, ram: np.array, plane: np.array):
+        """
+        Finds the windows that cover the differences between a plane and the RAM contents of the display.
+        Changed rows are grouped in bands (close bands are joined, as each window has a setup cost) and
+        each band covers the bytes that changed in any of its rows
+        :param ram: What was written to the RAM with shape (HEIGHT, WIDTH / 8), None if it is unknown
+        :param plane: The new plane as bytes, with the same shape
+        :return list: List of 4-tuples (x, y, width, height), byte aligned
+        """
+        if ram is None:
+            return [(0, 0, self.WIDTH, self.HEIGHT)]
+        changed = ram != plane
+        rows = np.flatnonzero(changed.any(axis=1))
+        if rows.size == 0:
+            return []
+        breaks = np.flatnonzero(np.diff(rows) > self.WINDOW_JOIN_ROWS + 1)
+        starts = np.concatenate(([rows[0]], rows[breaks + 1]))
+        ends = np.concatenate((rows[breaks], [rows[-1]])) + 1
+        windows = []
+        for start, end in zip(starts, ends):
+            columns = np.flatnonzero(changed[start:end].any(axis=0))
+            x = int(columns[0]) * 8
+            width = (int(columns[-1]) + 1) * 8 - x
+            windows.append((x, int(start), width, int(end - start)))
+        return windows
+
+    def write_dirty(self, wait=True):
+        """
+        Writes only the areas drawn since the last write to the display and refreshes them with the partial
+        waveform. Only the B&W plane is updated (red pixels are shown white), use write_buffer to show red
+        :param wait: Block until the refresh finishes
+        :return: None
+        """
+        rects = self._canvas.dirty_rects()
+        self._canvas.clear_dirty()
+        if not rects:
+            return
+        if self._bw_ram is None:
+            # Without knowing what is on the screen the partial waveform can't be used
+            self.write_buffer(wait=wait)
+            return
+        self.write_windows(rects, self._canvas.serialize(), wait)
+
+    def write_windows(self, rects: list, bw_buffer_bytes: np.array, wait=True):
+        """
+        Writes areas of an already serialized B&W plane to the display and refreshes them with the partial
+        waveform, like write_dirty does with the areas drawn on the canvas
+        :param rects: List of 4-tuples (x, y, width, height) in base coordinates, as given by dirty_rects
+        :param bw_buffer_bytes: The B&W plane, in the format of DisplayBuffer.serialize
+        :param wait: Block until the refresh finishes
+        :raises ValueError: If what is on the screen isn't known yet (see has_shadow)
+        :return: None
+        """
+        if self._bw_ram is None:
+            raise ValueError("The partial waveform needs the screen contents, write the whole planes first")
+        windows = [self._byte_aligned(*rect) for rect in rects]
+        if not windows:
+            return
+        if not self._using_partial_mode:
+            self.init_partial()
+        bw_plane = bw_buffer_bytes.reshape(self.HEIGHT, -1)
+        for window in windows:
+            self._write_ram_window(cmd.WRITE_RAM_BW, bw_plane, *window)
+
+        def keep_previous_image():
+            # The image just shown is the previous image of the next partial update
+            for area in windows:
+                self._write_ram_window(cmd.WRITE_RAM_RED, bw_plane, *area)
+
+        self._after_refresh.append(keep_previous_image)
+        self._update_partial(wait)
+
+    def _write_ram_window(self, ram: np.uint8, plane: np.array, x: int, y: int, width: int, height: int):
+        """
+        Writes a byte aligned window of a plane into one of the RAMs of the display
+        :param ram: The RAM to write, cmd.WRITE_RAM_BW or cmd.WRITE_RAM_RED
+        :param plane: The whole plane as bytes, with shape (HEIGHT, WIDTH / 8)
+        :param x: X Coordinate of the upper left corner (multiple of 8)
+        :param y: Y Coordinate of the upper left corner
+        :param width: Window width (multiple of 8)
+        :param height: Window height
+        :return: None
+        """
+        window = plane[y : y + height, x // 8 : (x + width) // 8]
+        # After the RAM command, data entries will be written into the RAM until another command is written.
+        self._run_sequence(self._window_sequence(x, y, width, height) + CommandSequence().add(ram, window))
+        shadow = self._bw_ram if ram == cmd.WRITE_RAM_BW else self._red_ram
+        if shadow is None:
+            if x != 0 or y != 0 or width != self.WIDTH or height != self.HEIGHT:
+                return
+            shadow = np.empty((self.HEIGHT, self.WIDTH // 8), dtype=np.uint8)
+            if ram == cmd.WRITE_RAM_BW:
+                self._bw_ram = shadow
+            else:
+                self._red_ram = shadow
+        shadow[y : y + height, x // 8 : (x + width) // 8] = window
+
+    def _read_ram_window(self, ram: np.uint8, x: int, y: int, width: int, height: int):
+        """
+        Reads a byte aligned window of one of the RAMs of the display. The SDA line of the display has to be
+        readable by the SPI controller (e.g. connected to MISO through a resistor)
+        :param ram: The RAM to read, cmd.WRITE_RAM_BW or cmd.WRITE_RAM_RED
+        :param x: X Coordinate of the upper left corner (multiple of 8)
+        :param y: Y Coordinate of the upper left corner
+        :param width: Window width (multiple of 8)
+        :param height: Window height
+        :return np.array: The window as bytes, with shape (height, width / 8)
+        """
+        option = CommandSequence().add(cmd.READ_RAM_OPTION, 0x00 if ram == cmd.WRITE_RAM_BW else 0x01)
+        self._run_sequence(option + self._window_sequence(x, y, width, height) + CommandSequence().add(cmd.READ_RAM))
+        # The first byte read after the command is a dummy byte
+        data = self._read_data(height * (width // 8) + 1)[1:]
+        return np.frombuffer(data, dtype=np.uint8).reshape(height, width // 8)
+
+    def probe_spi_speed(self, speeds: list = None):
+        """
+        Finds the fastest SPI clock speed that the wiring of the display transfers reliably. At each speed, from
+        the slowest, a test pattern is written to the B&W RAM and read back at the current speed, which has to
+        be reliable. The probe stops at the first speed that corrupts the pattern.
+        The B&W RAM is overwritten, so the next write sends the whole plane again. Reading needs the SDA line of
+        the display to be readable (see _read_ram_window)
+        :param speeds: Speeds to try in Hz (default SPI_PROBE_SPEEDS)
+        :return int: The fastest reliable speed, the transport is left at it. None if none of them was reliable,
+                     then the transport is left at the current speed
+        """
+        self.wait_until_idle()
+        read_speed = self._transport.get_spi_speed()
+        pattern = np.random.default_rng(0x1680).integers(0, 256, (self.HEIGHT, self.WIDTH // 8), dtype=np.uint8)
+        best = None
+        try:
+            for speed in sorted(self.SPI_PROBE_SPEEDS if speeds is None else speeds):
+                self._transport.set_spi_speed(speed)
+                self._write_ram_window(cmd.WRITE_RAM_BW, pattern, 0, 0, self.WIDTH, self.HEIGHT)
+                self._transport.set_spi_speed(read_speed)
+                if not np.array_equal(self._read_ram_window(cmd.WRITE_RAM_BW, 0, 0, self.WIDTH, self.HEIGHT),
+                                      pattern):
+                    logging.debug(f"The test pattern was corrupted at {speed} Hz")
+                    break
+                best = speed
+        finally:
+            self._bw_ram = None
+            self._transport.set_spi_speed(read_speed if best is None else best)
+        logging.debug(f"Fastest reliable SPI speed: {best} Hz")
+        return best
+
+    def _byte_aligned(self, x: int, y: int, width: int, height: int):
+        """
+        Extends an area horizontally to whole bytes, as the RAM windows of the display are set
+        :param x: X Coordinate of the upper left corner
+        :param y: Y Coordinate of the upper left corner
+        :param width: Area width
+        :param height: Area height
+        :return: 4-tuple with the aligned (x, y, width, height)
+        """
+        x1 = (x // 8) * 8
+        x2 = min(((x + width + 7) // 8) * 8, self.WIDTH)
+        return x1, y, x2 - x1, height
+
+    def refresh(self, partial_mode=True, wait=True):
         """
         Refreshes the screen
         :param partial_mode:
+        :param wait: Block until the refresh finishes
         :return:
         """
         if partial_mode:
-            self.refresh_area(0, 0, self.WIDTH, self.HEIGHT)
+            self.refresh_area(0, 0, self.WIDTH, self.HEIGHT, wait)
         else:
             if self._using_partial_mode:
                 self.init()
-            self._update_full()
+                # The RED RAM was holding the previous B&W image
+                red_plane = self._canvas.serialize_planes()[1].reshape(self.HEIGHT, -1)
+                self._write_ram_window(cmd.WRITE_RAM_RED, red_plane, 0, 0, self.WIDTH, self.HEIGHT)
+            self._update_full(wait)
 
-    def refresh_area(self, x, y, width, height):
+    def refresh_area(self, x, y, width, height, wait=True):
         """
         Refreshes a partial area of the screen
         :param x: X Coordinate of the upper left corner
         :param y: Y Coordinate of the upper left corner
         :param width: Area width
         :param height: Area height
+        :param wait: Block until the refresh finishes
         :return: None
         """
         x1, y1, w1, h1 = self._get_visible_bbox(x, y, width, height)
         if not self._using_partial_mode:
             self.init()
-        self._set_partial_area(x1, y1, w1, h1)
-        self._update_partial()
+        self._start_update(self._window_sequence(x1, y1, w1, h1) + self.UPDATE_PARTIAL_SEQUENCE, wait)
 
     def set_font(self, path: str):
         """
-        Sets the font to draw text with.
-        :param path: The path to a bfd font in the local filesystem
+        Sets the font to draw text with. Fonts are loaded once per process (see load_font)
+        :param path: The path to a bfd font in the local filesystem, or to a font compiled with compile_font
         :return: None
         """
-        self._font = Font(path)
+        self._font = load_font(path)
 
     def draw_pixel(self, x: int, y: int, color: Color):
         """
@@ -378,37 +730,24 @@ class WeAct213:
         :param color: Color (enum) of the pixel
         :return: None
         """
-        if color is Color.BLACK or color is Color.WHITE:
-            color_value = np.uint8(0) if color is Color.BLACK else np.uint8(1)
-            self._bw_buffer.draw_pixel(x, y, color_value)
-            self._red_buffer.draw_pixel(x, y, np.uint8(0))
-        else:
-            self._red_buffer.draw_pixel(x, y, np.uint8(1))
+        self._canvas.draw_pixel(x, y, np.uint8(color.value))
 
-    def draw_line(self, x1: int, y1: int, x2: int, y2: int, color: Color):
+    def draw_line(self, x1: int, y1: int, x2: int, y2: int, color: Color, line_width: int = 1):
         """
-        Draw a line in the screen. It only has a width of 1 pixel
+        Draw a line in the screen
         :param x1: X Coordinate of the starting point
         :param y1: Y Coordinate of the starting point
         :param x2: X Coordinate of the end point
         :param y2: Y Coordinate of the end point
         :param color: Color (enum) of the line
+        :param line_width: Width of the line in pixels
         :return: None
         """
-        logging.debug("Drawing a line")
-        if x1 == x2 and y1 == y2:
+        if x1 == x2 and y1 == y2 and line_width <= 1:
+            # Same start/end points
             self.draw_pixel(x1, y1, color)
-            logging.debug(f"Same start/end points. Drawing a pixel at ({x1},{y1})")
             return
-        if color is Color.BLACK or color is Color.WHITE:
-            color_value = np.uint8(0) if color is Color.BLACK else np.uint8(1)
-            logging.debug(f"Line will be drawn to B&W with value {color_value}")
-            self._bw_buffer.draw_line(x1, y1, x2, y2, color_value)
-            self._red_buffer.draw_line(x1, y1, x2, y2, np.uint8(0))
-        else:
-            # Doesn't matter what it's written in the B&W buffer
-            logging.debug("Line will be drawn to RED buffer")
-            self._red_buffer.draw_line(x1, y1, x2, y2, np.uint8(1))
+        self._canvas.draw_line(x1, y1, x2, y2, np.uint8(color.value), line_width)
 
     def draw_bitmap(self, bitmap: np.array, x: int, y: int, width: int, height: int, color: Color):
         """
@@ -423,12 +762,7 @@ class WeAct213:
         :param color: Color (enum) to paint the bitmap with
         :return: None
         """
-        if color is Color.BLACK or color is Color.WHITE:
-            color_value = np.uint8(0) if color is Color.BLACK else np.uint8(1)
-            self._bw_buffer.draw_bitmap(bitmap, x, y, width, height, color_value)
-            self._red_buffer.draw_bitmap(bitmap, x, y, width, height, np.uint8(0))
-        else:
-            self._red_buffer.draw_bitmap(bitmap, x, y, width, height, np.uint8(1))
+        self._canvas.draw_bitmap(bitmap, x, y, width, height, np.uint8(color.value))
 
     def draw_text(self, text: str, x: int, y: int, color: Color):
         """
@@ -442,45 +776,64 @@ class WeAct213:
         if self._font is None:
             logging.warning('Font is not set!')
             return
-        if color is Color.BLACK or color is Color.WHITE:
-            color_value = np.uint8(0) if color is Color.BLACK else np.uint8(1)
-            self._bw_buffer.draw_text(text, self._font, x, y, color_value)
-            self._red_buffer.draw_text(text, self._font, x, y, np.uint8(0))
-        else:
-            self._red_buffer.draw_text(text, self._font, x, y, np.uint8(1))
+        self._canvas.draw_text(text, self._font, x, y, np.uint8(color.value))
 
-    def draw_circle(self, x: int, y: int, r: int, color: Color):
+    def draw_circle(self, x: int, y: int, r: int, color: Color, line_width: int = 1):
         """
-        Draws a circle in the screen. It is limited to be drawn with a 1 pixel width line
+        Draws the outline of a circle in the screen
         :param x: X Coordinate of the circle's center
         :param y: Y Coordinate of the circle's center
         :param r: Radius of the circle
         :param color: Color (enum) of the circle
+        :param line_width: Width of the line in pixels, drawn inwards from the radius
         :return: None
         """
-        if color is Color.BLACK or color is Color.WHITE:
-            color_value = np.uint8(0) if color is Color.BLACK else np.uint8(1)
-            self._bw_buffer.draw_circle(x, y, r, color_value)
-            self._red_buffer.draw_circle(x, y, r, np.uint(0))
-        else:
-            self._red_buffer.draw_circle(x, y, r, np.uint8(1))
+        self._canvas.draw_circle(x, y, r, np.uint8(color.value), line_width)
 
-    def draw_rectangle(self, x: int, y: int, width: int, height: int, color: Color):
+    def draw_rectangle(self, x: int, y: int, width: int, height: int, color: Color, line_width: int = 1):
         """
-        Draws a rectangle of the specified characteristics. Limited to 1 pixel lines and no fill
+        Draws a rectangle of the specified characteristics, with no fill
         :param x: X Coordinate of the upper left corner
         :param y: Y Coordinate of the upper left corner
         :param width: Width of the rectangle
         :param height: Height of the rectangle
         :param color: Color of the lines
+        :param line_width: Width of the lines in pixels, drawn inwards
         :return: None
         """
-        if color is Color.BLACK or color is Color.WHITE:
-            color_value = np.uint8(0) if color is Color.BLACK else np.uint8(1)
-            self._bw_buffer.draw_rectangle(x, y, width, height, color_value)
-            self._red_buffer.draw_rectangle(x, y, width, height, 0)
-        else:
-            self._red_buffer.draw_rectangle(x, y, width, height, np.uint8(1))
+        self._canvas.draw_rectangle(x, y, width, height, np.uint8(color.value), line_width)
+
+    def fill_rectangle(self, x: int, y: int, width: int, height: int, color: Color):
+        """
+        Fills a rectangle of width by height pixels
+        :param x: X Coordinate of the upper left corner
+        :param y: Y Coordinate of the upper left corner
+        :param width: Width of the rectangle
+        :param height: Height of the rectangle
+        :param color: Color (enum) to fill the rectangle with
+        :return: None
+        """
+        self._canvas.fill_rectangle(x, y, width, height, np.uint8(color.value))
+
+    def fill_circle(self, x: int, y: int, r: int, color: Color):
+        """
+        Draws a filled circle in the screen
+        :param x: X Coordinate of the circle's center
+        :param y: Y Coordinate of the circle's center
+        :param r: Radius of the circle
+        :param color: Color (enum) to fill the circle with
+        :return: None
+        """
+        self._canvas.fill_circle(x, y, r, np.uint8(color.value))
+
+    def fill_polygon(self, points: list, color: Color):
+        """
+        Draws a filled polygon in the screen
+        :param points: List of 2-tuples with the vertices (x, y)
+        :param color: Color (enum) to fill the polygon with
+        :return: None
+        """
+        self._canvas.fill_polygon(points, np.uint8(color.value))
 
     def _get_visible_bbox(self, x, y, w, h):
         """
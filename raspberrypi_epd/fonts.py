@@ -0,0 +1,232 @@
+import argparse
+import os
+import threading
+import numpy as np
+import weakref
+from collections import OrderedDict
+
+
+class FontAtlas:
+    """
+    Keeps the glyphs of a BDF font already rasterized, so text can be rendered by composing them
+    instead of going through bdfparser on every call
+    """
+    # Atlases already built for a Font object, see FontAtlas.of
+    _atlases = weakref.WeakKeyDictionary()
+
+    def __init__(self, font, cache_size: int = 256):
+        """
+        Builds the atlas of a font. The glyphs are rasterized the first time they are used
+        :param font: The bdfparser Font object
+        :param cache_size: Maximum number of glyphs kept, the least recently used are discarded first
+        """
+        self._font = font
+        headers = font.headers
+        self.FBBX = headers["fbbx"]
+        self.FBBY = headers["fbby"]
+        self._default_advance = headers.get("dwx0") or headers.get("dwy0")
+        self._init_cache(cache_size)
+
+    def _init_cache(self, cache_size: int):
+        """
+        Creates the (empty) cache of rasterized glyphs, once the font bounding box is known
+        :param cache_size: Maximum number of glyphs kept
+        :return: None
+        """
+        self._cache_size = cache_size
+        self._glyphs = OrderedDict()
+        self._empty = np.zeros((self.FBBY, self.FBBX), dtype=bool)
+
+    @classmethod
+    def of(cls, font):
+        """
+        Gives the atlas of a font, building it only the first time
+        :param font: The bdfparser Font object
+        :return FontAtlas: The atlas of the font
+        """
+        atlas = cls._atlases.get(font)
+        if atlas is None:
+            atlas = cls(font)
+            cls._atlases[font] = atlas
+        return atlas
+
+    def glyph(self, codepoint: int):
+        """
+        Gives a rasterized glyph. Each glyph is drawn in the font bounding box, so they all have the same size
+        and their baselines are aligned
+        :param codepoint: Unicode code point of the character
+        :return tuple: Boolean array with shape (FBBY, FBBX) and the advance (pixels to the next glyph)
+        """
+        glyph = self._glyphs.get(codepoint)
+        if glyph is not None:
+            self._glyphs.move_to_end(codepoint)
+            return glyph
+        glyph = self._rasterize(codepoint)
+        self._glyphs[codepoint] = glyph
+        if len(self._glyphs) > self._cache_size:
+            self._glyphs.popitem(last=False)
+        return glyph
+
+    def _rasterize(self, codepoint: int):
+        """
+        Draws a glyph with bdfparser
+        :param codepoint: Unicode code point of the character
+        :return tuple: Boolean array with shape (FBBY, FBBX) and the advance
+        """
+        if codepoint in self._font.glyphs:
+            font_glyph = self._font.glyphbycp(codepoint)
+            mask = np.array(font_glyph.draw().todata(2), dtype=bool).reshape(self.FBBY, self.FBBX)
+            advance = font_glyph.meta["dwx0"] or font_glyph.meta["dwy0"]
+            if advance is None:
+                advance = self._default_advance
+            if advance is None:
+                advance = self.FBBX
+        else:
+            # bdfparser draws missing characters as an empty glyph without advance
+            mask, advance = self._empty, 0
+        return mask, advance
+
+    def render(self, text: str):
+        """
+        Renders a line of text, with the same layout as Font.draw of bdfparser
+        :param text: The string to render
+        :return np.array: Boolean array with shape (FBBY, width), True where a pixel is set
+        """
+        glyphs = [self.glyph(ord(char)) for char in text]
+        if not glyphs:
+            return np.zeros((self.FBBY, 0), dtype=bool)
+        positions = np.cumsum([0] + [advance for _, advance in glyphs[:-1]])
+        width = int(positions.max()) + self.FBBX
+        bitmap = np.zeros((self.FBBY, width), dtype=bool)
+        for (mask, _), position in zip(glyphs, positions):
+            bitmap[:, position : position + self.FBBX] |= mask
+        return bitmap
+
+
+class CompiledFont(FontAtlas):
+    """
+    Font compiled with compile_font. The glyphs are already rasterized and packed in the file, which is
+    memory-mapped, so loading it doesn't parse anything and only the glyphs used are read.
+    File layout (little endian):
+    - Header: magic, FBBX, FBBY and number of glyphs (see HEADER)
+    - Metrics table sorted by code point: code point and advance of each glyph (see METRICS)
+    - Bitmaps: FBBY rows of ceil(FBBX / 8) bytes per glyph, MSB first, in the order of the metrics table
+    """
+    MAGIC = b"EPDFONT1"
+    HEADER = np.dtype([("magic", "S8"), ("fbbx", "<u2"), ("fbby", "<u2"), ("count", "<u4")])
+    METRICS = np.dtype([("codepoint", "<u4"), ("advance", "<i4")])
+
+    def __init__(self, path: str, cache_size: int = 256):
+        """
+        Maps a compiled font file
+        :param path: Path to the file written by compile_font
+        :param cache_size: Maximum number of unpacked glyphs kept, the least recently used are discarded first
+        :raises ValueError: If the file isn't a compiled font
+        """
+        header = np.fromfile(path, dtype=self.HEADER, count=1)
+        if header.size == 0 or header["magic"][0] != self.MAGIC:
+            raise ValueError(f"{path} is not a compiled font")
+        self.FBBX = int(header["fbbx"][0])
+        self.FBBY = int(header["fbby"][0])
+        count = int(header["count"][0])
+        metrics = np.memmap(path, dtype=self.METRICS, mode="r", offset=self.HEADER.itemsize, shape=(count,))
+        self._codepoints = metrics["codepoint"]
+        self._advances = metrics["advance"]
+        self._bitmaps = np.memmap(path, dtype=np.uint8, mode="r",
+                                  offset=self.HEADER.itemsize + metrics.nbytes,
+                                  shape=(count, self.FBBY, (self.FBBX + 7) // 8))
+        self._init_cache(cache_size)
+
+    @classmethod
+    def is_compiled(cls, path: str):
+        """
+        Checks if a file is a compiled font
+        :param path: Path to the file
+        :return bool: True if it starts with the magic of the compiled fonts
+        """
+        with open(path, "rb") as file:
+            return file.read(len(cls.MAGIC)) == cls.MAGIC
+
+    def _rasterize(self, codepoint: int):
+        """
+        Unpacks a glyph from the file
+        :param codepoint: Unicode code point of the character
+        :return tuple: Boolean array with shape (FBBY, FBBX) and the advance
+        """
+        index = int(np.searchsorted(self._codepoints, codepoint))
+        if index >= self._codepoints.size or self._codepoints[index] != codepoint:
+            return self._empty, 0
+        mask = np.unpackbits(self._bitmaps[index], axis=1)[:, : self.FBBX].astype(bool)
+        return mask, int(self._advances[index])
+
+
+def read_bdf(path: str):
+    """
+    Parses a BDF font with bdfparser
+    :param path: Path to the BDF font
+    :return Font: The bdfparser Font object
+    """
+    # Imported here so the package can be imported without bdfparser, e.g. to use only compiled fonts
+    from bdfparser import Font
+
+    return Font(path)
+
+
+def compile_font(bdf_path: str, output_path: str):
+    """
+    Rasterizes every glyph of a BDF font and writes them in the format of CompiledFont
+    :param bdf_path: Path to the BDF font
+    :param output_path: Path of the compiled font to write
+    :return int: Number of glyphs written
+    """
+    font = read_bdf(bdf_path)
+    atlas = FontAtlas(font, cache_size=0)
+    # Glyphs without an encoding (-1) can't be used in text
+    codepoints = sorted(codepoint for codepoint in font.glyphs if codepoint >= 0)
+    glyphs = [atlas._rasterize(codepoint) for codepoint in codepoints]
+    header = np.array([(CompiledFont.MAGIC, atlas.FBBX, atlas.FBBY, len(codepoints))], dtype=CompiledFont.HEADER)
+    metrics = np.array([(codepoint, advance) for codepoint, (_, advance) in zip(codepoints, glyphs)],
+                       dtype=CompiledFont.METRICS)
+    bitmaps = np.packbits(np.array([mask for mask, _ in glyphs], dtype=bool).reshape(-1, atlas.FBBY, atlas.FBBX),
+                          axis=2)
+    with open(output_path, "wb") as file:
+        file.write(header.tobytes())
+        file.write(metrics.tobytes())
+        file.write(bitmaps.tobytes())
+    return len(codepoints)
+
+
+# Fonts already loaded by load_font, keyed by (absolute path, modification time)
+_loaded_fonts = {}
+_loaded_fonts_lock = threading.Lock()
+
+
+def load_font(path: str):
+    """
+    Loads a font once per process. A font is loaded again only if its file was modified
+    :param path: Path to a BDF font or a font compiled with compile_font
+    :return FontAtlas: The atlas of the font (a CompiledFont for compiled fonts)
+    """
+    path = os.path.abspath(path)
+    key = (path, os.stat(path).st_mtime_ns)
+    with _loaded_fonts_lock:
+        atlas = _loaded_fonts.get(key)
+        if atlas is None:
+            atlas = CompiledFont(path) if CompiledFont.is_compiled(path) else FontAtlas(read_bdf(path))
+            for stale in [loaded for loaded in _loaded_fonts if loaded[0] == path]:
+                del _loaded_fonts[stale]
+            _loaded_fonts[key] = atlas
+        return atlas
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compiles a BDF font into the format of CompiledFont")
+    parser.add_argument("bdf", help="BDF font to compile")
+    parser.add_argument("output", help="Compiled font file to write")
+    arguments = parser.parse_args()
+    count = compile_font(arguments.bdf, arguments.output)
+    print(f"Wrote {count} glyphs to {arguments.output}")
+
+
+if __name__ == "__main__":
+    main()
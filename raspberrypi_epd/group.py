@@ -0,0 +1,145 @@
+import logging
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.transport import RPiTransport
+
+
+class PanelGroup:
+    """
+    Drives several displays that share a SPI bus, each one with its own DC, CS, BUSY and RESET lines.
+    Operations are run on one display at a time without waiting for its refresh, so the data of the next
+    display is sent while the previous ones refresh: updating N displays takes about as long as the slowest
+    refresh instead of the sum of all of them
+    """
+
+    def __init__(self, displays: list, spi=None):
+        """
+        Groups displays that are already created
+        :param displays: The WeAct213 of each panel
+        :param spi: The spidev.SpiDev shared by the displays, closed with the group. None if it isn't owned
+        """
+        self._displays = list(displays)
+        self._spi = spi
+
+    @classmethod
+    def open(cls, panels: list, spi_bus: int = 0, spi_device: int = 0, spi_speed: int = None, spi_mode: int = 0,
+             **kwargs):
+        """
+        Opens the SPI device once and creates a display for each panel on it.
+        Pin Numbering should be set before (see GPIO.setmode)
+        :param panels: The pins of each panel, as dictionaries with the dc, cs, busy and reset pin numbers
+        :param spi_bus: SPI bus number (/dev/spidev<bus>.<device>)
+        :param spi_device: SPI device number, its chip select line is not used by the panels
+        :param spi_speed: SPI clock speed in Hz (default RPiTransport.DEFAULT_SPI_SPEED)
+        :param spi_mode: SPI clock polarity/phase mode
+        :param kwargs: Other parameters for every WeAct213 (e.g. busy_timeout)
+        :return PanelGroup: The group
+        """
+        spi = RPiTransport.open_spi(spi_bus, spi_device, spi_speed, spi_mode)
+        displays = []
+        try:
+            for pins in panels:
+                displays.append(WeAct213(transport=RPiTransport(**pins, spi=spi), **kwargs))
+        except Exception:
+            for display in displays:
+                display.close()
+            spi.close()
+            raise
+        return cls(displays, spi)
+
+    @property
+    def displays(self):
+        """The displays of the group"""
+        return list(self._displays)
+
+    def __len__(self):
+        return len(self._displays)
+
+    def __getitem__(self, index: int):
+        return self._displays[index]
+
+    def __iter__(self):
+        return iter(self._displays)
+
+    def _each(self, operation):
+        """
+        Runs an operation on every display, one at a time. Displays that are still refreshing go last, so the
+        transfers don't wait for a refresh while another display is free
+        :param operation: Function called with each display, it has to start the refresh without waiting for it
+        :return: None
+        """
+        pending = list(self._displays)
+        while pending:
+            display = next((display for display in pending if not display.refresh_pending or not display.is_busy()),
+                           pending[0])
+            pending.remove(display)
+            operation(display)
+
+    def init(self):
+        """
+        Do the initial configuration of every display
+        :return: None
+        """
+        logging.debug(f"Initializing {len(self._displays)} displays")
+        self._each(lambda display: display.init())
+
+    def fill(self, color: Color, wait=True):
+        """
+        Fills the screen of every display with the specified color
+        :param color: The Color to paint the screens
+        :param wait: Block until the refreshes finish
+        :return: None
+        """
+        self._each(lambda display: display.fill(color, wait=False))
+        if wait:
+            self.wait_until_idle()
+
+    def write_buffer(self, force=False, wait=True):
+        """
+        Writes the buffers of every display, see WeAct213.write_buffer
+        :param force: Write the complete buffers and refresh even if they didn't change
+        :param wait: Block until the refreshes finish
+        :return: None
+        """
+        self._each(lambda display: display.write_buffer(force, wait=False))
+        if wait:
+            self.wait_until_idle()
+
+    def write_dirty(self, wait=True):
+        """
+        Writes only the areas drawn since the last write of every display, see WeAct213.write_dirty
+        :param wait: Block until the refreshes finish
+        :return: None
+        """
+        self._each(lambda display: display.write_dirty(wait=False))
+        if wait:
+            self.wait_until_idle()
+
+    def refresh(self, partial_mode=True, wait=True):
+        """
+        Refreshes the screen of every display, see WeAct213.refresh
+        :param partial_mode: Refresh with the partial waveform instead of the full one
+        :param wait: Block until the refreshes finish
+        :return: None
+        """
+        self._each(lambda display: display.refresh(partial_mode, wait=False))
+        if wait:
+            self.wait_until_idle()
+
+    def wait_until_idle(self):
+        """
+        Blocks until the refreshes of all the displays finish
+        :return: None
+        """
+        for display in self._displays:
+            display.wait_until_idle()
+
+    def close(self):
+        """
+        Frees up the resources used by the displays and the shared SPI device
+        :return: None
+        """
+        for display in self._displays:
+            display.close()
+        if self._spi is not None:
+            self._spi.close()
+            self._spi = None
@@ -1,46 +1,71 @@
 import numpy as np
-from PIL import Image, ImageDraw
 import logging
 
 
 class Render:
-    def __init__(self, width, height, data):
+    # Palette of the three color preview: black, white and red
+    PALETTE = [0x00, 0x00, 0x00, 0xFF, 0xFF, 0xFF, 0xFF, 0x00, 0x00]
+
+    def __init__(self, width, height, data, red=None):
         """Initializes a Render object to work as a virtual display
 
         Args:
             width (int): Width of the image in pixels
             height (int): Height of the image in pixels
             data (np.array(np.uint8)): Array of data that describes the pixels in the screen (monochrome)
+            red (np.array(np.uint8)): Optional array with the RED plane, in the same format as data. When
+                given, the render is a three color preview of both planes
         """
-        logging.debug(
-            f"Creating a render object for a screen of {width}x{height} pixels."
-        )
-        logging.debug(f"Bytes received: {data.size} == {int(width * height / 8)}")
+        if logging.root.isEnabledFor(logging.DEBUG):
+            logging.debug(f"Creating a render object for a screen of {width}x{height} pixels.")
+            logging.debug(f"Bytes received: {data.size} == {int(width * height / 8)}")
         self.WIDTH = width
         self.HEIGHT = height
         self._data = data
-        if data.ndim != 1:
-            raise ValueError(f"Incorrect array form: {data.shape}")
-        if data.size != int(width * height / 8):
-            raise ValueError(
-                f"Incorrect number of data bytes. Expected {int(width * height / 8)} but got {data.size}"
-            )
+        self._red = red
+        for plane in (data,) if red is None else (data, red):
+            if plane.ndim != 1:
+                raise ValueError(f"Incorrect array form: {plane.shape}")
+            if plane.size != int(width * height / 8):
+                raise ValueError(
+                    f"Incorrect number of data bytes. Expected {int(width * height / 8)} but got {plane.size}"
+                )
         self._image = None
 
+    def _pixels(self, plane):
+        """Unpacks a plane into one value (1 or 0) per pixel
+
+        Args:
+            plane (np.array(np.uint8)): The packed plane
+
+        Returns:
+            np.array(np.uint8): Array with shape (HEIGHT, WIDTH)
+        """
+        bits = np.unpackbits(np.asarray(plane, dtype=np.uint8))
+        if self.WIDTH % 8 == 0:
+            return bits.reshape(self.HEIGHT, self.WIDTH)
+        # The rows aren't byte aligned, each one starts in the byte (WIDTH / 8) * y
+        xs = np.arange(self.WIDTH)
+        row_bytes = ((self.WIDTH / 8) * np.arange(self.HEIGHT)).astype(int)
+        return bits[(row_bytes[:, None] + xs // 8) * 8 + xs % 8]
+
     def render(self):
-        image = Image.new("1", (self.WIDTH, self.HEIGHT))
-        pixels = image.load()
-        # canvas = ImageDraw.Draw(image)
-        masks = [0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01]
-        for y in range(self.HEIGHT):
-            past_lines = int((self.WIDTH / 8) * y)
-            for x in range(self.WIDTH):
-                bit = x % 8
-                byte_offset = int(x / 8)
-                byte_index = past_lines + byte_offset
-                color = 1 if self._data[byte_index] & masks[bit] else 0
-                # canvas.point((x, y), color)
-                pixels[x, y] = color
+        # Imported here so the package can be imported without loading PIL, it is only needed for previews
+        from PIL import Image
+
+        if self._red is None:
+            if self.WIDTH % 8 == 0:
+                data = np.ascontiguousarray(self._data, dtype=np.uint8).tobytes()
+                self._image = Image.frombytes("1", (self.WIDTH, self.HEIGHT), data)
+            else:
+                pixels = self._pixels(self._data) * np.uint8(0xFF)
+                self._image = Image.frombytes("L", (self.WIDTH, self.HEIGHT), pixels.tobytes()).convert("1")
+            return
+        # 0 black, 1 white and 2 red, the RED plane takes priority as on the display
+        indexes = self._pixels(self._data)
+        indexes[self._pixels(self._red) == 1] = 2
+        image = Image.frombytes("P", (self.WIDTH, self.HEIGHT), indexes.tobytes())
+        image.putpalette(self.PALETTE)
         self._image = image
 
     def save(self, path: str):
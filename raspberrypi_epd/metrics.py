@@ -0,0 +1,162 @@
+import bisect
+import functools
+import threading
+import time
+
+
+class StageStats:
+    """
+    Timings of one stage of the frames: count, total, extremes and a histogram
+    """
+    # Upper bounds in ms of the histogram buckets, the last bucket counts the longer times
+    BUCKETS = (0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000)
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.minimum = None
+        self.maximum = None
+        self.histogram = [0] * (len(self.BUCKETS) + 1)
+
+    def add(self, elapsed: float):
+        """
+        Records a timing
+        :param elapsed: The time in ms
+        :return: None
+        """
+        self.count += 1
+        self.total += elapsed
+        self.minimum = elapsed if self.minimum is None else min(self.minimum, elapsed)
+        self.maximum = elapsed if self.maximum is None else max(self.maximum, elapsed)
+        self.histogram[bisect.bisect_left(self.BUCKETS, elapsed)] += 1
+
+    @property
+    def mean(self):
+        """Mean time in ms, 0 if nothing was recorded"""
+        return self.total / self.count if self.count else 0.0
+
+
+class Metrics:
+    """
+    Collects where the time of the frames goes, for a display and its buffer. The stages are:
+    draw (drawing on the buffer), serialize (converting the buffer to the RAM planes), spi (transfers),
+    busy (blocked waiting for the display) and refresh (from the start of an update until the display is idle).
+    A frame is what happens until the refresh of an update of the screen finishes, including the wait for it
+    (when the update doesn't wait, the frame ends when the refresh is waited for later).
+    Single pixel draws aren't timed, measuring them would cost more than drawing them.
+    Pass it to WeAct213 (or set DisplayBuffer.metrics) to enable it, without it nothing is measured
+    """
+    STAGES = ("draw", "serialize", "spi", "busy", "refresh")
+
+    def __init__(self, on_stage=None, on_frame=None):
+        """
+        Creates an empty set of metrics
+        :param on_stage: Function called with the stage name and the time in ms each time a stage is recorded
+        :param on_frame: Function called with the totals of each frame (see last_frame)
+        """
+        self.on_stage = on_stage
+        self.on_frame = on_frame
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Clears everything recorded
+        :return: None
+        """
+        with self._lock:
+            self.stages = {stage: StageStats() for stage in self.STAGES}
+            self.frames = 0
+            self.bytes_sent = 0
+            self.bytes_received = 0
+            self.spi_transactions = 0
+            self.last_frame = None
+            self._frame = self._new_frame()
+
+    def _new_frame(self):
+        frame = dict.fromkeys(self.STAGES, 0.0)
+        frame.update(bytes_sent=0, bytes_received=0, spi_transactions=0)
+        return frame
+
+    def record(self, stage: str, elapsed: float):
+        """
+        Records the time of a stage
+        :param stage: One of STAGES
+        :param elapsed: The time in ms
+        :return: None
+        """
+        with self._lock:
+            self.stages[stage].add(elapsed)
+            self._frame[stage] += elapsed
+        if self.on_stage is not None:
+            self.on_stage(stage, elapsed)
+
+    def record_transfer(self, elapsed: float, transactions: int, sent: int = 0, received: int = 0):
+        """
+        Records SPI transfers
+        :param elapsed: The time in ms
+        :param transactions: Number of SPI transactions
+        :param sent: Bytes written
+        :param received: Bytes read
+        :return: None
+        """
+        with self._lock:
+            self.spi_transactions += transactions
+            self.bytes_sent += sent
+            self.bytes_received += received
+            frame = self._frame
+            frame["spi_transactions"] += transactions
+            frame["bytes_sent"] += sent
+            frame["bytes_received"] += received
+        self.record("spi", elapsed)
+
+    def end_frame(self):
+        """
+        Closes the current frame, its totals are kept in last_frame
+        :return: None
+        """
+        with self._lock:
+            self.frames += 1
+            self.last_frame, self._frame = self._frame, self._new_frame()
+            frame = self.last_frame
+        if self.on_frame is not None:
+            self.on_frame(frame)
+
+    def summary(self):
+        """
+        Describes the metrics in a few lines of text
+        :return str: The summary
+        """
+        lines = [f"{self.frames} frames, {self.bytes_sent} bytes sent in {self.spi_transactions} SPI transactions"]
+        for name, stage in self.stages.items():
+            if stage.count:
+                lines.append(f"{name:>9}: {stage.count:6d} x {stage.mean:9.3f} ms (min {stage.minimum:.3f}, "
+                             f"max {stage.maximum:.3f}, total {stage.total:.1f})")
+        return "\n".join(lines)
+
+
+def timed(stage: str):
+    """
+    Decorator that records the time of a method of an object with a metrics attribute (e.g. DisplayBuffer)
+    in a stage. Nothing is measured while metrics is None, and calls made from another timed method of the
+    same object are part of the outer one
+    :param stage: One of Metrics.STAGES
+    """
+
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            metrics = self.metrics
+            if metrics is None or self._timing:
+                return method(self, *args, **kwargs)
+            self._timing = True
+            start = time.perf_counter()
+            try:
+                return method(self, *args, **kwargs)
+            finally:
+                self._timing = False
+                metrics.record(stage, (time.perf_counter() - start) * 1000)
+
+        return wrapper
+
+    return decorator
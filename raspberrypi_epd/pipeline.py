@@ -0,0 +1,107 @@
+import logging
+import threading
+from raspberrypi_epd.epd_display import WeAct213
+
+
+class FramePipeline:
+    """
+    Writes frames to a display from a worker thread. The application keeps drawing on the display buffers
+    and calls submit() when a frame is ready: the buffers are copied and the worker writes the copy and
+    waits out the refresh. Frames submitted while the worker is busy replace each other, so only the newest
+    one is written next and the display never falls behind
+    """
+
+    def __init__(self, display: WeAct213, force=False):
+        """
+        Starts the worker thread. The display must be initialized, and while the pipeline is open it
+        should only be written through it
+        :param display: The display to write the frames to
+        :param force: Write each frame complete instead of only what changed (see WeAct213.write_buffer)
+        """
+        self._display = display
+        self._force = force
+        self._condition = threading.Condition()
+        self._pending = None
+        self._writing = False
+        self._closed = False
+        self._error = None
+        # Statistics
+        self.frames_submitted = 0
+        self.frames_written = 0
+        self.frames_dropped = 0
+        self._worker = threading.Thread(target=self._run, name="FramePipeline", daemon=True)
+        self._worker.start()
+
+    def submit(self):
+        """
+        Queues what is drawn on the display buffers as the next frame, replacing the frame that was waiting
+        to be written (if any). Returns without waiting for the display
+        :raises RuntimeError: If the pipeline is closed
+        :return: None
+        """
+        frame = self._display.snapshot()
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("The pipeline is closed")
+            if self._pending is not None:
+                self.frames_dropped += 1
+                logging.debug("Dropping a frame that wasn't written yet")
+            self._pending = frame
+            self.frames_submitted += 1
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = None):
+        """
+        Waits until the last submitted frame is on the screen
+        :param timeout: Maximum time to wait in seconds, None waits forever
+        :raises Exception: The error the worker got writing a frame, if any
+        :return bool: True if every frame was written, False if the timeout expired
+        """
+        with self._condition:
+            done = self._condition.wait_for(lambda: self._pending is None and not self._writing, timeout)
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return done
+
+    def close(self, timeout: float = None):
+        """
+        Writes the frame that is waiting (if any) and stops the worker thread
+        :param timeout: Maximum time to wait for the worker in seconds, None waits forever
+        :raises Exception: The error the worker got writing a frame, if any
+        :return: None
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        self._worker.join(timeout)
+        with self._condition:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def _run(self):
+        """
+        Worker loop: writes the newest frame each time the display is free
+        :return: None
+        """
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._pending is not None or self._closed)
+                if self._pending is None:
+                    return
+                frame, self._pending = self._pending, None
+                self._writing = True
+            error = None
+            try:
+                self._display.write_planes(*frame, force=self._force)
+            except Exception as exception:
+                logging.exception("Error writing a frame to the display")
+                error = exception
+            with self._condition:
+                self._writing = False
+                if error is None:
+                    self.frames_written += 1
+                else:
+                    self._error = error
+                self._condition.notify_all()
@@ -0,0 +1,94 @@
+import numpy as np
+from raspberrypi_epd.transport import Transport, LOW, HIGH
+
+
+class CommandSequence:
+    """
+    Program of commands and their parameters, prebuilt as the bytes to send. It is sent with the display
+    selected (CS low) the whole time, and the Data/Command line only changes between a command and its data,
+    so fixed sequences can be built once and sent as a few transfers
+    """
+
+    def __init__(self):
+        # Runs of bytes sent with the same level of the Data/Command line: (level, bytes)
+        self._segments = []
+        self._commands = []
+
+    def add(self, command: np.uint8, *data):
+        """
+        Appends a command and its parameters to the sequence
+        :param command: The command byte
+        :param data: The parameter bytes, as numbers and/or arrays of bytes
+        :return CommandSequence: This sequence, so calls can be chained
+        """
+        self._append(LOW, bytes((int(command),)))
+        for values in data:
+            if isinstance(values, int):
+                self._append(HIGH, bytes((values,)))
+            else:
+                self._append(HIGH, np.asarray(values, dtype=np.uint8).tobytes())
+        self._commands.append(int(command))
+        return self
+
+    def _append(self, level: int, payload: bytes):
+        """
+        Appends bytes to the sequence, joining them to the last run if it has the same level
+        :param level: Level of the Data/Command line, LOW (command) or HIGH (data)
+        :param payload: The bytes
+        :return: None
+        """
+        if not payload:
+            return
+        if self._segments and self._segments[-1][0] == level:
+            self._segments[-1] = (level, self._segments[-1][1] + payload)
+        else:
+            self._segments.append((level, payload))
+
+    def __add__(self, other: "CommandSequence"):
+        sequence = CommandSequence()
+        for level, payload in self._segments + other._segments:
+            sequence._append(level, payload)
+        sequence._commands = self._commands + other._commands
+        return sequence
+
+    def __len__(self):
+        return len(self._commands)
+
+    def __repr__(self):
+        return f"CommandSequence({' '.join(f'0x{command:02x}' for command in self._commands)})"
+
+    @property
+    def byte_count(self):
+        """Number of bytes sent by the sequence"""
+        return sum(len(payload) for _, payload in self._segments)
+
+    @property
+    def segments(self):
+        """The runs of bytes of the sequence, as (Data/Command level, bytes)"""
+        return list(self._segments)
+
+    def run(self, transport: Transport, max_transfer_size: int = 4096):
+        """
+        Sends the sequence through a transport
+        :param transport: The transport of the display
+        :param max_transfer_size: Largest single SPI transfer, longer runs are split
+        :return int: Number of SPI transfers
+        """
+        transport.set_cs(LOW)
+        level = HIGH
+        transfers = 0
+        for level, payload in self._segments:
+            transport.set_dc(level)
+            if len(payload) <= max_transfer_size:
+                transport.spi_write(payload)
+                transfers += 1
+            else:
+                view = memoryview(payload)
+                for start in range(0, len(payload), max_transfer_size):
+                    transport.spi_write(view[start : start + max_transfer_size])
+                    transfers += 1
+        if level == LOW:
+            # Leave the line in data mode, as after _write_command
+            transport.set_dc(HIGH)
+        transport.set_cs(HIGH)
+        return transfers
@@ -0,0 +1,265 @@
+import numpy as np
+import time
+import raspberrypi_epd.commands as cmd
+from raspberrypi_epd.transport import Transport, LOW, HIGH
+
+
+class SSD1680Simulator(Transport):
+    """
+    Software model of an SSD1680 controller that can be used as the transport of a display.
+    It decodes the command stream into the B&W and RED RAM and simulates the BUSY line, so the
+    driver can be tested and benchmarked without hardware
+    """
+
+    def __init__(self, width=176, height=296, time_scale=0.0, power_on_time=100, power_off_time=250,
+                 full_refresh_time=4100, partial_refresh_time=750, reset_time=10, spi_speed=500000,
+                 max_spi_speed=None):
+        """
+        Creates a simulated controller
+        :param width: Width of the RAM in pixels (multiple of 8)
+        :param height: Height of the RAM in pixels (gates)
+        :param time_scale: Factor applied to the simulated BUSY durations. 0 never reports busy, 1 is real time
+        :param power_on_time: Time in ms the display is busy when powering on
+        :param power_off_time: Time in ms the display is busy when powering off
+        :param full_refresh_time: Time in ms the display is busy on a full refresh
+        :param partial_refresh_time: Time in ms the display is busy on a partial refresh
+        :param reset_time: Time in ms the display is busy after a software reset
+        :param spi_speed: Initial SPI clock speed in Hz
+        :param max_spi_speed: Fastest SPI clock in Hz the simulated wiring transfers reliably. Faster, the
+                              data bytes arrive with errors. None has no limit
+        """
+        self.WIDTH = width
+        self.HEIGHT = height
+        self.time_scale = time_scale
+        self.POWER_ON_TIME = power_on_time
+        self.POWER_OFF_TIME = power_off_time
+        self.FULL_REFRESH_TIME = full_refresh_time
+        self.PARTIAL_REFRESH_TIME = partial_refresh_time
+        self.RESET_TIME = reset_time
+        self.spi_speed = spi_speed
+        self.max_spi_speed = max_spi_speed
+        self.bw_ram = np.zeros((height, width // 8), dtype=np.uint8)
+        self.red_ram = np.zeros((height, width // 8), dtype=np.uint8)
+        # What the panel is showing, copied from the RAM on every refresh
+        self.bw_display = self.bw_ram.copy()
+        self.red_display = self.red_ram.copy()
+        self.lut = None
+        self.dc = HIGH
+        self.cs = HIGH
+        self.reset_line = HIGH
+        self._busy_until = 0.0
+        self._command = None
+        self._parameters = bytearray()
+        self._read_dummy = False
+        self._reset_registers()
+        # Statistics
+        self.spi_transfers = 0
+        self.bytes_written = 0
+        self.bytes_read = 0
+        self.gpio_writes = 0
+        self.refreshes = 0
+        self.simulated_busy_time = 0
+        self.commands = []
+
+    def _reset_registers(self):
+        """
+        Puts the registers in their power on state
+        :return: None
+        """
+        self.data_entry_mode = 0x03
+        self.x_window = (0, self.WIDTH // 8 - 1)
+        self.y_window = (0, self.HEIGHT - 1)
+        self.x_counter = 0
+        self.y_counter = 0
+        self.update_control = 0xFF
+        self.read_ram_option = 0x00
+
+    def set_dc(self, level: int):
+        self.gpio_writes += 1
+        self.dc = level
+
+    def set_cs(self, level: int):
+        self.gpio_writes += 1
+        self.cs = level
+
+    def set_reset(self, level: int):
+        self.gpio_writes += 1
+        if self.reset_line == LOW and level == HIGH:
+            self._reset_registers()
+            self._command = None
+        self.reset_line = level
+
+    def read_busy(self) -> int:
+        return HIGH if time.monotonic() < self._busy_until else LOW
+
+    def wait_while_busy(self, timeout: float = None) -> bool:
+        # Sleeps until the simulated falling edge, like an interrupt would
+        remaining = self._busy_until - time.monotonic()
+        if remaining <= 0:
+            return True
+        if timeout is not None and timeout < remaining:
+            time.sleep(timeout)
+            return False
+        time.sleep(remaining)
+        return True
+
+    def spi_write(self, data: bytes):
+        self.spi_transfers += 1
+        data = bytes(data)
+        self.bytes_written += len(data)
+        if self.cs != LOW:
+            # The controller ignores the bus while it isn't selected
+            return
+        if self.dc == LOW:
+            for command in data:
+                self._start_command(command)
+        elif self._command is not None:
+            if self.max_spi_speed is not None and self.spi_speed > self.max_spi_speed:
+                # Too fast for the wiring, the lowest bit of every byte is lost
+                data = (np.frombuffer(data, dtype=np.uint8) & np.uint8(0xFE)).tobytes()
+            self._receive_data(data)
+
+    def spi_read(self, count: int) -> bytes:
+        self.spi_transfers += 1
+        self.bytes_read += count
+        if self.cs != LOW or self.dc == LOW or self._command != cmd.READ_RAM:
+            return bytes(count)
+        ram = self.red_ram if self.read_ram_option & 0x01 else self.bw_ram
+        # The first byte read after the command is a dummy byte
+        dummy = 1 if self._read_dummy and count else 0
+        self._read_dummy = self._read_dummy and not dummy
+        ys, xs = self._ram_addresses(count - dummy)
+        inside = (ys < ram.shape[0]) & (xs < ram.shape[1])
+        values = np.zeros(count - dummy, dtype=np.uint8)
+        values[inside] = ram[ys[inside], xs[inside]]
+        return bytes(dummy) + values.tobytes()
+
+    def get_spi_speed(self) -> int:
+        return self.spi_speed
+
+    def set_spi_speed(self, speed_hz: int):
+        self.spi_speed = speed_hz
+
+    def _start_command(self, command: int):
+        """
+        Starts a new command, those without parameters are executed right away
+        :param command: The command byte
+        :return: None
+        """
+        self._command = command
+        self._parameters = bytearray()
+        self._read_dummy = command == cmd.READ_RAM
+        self.commands.append((command, self._parameters))
+        if command == cmd.SW_RESET:
+            self._reset_registers()
+            self._set_busy(self.RESET_TIME)
+        elif command == cmd.MASTER_ACTIVATION:
+            self._activate()
+
+    def _receive_data(self, data: bytes):
+        """
+        Handles the data bytes sent after a command
+        :param data: The data bytes
+        :return: None
+        """
+        command = self._command
+        if command == cmd.WRITE_RAM_BW:
+            self._write_ram(self.bw_ram, data)
+        elif command == cmd.WRITE_RAM_RED:
+            self._write_ram(self.red_ram, data)
+        self._parameters += data
+        parameters = self._parameters
+        if command == cmd.DATA_ENTRY_MODE:
+            self.data_entry_mode = parameters[0] & 0x07
+        elif command == cmd.SET_RAM_X_STARTEND and len(parameters) >= 2:
+            self.x_window = (parameters[0] & 0x3F, parameters[1] & 0x3F)
+        elif command == cmd.SET_RAM_Y_STARTEND and len(parameters) >= 4:
+            self.y_window = (parameters[0] | (parameters[1] & 0x01) << 8, parameters[2] | (parameters[3] & 0x01) << 8)
+        elif command == cmd.SET_RAM_X_ADDR_COUNTER:
+            self.x_counter = parameters[0] & 0x3F
+        elif command == cmd.SET_RAM_Y_ADDR_COUNTER and len(parameters) >= 2:
+            self.y_counter = parameters[0] | (parameters[1] & 0x01) << 8
+        elif command == cmd.DISPLAY_UPDATE_CONTROL_2:
+            self.update_control = parameters[0]
+        elif command == cmd.WRITE_LUT_REG:
+            self.lut = bytes(parameters)
+        elif command == cmd.READ_RAM_OPTION:
+            self.read_ram_option = parameters[0] & 0x01
+
+    def _ram_addresses(self, count: int):
+        """
+        Computes the RAM addresses of the next bytes written, following the window, the address counters
+        and the data entry mode. The address counters are moved past the last address
+        :param count: Number of bytes that will be written
+        :return tuple: Arrays with the Y and X addresses
+        """
+        x_increment = self.data_entry_mode & 0x01
+        y_increment = self.data_entry_mode & 0x02
+        y_first = self.data_entry_mode & 0x04
+        xs = np.arange(min(self.x_window), max(self.x_window) + 1)
+        ys = np.arange(min(self.y_window), max(self.y_window) + 1)
+        xs = xs if x_increment else xs[::-1]
+        ys = ys if y_increment else ys[::-1]
+        fast, slow = (ys, xs) if y_first else (xs, ys)
+        fast_counter, slow_counter = (self.y_counter, self.x_counter) if y_first else (self.x_counter, self.y_counter)
+        fast_start = np.flatnonzero(fast == fast_counter)
+        slow_start = np.flatnonzero(slow == slow_counter)
+        start = (slow_start[0] if slow_start.size else 0) * fast.size + (fast_start[0] if fast_start.size else 0)
+        steps = start + np.arange(count + 1)
+        fast_addresses = fast[steps % fast.size]
+        slow_addresses = slow[(steps // fast.size) % slow.size]
+        if y_first:
+            ys, xs = fast_addresses, slow_addresses
+        else:
+            xs, ys = fast_addresses, slow_addresses
+        self.x_counter, self.y_counter = int(xs[-1]), int(ys[-1])
+        return ys[:-1], xs[:-1]
+
+    def _write_ram(self, ram: np.array, data: bytes):
+        """
+        Stores the data bytes in a RAM
+        :param ram: The RAM to write to
+        :param data: The data bytes
+        :return: None
+        """
+        ys, xs = self._ram_addresses(len(data))
+        values = np.frombuffer(data, dtype=np.uint8)
+        inside = (ys < ram.shape[0]) & (xs < ram.shape[1])
+        ram[ys[inside], xs[inside]] = values[inside]
+
+    def _activate(self):
+        """
+        Runs the display update sequence selected with DISPLAY_UPDATE_CONTROL_2
+        :return: None
+        """
+        option = self.update_control
+        if option & 0x04:
+            # Display the RAM contents, mode 2 is the partial (fast) waveform
+            self.bw_display = self.bw_ram.copy()
+            self.red_display = self.red_ram.copy()
+            self.refreshes += 1
+            self._set_busy(self.PARTIAL_REFRESH_TIME if option & 0x08 else self.FULL_REFRESH_TIME)
+        elif option & 0x03:
+            self._set_busy(self.POWER_OFF_TIME)
+        else:
+            self._set_busy(self.POWER_ON_TIME)
+
+    def _set_busy(self, duration: int):
+        """
+        Raises the BUSY line for the given (simulated) time
+        :param duration: Time in ms
+        :return: None
+        """
+        self.simulated_busy_time += duration
+        self._busy_until = time.monotonic() + duration * self.time_scale / 1000
+
+    @staticmethod
+    def panel_bytes(ram: np.array, width: int, height: int):
+        """
+        Extracts the part of a RAM that is mapped to a panel, in the same format as DisplayBuffer.serialize
+        :param ram: One of bw_ram, red_ram, bw_display, red_display
+        :param width: Panel width in pixels
+        :param height: Panel height in pixels
+        :return np.array[np.uint8]: The bytes of the panel area
+        """
+        return ram[:height, : width // 8].ravel()
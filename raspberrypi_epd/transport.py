@@ -0,0 +1,208 @@
+import time
+
+__all__ = ["LOW", "HIGH", "Transport", "RPiTransport"]
+
+LOW = 0
+HIGH = 1
+
+
+class Transport:
+    """
+    Interface between the display driver and the hardware. It moves bytes through the SPI bus and drives
+    the control lines of the display (DC, CS, RESET) and reads its BUSY line
+    """
+    # Seconds between reads of the BUSY line when polling
+    POLL_INTERVAL = 0.005
+
+    def set_dc(self, level: int):
+        """
+        Sets the level of the Data/Command line
+        :param level: LOW (command) or HIGH (data)
+        :return: None
+        """
+        raise NotImplementedError
+
+    def set_cs(self, level: int):
+        """
+        Sets the level of the Chip Select line
+        :param level: LOW (selected) or HIGH (released)
+        :return: None
+        """
+        raise NotImplementedError
+
+    def set_reset(self, level: int):
+        """
+        Sets the level of the RESET line
+        :param level: LOW (in reset) or HIGH (running)
+        :return: None
+        """
+        raise NotImplementedError
+
+    def read_busy(self) -> int:
+        """
+        Reads the BUSY line of the display
+        :return: HIGH while the display is busy, LOW otherwise
+        """
+        raise NotImplementedError
+
+    def wait_while_busy(self, timeout: float = None) -> bool:
+        """
+        Blocks while the BUSY line is high. This implementation polls the line, transports that can be
+        notified of the falling edge should override it
+        :param timeout: Maximum time to wait in seconds, None waits forever
+        :return: True if the display is no longer busy, False if the timeout expired
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.read_busy() != LOW:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(self.POLL_INTERVAL)
+        return True
+
+    def spi_write(self, data: bytes):
+        """
+        Writes a sequence of bytes to the SPI bus
+        :param data: The bytes to write
+        :return: None
+        """
+        raise NotImplementedError
+
+    def spi_read(self, count: int) -> bytes:
+        """
+        Reads a sequence of bytes from the SPI bus
+        :param count: Number of bytes to read
+        :return: The bytes read
+        """
+        raise NotImplementedError
+
+    def get_spi_speed(self) -> int:
+        """
+        Gives the clock speed of the SPI bus
+        :return: The speed in Hz
+        """
+        raise NotImplementedError
+
+    def set_spi_speed(self, speed_hz: int):
+        """
+        Changes the clock speed of the SPI bus
+        :param speed_hz: The speed in Hz
+        :return: None
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """
+        Frees up the resources used by the transport
+        :return: None
+        """
+
+
+class RPiTransport(Transport):
+    """
+    Transport for a Raspberry Pi, using spidev for the SPI bus and RPi.GPIO for the control lines.
+    Pin Numbering should be set outside this class (see GPIO.setmode)
+    """
+    # Longest single wait for the falling edge of BUSY, in ms. The level is checked again after each one,
+    # in case the edge happened before the wait started
+    EDGE_WAIT_SLICE = 100
+    # SPI clock used when no speed is given
+    DEFAULT_SPI_SPEED = 500000
+
+    def __init__(self, dc: int, cs: int, busy: int, reset: int, spi_bus: int = 0, spi_device: int = 0,
+                 spi_speed: int = None, spi_mode: int = 0, spi=None):
+        """
+        Configures the pins and opens the SPI device. Several displays can share a bus: each one needs its own
+        pins, and they are given the same SPI device (see open_spi and PanelGroup)
+        :param dc: Data/Command pin number
+        :param cs: Chip Select pin number
+        :param busy: BUSY pin number
+        :param reset: RESET pin number
+        :param spi_bus: SPI bus number (/dev/spidev<bus>.<device>)
+        :param spi_device: SPI device (chip select of the bus) number
+        :param spi_speed: SPI clock speed in Hz (default DEFAULT_SPI_SPEED)
+        :param spi_mode: SPI clock polarity/phase mode
+        :param spi: An already open spidev.SpiDev to use instead of opening one, it is not closed with the
+                    transport. The spi_* parameters are ignored then
+        """
+        # Imported here so the rest of the package can be used where these modules aren't available
+        import RPi.GPIO as GPIO
+
+        self._gpio = GPIO
+        self._DC = dc
+        self._CS = cs
+        self._RESET = reset
+        self._BUSY = busy
+        GPIO.setup(self._DC, GPIO.OUT)
+        GPIO.setup(self._CS, GPIO.OUT)
+        # Released, so the display ignores the transfers to other displays on the bus
+        GPIO.output(self._CS, GPIO.HIGH)
+        GPIO.setup(self._RESET, GPIO.OUT)
+        GPIO.output(self._RESET, GPIO.HIGH)
+        GPIO.setup(self._BUSY, GPIO.IN)
+        self._owns_spi = spi is None
+        self._spi = self.open_spi(spi_bus, spi_device, spi_speed, spi_mode) if spi is None else spi
+
+    @classmethod
+    def open_spi(cls, bus: int = 0, device: int = 0, speed: int = None, mode: int = 0):
+        """
+        Opens a SPI device, to be shared by the transports of several displays
+        :param bus: SPI bus number (/dev/spidev<bus>.<device>)
+        :param device: SPI device (chip select of the bus) number
+        :param speed: SPI clock speed in Hz (default DEFAULT_SPI_SPEED)
+        :param mode: SPI clock polarity/phase mode
+        :return spidev.SpiDev: The open device
+        """
+        import spidev
+
+        spi = spidev.SpiDev()
+        spi.open(bus=bus, device=device)
+        spi.max_speed_hz = cls.DEFAULT_SPI_SPEED if speed is None else speed
+        spi.mode = mode  # Clock polarity/phase
+        return spi
+
+    def set_dc(self, level: int):
+        self._gpio.output(self._DC, level)
+
+    def set_cs(self, level: int):
+        self._gpio.output(self._CS, level)
+
+    def set_reset(self, level: int):
+        self._gpio.output(self._RESET, level)
+
+    def read_busy(self) -> int:
+        return self._gpio.input(self._BUSY)
+
+    def wait_while_busy(self, timeout: float = None) -> bool:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.read_busy() != LOW:
+            wait = self.EDGE_WAIT_SLICE
+            if deadline is not None:
+                remaining = int((deadline - time.monotonic()) * 1000)
+                if remaining <= 0:
+                    return False
+                wait = max(1, min(wait, remaining))
+            try:
+                self._gpio.wait_for_edge(self._BUSY, self._gpio.FALLING, timeout=wait)
+            except RuntimeError:
+                # Edge detection is not available for the pin (e.g. it is already in use), poll instead
+                remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                return super().wait_while_busy(remaining)
+        return True
+
+    def spi_write(self, data: bytes):
+        self._spi.writebytes2(data)
+
+    def spi_read(self, count: int) -> bytes:
+        return bytes(self._spi.readbytes(count))
+
+    def get_spi_speed(self) -> int:
+        return self._spi.max_speed_hz
+
+    def set_spi_speed(self, speed_hz: int):
+        self._spi.max_speed_hz = speed_hz
+
+    def close(self):
+        if self._owns_spi:
+            self._spi.close()
+        # Only the pins of this display, others may still be in use
+        self._gpio.cleanup([self._DC, self._CS, self._RESET, self._BUSY])
@@ -0,0 +1,90 @@
+import asyncio
+import threading
+import time
+import numpy as np
+from raspberrypi_epd.async_display import AsyncWeAct213
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.simulator import SSD1680Simulator
+
+
+def test_refresh_yields_to_the_event_loop():
+    simulator = SSD1680Simulator(time_scale=0.05)
+    display = AsyncWeAct213(transport=simulator)
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.monotonic())
+            await asyncio.sleep(0.005)
+
+    async def main():
+        await display.init()
+        task = asyncio.create_task(ticker())
+        await display.fill(Color.BLACK)
+        task.cancel()
+
+    asyncio.run(main())
+    # The refresh keeps BUSY high for ~40 ms, the ticker has to run meanwhile
+    assert len(ticks) > 3
+    assert simulator.refreshes == 1
+    assert not display.refresh_pending
+    assert display.last_busy_time > 20
+    assert np.all(simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT) == 0)
+
+
+def test_write_without_waiting():
+    simulator = SSD1680Simulator(time_scale=0.05)
+    display = AsyncWeAct213(transport=simulator)
+
+    async def main():
+        await display.init()
+        display.draw_rectangle(10, 10, 20, 20, Color.BLACK)
+        await display.write_buffer(wait=False)
+        assert display.refresh_pending
+        assert display.is_busy()
+        display.draw_line(0, 100, 100, 100, Color.BLACK)
+        # Waits for the refresh in progress before sending anything
+        await display.write_dirty()
+        assert not display.refresh_pending
+        assert display.partial_mode
+
+    asyncio.run(main())
+    assert simulator.refreshes == 2
+    assert display.has_shadow
+
+
+def test_transfer_runs_outside_the_event_loop():
+    simulator = SSD1680Simulator(time_scale=0.05)
+    display = AsyncWeAct213(transport=simulator)
+    threads = set()
+    spi_write = simulator.spi_write
+
+    def record_thread(data):
+        threads.add(threading.get_ident())
+        spi_write(data)
+
+    simulator.spi_write = record_thread
+
+    async def main():
+        await display.init()
+        threads.clear()
+        display.fill_rectangle(0, 0, 40, 40, Color.RED)
+        await display.write_buffer(wait=False)
+        display.draw_line(0, 100, 100, 100, Color.BLACK)
+        await display.write_dirty()
+
+    asyncio.run(main())
+    assert threads and threading.get_ident() not in threads
+    assert simulator.refreshes == 2
+
+
+def test_sync_operations_wait_for_pending_refresh():
+    simulator = SSD1680Simulator(time_scale=0.05)
+    display = WeAct213(transport=simulator)
+    display.init()
+    display.fill(Color.BLACK, wait=False)
+    assert display.refresh_pending
+    display.fill(Color.WHITE)
+    assert not display.refresh_pending
+    assert simulator.refreshes == 2
+    assert np.all(simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT) == 0xFF)
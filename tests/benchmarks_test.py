@@ -0,0 +1,23 @@
+import importlib.util
+import os
+
+RUNNER = os.path.join(os.path.dirname(__file__), os.pardir, "benchmarks", "run.py")
+
+
+def load_runner():
+    spec = importlib.util.spec_from_file_location("benchmarks_run", RUNNER)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def test_benchmark_cases_run():
+    runner = load_runner()
+    cases = runner.all_cases()
+    assert len({name for name, _, _ in cases}) == len(cases)
+    for name, function, size in cases:
+        function()
+        assert size >= 0
+    results = {name: {"seconds": 1.0, "bytes": size} for name, _, size in cases[:2]}
+    baseline = {"results": {cases[0][0]: {"seconds": 0.5}, cases[1][0]: {"seconds": 1.0}}}
+    assert runner.compare(results, baseline, tolerance=0.25) == [cases[0][0]]
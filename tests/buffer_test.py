@@ -1,5 +1,5 @@
 import pytest
-from epd_test.buffer import DisplayBuffer
+from raspberrypi_epd.buffer import DisplayBuffer, TriColorBuffer
 import numpy as np
 
 
@@ -11,7 +11,7 @@ def test_buffer_dimmensions():
 @pytest.mark.parametrize('x, y', [(0, 0), (9, 2), (4, 4), (10, 1)])
 def test_setter(x, y):
     display = DisplayBuffer(16, 9)
-    display.draw_pixel(x, y)
+    display.draw_pixel(x, y, 1)
     assert display.get_pixel_value(x, y) == 1
 
 @pytest.mark.parametrize(
@@ -25,7 +25,7 @@ def test_setter(x, y):
 )
 def test_buffer_pixel(x, y, pixel_val):
     display = DisplayBuffer(16, 9)
-    display.draw_pixel(x, y)
+    display.draw_pixel(x, y, 1)
     display.dump_raw_buffer()
     assert display.get_pixel_byte(x, y) == pixel_val
 
@@ -33,10 +33,288 @@ def test_buffer_pixel(x, y, pixel_val):
 def test_serialization():
     # 8 bytes
     display = DisplayBuffer(8, 8)
-    display.draw_group_pixels([(0, 0), (1, 0), (4, 0), (5, 0)]) # CC
-    display.draw_group_pixels([(0, 1), (2, 1), (4, 1), (6, 1)]) # AA
+    display.draw_pixels([(0, 0), (1, 0), (4, 0), (5, 0)], 1) # CC
+    display.draw_pixels([(0, 1), (2, 1), (4, 1), (6, 1)], 1) # AA
     bs = display.serialize()
     display.dump_raw_buffer()
     assert bs[0] == np.uint8(0xCC)
     assert bs[1] == np.uint8(0xAA)
 
+
+@pytest.mark.parametrize(
+    "x, y, pixel_val",
+    [
+        (0, 0, 128),
+        (0, 7, 128),
+        (6, 0, 2),
+        (11, 0, 16)
+    ]
+)
+def test_packed_buffer_pixel(x, y, pixel_val):
+    display = DisplayBuffer(16, 9, packed=True)
+    display.draw_pixel(x, y, 1)
+    assert display.get_pixel_value(x, y) == 1
+    assert display.get_pixel_byte(x, y) == pixel_val
+    display.draw_pixel(x, y, 0)
+    assert display.get_pixel_byte(x, y) == 0
+
+
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+def test_packed_matches_unpacked(rotation):
+    unpacked = DisplayBuffer(16, 24)
+    packed = DisplayBuffer(16, 24, packed=True)
+    assert packed.serialize().size == 16 * 24 // 8
+    for buffer in (unpacked, packed):
+        buffer.clear_screen(1)
+        buffer.rotate(rotation)
+        buffer.draw_line(0, 0, 12, 7, 0)
+        buffer.draw_circle(8, 10, 5, 0)
+    assert np.array_equal(packed.serialize(), unpacked.serialize())
+    assert np.array_equal(packed.serialize_area(0, 2, 8, 4), unpacked.serialize_area(0, 2, 8, 4))
+    assert packed.render() == unpacked.render()
+
+
+def test_serialize_matches_byte_loop():
+    display = DisplayBuffer(16, 10)
+    display._buffer[:] = np.random.default_rng(0).integers(0, 2, display._buffer.size)
+    expected = [DisplayBuffer.create_byte_from_array(display._buffer[i : i + 8])
+                for i in range(0, display._buffer.size, 8)]
+    assert np.array_equal(display.serialize(), expected)
+    # The area is the run of bytes from (x, y) to (x + width, y + height)
+    assert np.array_equal(display.serialize_area(8, 1, 4, 3), expected[3:10])
+
+
+@pytest.mark.parametrize("packed", [False, True])
+@pytest.mark.parametrize("rotation", [0, 90, 180, 270])
+@pytest.mark.parametrize("x, y", [(3, 5), (-6, -3), (10, 12)])
+def test_draw_bitmap_matches_pixel_by_pixel(packed, rotation, x, y):
+    w, h = 16, 9
+    bitmap = np.random.default_rng(rotation).integers(0, 256, 2 * h, dtype=np.uint8)
+    display = DisplayBuffer(16, 20, packed=packed)
+    expected = DisplayBuffer(16, 20)
+    for buffer in (display, expected):
+        buffer.clear_screen(1)
+        buffer.rotate(rotation)
+    display.draw_bitmap(bitmap, x, y, w, h, 0)
+    bits = np.unpackbits(bitmap).reshape(h, w)
+    for by, bx in zip(*np.nonzero(bits)):
+        px, py = x + bx, y + by
+        if 0 <= px < expected.x_length and 0 <= py < expected.y_length:
+            expected.draw_pixel(px, py, 0)
+    assert np.array_equal(display.serialize(), expected.serialize())
+
+
+def test_tri_color_planes():
+    buffer = TriColorBuffer(16, 2)
+    buffer.clear_screen(TriColorBuffer.WHITE)
+    buffer.draw_line(0, 0, 7, 0, TriColorBuffer.BLACK)
+    buffer.draw_line(4, 0, 11, 0, TriColorBuffer.RED)
+    buffer.draw_pixel(15, 1, TriColorBuffer.BLACK)
+    bw, red = buffer.serialize_planes()
+    # Red pixels are white in the B&W plane, the last color drawn wins
+    assert list(bw) == [0x0F, 0xFF, 0xFF, 0xFE]
+    assert list(red) == [0x0F, 0xF0, 0x00, 0x00]
+    assert np.array_equal(buffer.serialize(), bw)
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+def test_tri_color_planes_match_colors(rotation):
+    # An unpacked buffer holds the color values as they are drawn
+    colors = DisplayBuffer(24, 20)
+    planes = TriColorBuffer(24, 20)
+    assert planes.packed and planes._buffer.nbytes + planes._red.nbytes == 2 * 24 * 20 // 8
+    for buffer in (colors, planes):
+        buffer.clear_screen(TriColorBuffer.WHITE)
+        buffer.rotate(rotation)
+        buffer.fill_rectangle(2, 3, 11, 7, TriColorBuffer.RED)
+        buffer.fill_circle(9, 9, 5, TriColorBuffer.BLACK)
+        buffer.draw_line(0, 0, 15, 12, TriColorBuffer.RED, line_width=3)
+        buffer.draw_pixel(1, 17, TriColorBuffer.RED)
+        buffer.draw_points([4, 5, 6], [16, 16, 16], TriColorBuffer.BLACK)
+        buffer.scroll(0, 2, 14, 9, 3, TriColorBuffer.WHITE)
+        buffer.fill_rectangle(3, 4, 2, 2, TriColorBuffer.WHITE)
+        buffer.rotate(0)
+        buffer.set_foreground(TriColorBuffer.RED)
+        buffer.set_pixel(23, 19)
+    assert np.array_equal(planes._unpacked(), colors._unpacked())
+    assert planes.get_pixel_value(23, 19) == TriColorBuffer.RED
+    bw, red = planes.serialize_planes()
+    assert np.array_equal(bw, np.packbits(colors._unpacked() != TriColorBuffer.BLACK))
+    assert np.array_equal(red, np.packbits(colors._unpacked() == TriColorBuffer.RED))
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+@pytest.mark.parametrize('packed', [False, True])
+def test_fill_rectangle_matches_pixels(rotation, packed):
+    filled = DisplayBuffer(24, 20, packed=packed)
+    filled.rotate(rotation)
+    filled.fill_rectangle(-2, 3, 9, 30, 1)
+    expected = DisplayBuffer(24, 20, packed=packed)
+    expected.rotate(rotation)
+    for x in range(0, 7):
+        for y in range(3, min(33, expected.y_length)):
+            expected.draw_pixel(x, y, 1)
+    assert np.array_equal(filled.serialize(), expected.serialize())
+
+
+@pytest.mark.parametrize('x, w', [(3, 2), (8, 8), (5, 11), (1, 22), (0, 24)])
+@pytest.mark.parametrize('value', [0, 1])
+def test_packed_fill_rectangle_edges(x, w, value):
+    packed = DisplayBuffer(24, 6, packed=True)
+    unpacked = DisplayBuffer(24, 6)
+    for buffer in (packed, unpacked):
+        buffer.clear_screen(1 - value)
+        buffer.fill_rectangle(x, 1, w, 4, value)
+    assert np.array_equal(packed.serialize(), unpacked.serialize())
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+def test_outlines_are_unchanged(rotation):
+    rectangle = DisplayBuffer(32, 24)
+    rectangle.rotate(rotation)
+    rectangle.draw_rectangle(2, 3, 12, 9, 1)
+    lines = DisplayBuffer(32, 24)
+    lines.rotate(rotation)
+    for x1, y1, x2, y2 in [(2, 3, 14, 3), (14, 3, 14, 12), (14, 12, 2, 12), (2, 12, 2, 3)]:
+        lines.draw_line(x1, y1, x2, y2, 1)
+    assert np.array_equal(rectangle.serialize(), lines.serialize())
+    assert rectangle.dirty_rects() == lines.dirty_rects()
+
+
+def test_filled_shapes_cover_their_outline():
+    outline = DisplayBuffer(32, 32)
+    filled = DisplayBuffer(32, 32)
+    for r in range(8):
+        outline.draw_circle(15, 15, r, 1)
+        filled.fill_circle(15, 15, r, 1)
+    triangle = [(2, 2), (29, 10), (8, 28)]
+    for (xa, ya), (xb, yb) in zip(triangle, triangle[1:] + triangle[:1]):
+        outline.draw_line(xa, ya, xb, yb, 1)
+    filled.fill_polygon(triangle, 1)
+    outline_pixels = outline._unpacked().astype(bool)
+    filled_pixels = filled._unpacked().astype(bool)
+    assert not np.any(outline_pixels & ~filled_pixels)
+    assert filled_pixels.reshape(32, 32)[12, 12]
+
+
+def test_line_width():
+    buffer = DisplayBuffer(16, 16)
+    buffer.draw_line(2, 8, 12, 8, 1, line_width=3)
+    rows = buffer._unpacked().reshape(16, 16)
+    assert rows[7:10, 2:13].all() and rows.sum() == 3 * 11
+    buffer = DisplayBuffer(16, 16)
+    buffer.draw_rectangle(0, 0, 9, 9, 1, line_width=2)
+    rows = buffer._unpacked().reshape(16, 16)
+    assert rows[:10, :10].sum() == 100 - 36 and rows[2:8, 2:8].sum() == 0
+
+
+def bresenham_loop(x1, y1, x2, y2):
+    # The per-pixel implementation draw_line had, as reference
+    dx, dy = x2 - x1, y2 - y1
+    y_incr = 1 if dy >= 0 else -1
+    x_incr = 1 if dx >= 0 else -1
+    dx, dy = abs(dx), abs(dy)
+    if dx >= dy:
+        y_incr_s, x_incr_s = 0, x_incr
+    else:
+        y_incr_s, x_incr_s = y_incr, 0
+        dx, dy = dy, dx
+    x, y = x1, y1
+    a = 2 * dy
+    b = a - dx
+    p = b - dx
+    pixels = []
+    while True:
+        pixels.append((x, y))
+        if b >= 0:
+            x, y, b = x + x_incr, y + y_incr, b + p
+        else:
+            x, y, b = x + x_incr_s, y + y_incr_s, b + a
+        if x == x2 and y == y2:
+            break
+    pixels.append((x, y))
+    return pixels
+
+
+def test_line_coords_match_bresenham():
+    rng = np.random.default_rng(7)
+    for x1, y1, x2, y2 in rng.integers(-20, 60, size=(300, 4)):
+        if x1 == x2 and y1 == y2:
+            continue
+        xs, ys = DisplayBuffer._line_coords(int(x1), int(y1), int(x2), int(y2))
+        assert list(zip(xs, ys)) == bresenham_loop(int(x1), int(y1), int(x2), int(y2))
+
+
+def test_circle_coords_match_midpoint():
+    for r in range(1, 60):
+        xk, yk, pk = r, 0, 1 - r
+        expected = {(r, 0), (0, r)}
+        while xk > yk:
+            yk += 1
+            if pk <= 0:
+                pk += 2 * yk + 1
+            else:
+                xk -= 1
+                pk += 2 * yk - 2 * xk + 1
+            if xk < yk:
+                break
+            expected |= {(xk, yk), (yk, xk)}
+        expected = {(sx * x, sy * y) for x, y in expected for sx in (1, -1) for sy in (1, -1)}
+        xs, ys = DisplayBuffer._circle_coords(0, 0, r)
+        assert set(zip(xs, ys)) == expected
+
+
+@pytest.mark.parametrize('packed', [False, True])
+def test_draw_points(packed):
+    points = np.array([[0, 0], [15, 3], [-1, 2], [16, 0], [7, 9], [3, 3]])
+    batch = DisplayBuffer(16, 9, packed=packed)
+    batch.rotate(180)
+    batch.draw_pixels(points, 1)
+    single = DisplayBuffer(16, 9, packed=packed)
+    single.rotate(180)
+    for x, y in [(0, 0), (15, 3), (3, 3)]:
+        single.draw_pixel(x, y, 1)
+    assert np.array_equal(batch.serialize(), single.serialize())
+    batch.set_foreground(1)
+    batch.set_group_pixels(np.array([[1, 1], [2, 2]]))
+    assert batch.get_pixel_value(1, 1) == 1
+    batch.set_background(0)
+    batch.clear_group_pixels([(1, 1)])
+    assert batch.get_pixel_value(1, 1) == 0 and batch.get_pixel_value(2, 2) == 1
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+@pytest.mark.parametrize('packed', [False, True])
+def test_rotation_maps_match_rotate_coords(rotation, packed):
+    mapped = DisplayBuffer(24, 10, packed=packed)
+    mapped.rotate(rotation)
+    xs, ys = np.meshgrid(np.arange(mapped.x_length), np.arange(mapped.y_length))
+    mapped.draw_points(xs, ys, 1)
+    for x, y in [(3, 4), (mapped.x_length - 1, 0), (0, mapped.y_length - 1)]:
+        mapped.draw_pixel(x, y, 0)
+        xr, yr = mapped.rotate_coords(x, y)
+        assert mapped.get_pixel_value(xr, yr) == 0
+        assert mapped._unpacked().sum() == mapped.WIDTH * mapped.HEIGHT - 1
+        mapped.draw_pixel(x, y, 1)
+    assert mapped._unpacked().all()
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+def test_dirty_rects_match_rotate_coords(rotation):
+    buffer = DisplayBuffer(24, 10)
+    buffer.rotate(rotation)
+    for x, y, w, h in [(3, 4, 5, 2), (-2, -3, 6, 5), (buffer.x_length - 2, buffer.y_length - 1, 9, 9)]:
+        buffer.clear_dirty()
+        buffer.fill_rectangle(x, y, w, h, 0)
+        x1, y1 = buffer.rotate_coords(max(x, 0), max(y, 0))
+        x2, y2 = buffer.rotate_coords(min(x + w, buffer.x_length) - 1, min(y + h, buffer.y_length) - 1)
+        assert buffer.dirty_rects() == [(min(x1, x2), min(y1, y2), abs(x2 - x1) + 1, abs(y2 - y1) + 1)]
+
+
+def test_pixels_past_the_edge_are_clipped():
+    buffer = DisplayBuffer(16, 4)
+    buffer.draw_pixel(16, 0, 1)
+    buffer.draw_pixel(0, 4, 1)
+    buffer.rotate(90)
+    buffer.draw_pixel(0, 16, 1)
+    assert not buffer._unpacked().any()
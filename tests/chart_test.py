@@ -0,0 +1,74 @@
+import numpy as np
+import pytest
+from raspberrypi_epd.buffer import DisplayBuffer
+from raspberrypi_epd.chart import Sparkline
+
+
+@pytest.mark.parametrize('rotation', [0, 90, 180, 270])
+@pytest.mark.parametrize('packed', [False, True])
+def test_incremental_matches_full_redraw(rotation, packed):
+    samples = np.sin(np.arange(70) / 5) * 10
+    samples[30] = np.nan
+    incremental = DisplayBuffer(64, 48, packed=packed)
+    incremental.rotate(rotation)
+    chart = Sparkline(incremental, 3, 5, 40, 20, -10, 10)
+    chart.draw()
+    for sample in samples[:25]:
+        chart.add(sample)
+    assert chart.changed_rect == incremental._base_area(3 + 24, 5, 3 + 25, 25)
+    chart.extend(samples[25:])
+    assert chart.changed_rect == incremental._base_area(3, 5, 43, 25)
+    redrawn = DisplayBuffer(64, 48, packed=packed)
+    redrawn.rotate(rotation)
+    chart = Sparkline(redrawn, 3, 5, 40, 20, -10, 10)
+    chart.extend(samples)
+    assert np.array_equal(chart.samples(), samples[-40:], equal_nan=True)
+    assert np.array_equal(incremental.serialize(), redrawn.serialize())
+
+
+def test_trace_is_connected():
+    buffer = DisplayBuffer(16, 16)
+    chart = Sparkline(buffer, 0, 0, 4, 11, 0, 10, value=1, background=0)
+    chart.extend([0, 10, 10, 5])
+    columns = buffer._unpacked().reshape(16, 16)[:11, :4]
+    assert list(columns.sum(axis=0)) == [1, 11, 1, 6]
+    assert columns[10, 0] and columns[0, 2] and columns[5, 3]
+
+
+def test_changed_rect_is_in_base_coordinates():
+    buffer = DisplayBuffer(64, 48)
+    buffer.rotate(90)
+    chart = Sparkline(buffer, 3, 5, 40, 20, -10, 10)
+    chart.draw()
+    chart.add(1)
+    # Column 3 of the rotated buffer is row 3 of the display, its rows 5 to 24 are columns 39 to 20
+    assert chart.changed_rect == (64 - 25, 3, 20, 1)
+    buffer.clear_dirty()
+    buffer.fill_rectangle(3, 5, 1, 20, 0)
+    assert buffer.dirty_rects() == [chart.changed_rect]
+
+
+def test_batch_longer_than_the_chart():
+    samples = [0, 10, 0, 10, 5, 6]
+    batched = DisplayBuffer(16, 16)
+    chart = Sparkline(batched, 0, 0, 4, 11, 0, 10, value=1, background=0)
+    chart.add(0)
+    chart.extend(samples)
+    assert list(chart.samples()) == samples[-4:]
+    one_by_one = DisplayBuffer(16, 16)
+    chart = Sparkline(one_by_one, 0, 0, 4, 11, 0, 10, value=1, background=0)
+    chart.add(0)
+    for sample in samples:
+        chart.add(sample)
+    # The first column is joined to the sample before it in the batch (10), not to the last one drawn (0)
+    assert np.array_equal(batched.serialize(), one_by_one.serialize())
+
+
+def test_scroll():
+    buffer = DisplayBuffer(16, 4, packed=True)
+    buffer.clear_screen(0)
+    buffer.draw_points([2, 3], [1, 1], 1)
+    buffer.scroll(0, 0, 8, 4, 2, 1)
+    rows = buffer._unpacked().reshape(4, 16)
+    assert list(rows[1, :8]) == [1, 1, 0, 0, 0, 0, 1, 1]
+    assert rows[:, 8:].sum() == 0
@@ -1,6 +1,189 @@
+import numpy as np
+import raspberrypi_epd.commands as cmd
 from raspberrypi_epd.buffer import DisplayBuffer
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.simulator import SSD1680Simulator
+
+
+def simulated_display():
+    simulator = SSD1680Simulator()
+    display = WeAct213(transport=simulator)
+    display.init()
+    return display, simulator
 
 
 def test_buffer():
     buffer = DisplayBuffer(4, 4)
     assert buffer.WIDTH == 8
+
+
+def test_write_data_is_bulk():
+    display, simulator = simulated_display()
+    frame = np.arange(WeAct213.WIDTH * WeAct213.HEIGHT // 8, dtype=np.uint16).astype(np.uint8)
+    transfers, gpio_writes = simulator.spi_transfers, simulator.gpio_writes
+    display._write_data(frame)
+    assert simulator.spi_transfers - transfers == 1
+    assert simulator.gpio_writes - gpio_writes == 2
+
+
+def test_write_data_is_chunked():
+    display, simulator = simulated_display()
+    data = np.ones(WeAct213.MAX_TRANSFER_SIZE * 2 + 1, dtype=np.uint8)
+    transfers = simulator.spi_transfers
+    display._write_data(data)
+    assert simulator.spi_transfers - transfers == 3
+    transfers = simulator.spi_transfers
+    display._write_command(cmd.WRITE_LUT_REG)
+    display._write_data(WeAct213.LUT_PARTIAL)
+    assert simulator.spi_transfers - transfers == 2
+    assert simulator.lut == WeAct213.LUT_PARTIAL.tobytes()
+
+
+def test_write_buffer_reaches_ram():
+    display, simulator = simulated_display()
+    display.fill(Color.WHITE)
+    display.draw_rectangle(10, 20, 30, 40, Color.BLACK)
+    display.draw_circle(64, 125, 20, Color.RED)
+    display.write_buffer()
+    bw = SSD1680Simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT)
+    red = SSD1680Simulator.panel_bytes(simulator.red_display, WeAct213.WIDTH, WeAct213.HEIGHT)
+    assert np.array_equal(bw, display._canvas.serialize_planes()[0])
+    assert np.array_equal(red, display._canvas.serialize_planes()[1])
+    assert simulator.refreshes == 2
+
+
+def test_simulator_window_and_entry_mode():
+    simulator = SSD1680Simulator(width=32, height=4)
+    simulator.set_cs(0)
+    for command, data in [(cmd.DATA_ENTRY_MODE, [0x00]), (cmd.SET_RAM_X_STARTEND, [0x02, 0x01]),
+                          (cmd.SET_RAM_Y_STARTEND, [0x03, 0x00, 0x02, 0x00]),
+                          (cmd.SET_RAM_X_ADDR_COUNTER, [0x02]), (cmd.SET_RAM_Y_ADDR_COUNTER, [0x03, 0x00]),
+                          (cmd.WRITE_RAM_BW, [1, 2, 3, 4])]:
+        simulator.set_dc(0)
+        simulator.spi_write(command.tobytes())
+        simulator.set_dc(1)
+        simulator.spi_write(bytes(data))
+    # X and Y decrement, X first
+    assert simulator.bw_ram[3, 2] == 1 and simulator.bw_ram[3, 1] == 2
+    assert simulator.bw_ram[2, 2] == 3 and simulator.bw_ram[2, 1] == 4
+    assert (simulator.x_counter, simulator.y_counter) == (2, 3)
+
+
+def test_dirty_rects_are_merged():
+    buffer = DisplayBuffer(128, 250, packed=True)
+    buffer.draw_line(0, 0, 10, 0, 0)
+    buffer.draw_line(10, 0, 10, 10, 0)
+    buffer.draw_pixel(100, 200, 0)
+    assert buffer.dirty_rects() == [(0, 0, 11, 11), (100, 200, 1, 1)]
+    buffer.rotate(90)
+    buffer.draw_rectangle(0, 0, 9, 4, 0)
+    assert buffer.dirty_rects()[-1] == (123, 0, 5, 10)
+    buffer.clear_dirty()
+    assert buffer.dirty_rects() == []
+
+
+def test_dirty_pixels_are_merged_lazily():
+    buffer = DisplayBuffer(128, 250, packed=True)
+    buffer.rotate(90)
+    for x in range(20):
+        buffer.draw_pixel(x, 3, 0)
+    buffer.draw_pixel(200, 100, 0)
+    buffer.draw_pixel(201, 101, 0)
+    assert buffer.dirty_rects() == [(124, 0, 1, 20), (26, 200, 2, 2)]
+    # Inside the areas already merged
+    buffer.draw_pixel(5, 3, 1)
+    buffer.draw_pixel(-1, 3, 0)
+    assert sorted(buffer.dirty_rects()) == [(26, 200, 2, 2), (124, 0, 1, 20)]
+    for y in range(0, 250, 10):
+        buffer.draw_pixel(y, y // 2, 0)
+    assert len(buffer.dirty_rects()) <= DisplayBuffer.MAX_DIRTY_RECTS
+
+
+def test_write_dirty_sends_only_the_dirty_window():
+    display, simulator = simulated_display()
+    display.fill(Color.WHITE)
+    display.draw_rectangle(3, 100, 10, 7, Color.BLACK)
+    display.write_dirty()
+    ram_writes = [data for command, data in simulator.commands if command == cmd.WRITE_RAM_BW]
+    assert len(ram_writes[-1]) == 2 * 8
+    assert simulator.update_control == 0xCC
+    assert np.array_equal(SSD1680Simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT),
+                          display._canvas.serialize())
+    # The RED RAM holds the previous image for the next partial update
+    assert np.array_equal(SSD1680Simulator.panel_bytes(simulator.red_ram, WeAct213.WIDTH, WeAct213.HEIGHT),
+                          display._canvas.serialize())
+    display.draw_pixel(64, 200, Color.BLACK)
+    written = simulator.bytes_written
+    display.write_dirty()
+    assert simulator.bytes_written - written < 100
+    display.write_dirty()
+    assert simulator.refreshes == 3
+
+
+def test_write_buffer_sends_only_changes():
+    display, simulator = simulated_display()
+    display.fill(Color.WHITE)
+    refreshes, written = simulator.refreshes, simulator.bytes_written
+    display.write_buffer()
+    assert (simulator.refreshes, simulator.bytes_written) == (refreshes, written)
+    display.draw_line(20, 10, 40, 12, Color.BLACK)
+    display.draw_pixel(100, 200, Color.RED)
+    commands = len(simulator.commands)
+    display.write_buffer()
+    ram_writes = [(command, data) for command, data in simulator.commands[commands:]
+                  if command in (cmd.WRITE_RAM_BW, cmd.WRITE_RAM_RED)]
+    assert [(command, len(data)) for command, data in ram_writes] == [(cmd.WRITE_RAM_BW, 4 * 3),
+                                                                      (cmd.WRITE_RAM_RED, 1)]
+    assert simulator.refreshes == refreshes + 1
+    for ram, plane in zip((simulator.bw_display, simulator.red_display), display._canvas.serialize_planes()):
+        assert np.array_equal(SSD1680Simulator.panel_bytes(ram, WeAct213.WIDTH, WeAct213.HEIGHT), plane)
+    display.write_buffer(force=True)
+    assert simulator.refreshes == refreshes + 2
+
+
+def test_changed_windows_join_close_rows():
+    display, _ = simulated_display()
+    ram = np.zeros((WeAct213.HEIGHT, WeAct213.WIDTH // 8), dtype=np.uint8)
+    plane = ram.copy()
+    plane[10, 2] = plane[12, 5] = plane[100, 15] = 1
+    assert display._changed_windows(ram, plane) == [(16, 10, 32, 3), (120, 100, 8, 1)]
+    assert display._changed_windows(ram, ram) == []
+    assert display._changed_windows(None, plane) == [(0, 0, WeAct213.WIDTH, WeAct213.HEIGHT)]
+
+
+def test_read_ram_window():
+    display, simulator = simulated_display()
+    display.draw_rectangle(8, 20, 40, 30, Color.BLACK)
+    display.draw_circle(60, 120, 20, Color.RED)
+    display.write_buffer()
+    bw_plane, red_plane = display.snapshot()
+    bw_window = display._read_ram_window(cmd.WRITE_RAM_BW, 8, 16, 64, 40)
+    assert np.array_equal(bw_window, bw_plane.reshape(WeAct213.HEIGHT, -1)[16:56, 1:9])
+    red_window = display._read_ram_window(cmd.WRITE_RAM_RED, 0, 0, WeAct213.WIDTH, WeAct213.HEIGHT)
+    assert np.array_equal(red_window.ravel(), red_plane)
+
+
+def test_probe_spi_speed():
+    simulator = SSD1680Simulator(max_spi_speed=8000000)
+    display = WeAct213(transport=simulator, max_transfer_size=1024)
+    display.init()
+    assert display.probe_spi_speed() == 8000000
+    assert simulator.spi_speed == 8000000
+    # The next write is complete, as the test pattern is in the B&W RAM
+    display.write_buffer()
+    assert np.array_equal(SSD1680Simulator.panel_bytes(simulator.bw_ram, WeAct213.WIDTH, WeAct213.HEIGHT),
+                          display.snapshot()[0])
+    simulator = SSD1680Simulator(spi_speed=250000, max_spi_speed=500000)
+    display = WeAct213(transport=simulator)
+    display.init()
+    assert display.probe_spi_speed() is None
+    assert simulator.spi_speed == 250000
+
+
+def test_max_transfer_size():
+    simulator = SSD1680Simulator()
+    display = WeAct213(transport=simulator, max_transfer_size=1000)
+    display.init()
+    transfers = simulator.spi_transfers
+    display._write_data(np.zeros(WeAct213.WIDTH * WeAct213.HEIGHT // 8, dtype=np.uint8))
+    assert simulator.spi_transfers - transfers == 4
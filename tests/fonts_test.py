@@ -0,0 +1,57 @@
+import os
+import numpy as np
+import pytest
+from bdfparser import Font
+from raspberrypi_epd.buffer import DisplayBuffer
+from raspberrypi_epd.fonts import FontAtlas, CompiledFont, compile_font, load_font
+
+FONTS = os.path.join(os.path.dirname(__file__), "..", "fonts")
+
+
+@pytest.mark.parametrize("font_file", ["helvB14.bdf", "spleen-8x16.bdf", "luBS14.bdf"])
+@pytest.mark.parametrize("text", ["A", "Raspberry", "Código de 12:45", "x一y"])
+def test_render_matches_bdfparser(font_file, text):
+    font = Font(os.path.join(FONTS, font_file))
+    expected = np.array(font.draw(text).todata(2), dtype=bool)
+    assert np.array_equal(FontAtlas(font).render(text), expected)
+
+
+def test_glyph_cache_is_bounded():
+    atlas = FontAtlas(Font(os.path.join(FONTS, "spleen-8x16.bdf")), cache_size=4)
+    atlas.render("abcdef")
+    assert list(atlas._glyphs) == [ord(c) for c in "cdef"]
+    assert atlas.glyph(ord("c")) is atlas.glyph(ord("c"))
+    assert list(atlas._glyphs)[-1] == ord("c")
+
+
+def test_draw_text_uses_the_atlas():
+    font = Font(os.path.join(FONTS, "spleen-8x16.bdf"))
+    assert FontAtlas.of(font) is FontAtlas.of(font)
+    buffer = DisplayBuffer(128, 250)
+    buffer.draw_text("Hi", font, 5, 7, 1)
+    bitmap = FontAtlas.of(font).render("Hi")
+    drawn = buffer._buffer.reshape(250, 128)[7 : 7 + bitmap.shape[0], 5 : 5 + bitmap.shape[1]]
+    assert np.array_equal(drawn.astype(bool), bitmap)
+    assert buffer.dirty_rects() == [(5, 7, bitmap.shape[1], bitmap.shape[0])]
+
+
+@pytest.mark.parametrize("font_file", ["helvB14.bdf", "spleen-8x16.bdf"])
+def test_compiled_font_matches_bdf(tmp_path, font_file):
+    compiled_path = str(tmp_path / "font.epf")
+    compile_font(os.path.join(FONTS, font_file), compiled_path)
+    compiled = CompiledFont(compiled_path)
+    atlas = FontAtlas(Font(os.path.join(FONTS, font_file)))
+    for text in ["Raspberry", "Código de 12:45", "x一y"]:
+        assert np.array_equal(compiled.render(text), atlas.render(text))
+
+
+def test_load_font_is_cached(tmp_path):
+    path = tmp_path / "spleen.bdf"
+    path.write_bytes(open(os.path.join(FONTS, "spleen-8x16.bdf"), "rb").read())
+    atlas = load_font(str(path))
+    assert load_font(str(path)) is atlas
+    compile_font(str(path), str(tmp_path / "spleen.epf"))
+    assert isinstance(load_font(str(tmp_path / "spleen.epf")), CompiledFont)
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert load_font(str(path)) is not atlas
@@ -0,0 +1,71 @@
+import numpy as np
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.group import PanelGroup
+from raspberrypi_epd.simulator import SSD1680Simulator
+from raspberrypi_epd.transport import RPiTransport, HIGH
+
+
+class PinGPIO:
+    """GPIO module that records the pins cleaned up"""
+
+    def __init__(self):
+        self.cleaned = []
+
+    def cleanup(self, pins=None):
+        self.cleaned.append(pins)
+
+
+class SharedSpi:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def simulated_group(count, time_scale):
+    simulators = [SSD1680Simulator(time_scale=time_scale) for _ in range(count)]
+    group = PanelGroup([WeAct213(transport=simulator) for simulator in simulators])
+    group.init()
+    return group, simulators
+
+
+def test_refreshes_overlap():
+    # Each refresh takes 750 ms scaled to 300 ms, far longer than sending the data of all the panels
+    group, simulators = simulated_group(3, time_scale=0.4)
+    for index, display in enumerate(group):
+        display.fill_rectangle(8 * index, 0, 40, 40, Color.BLACK)
+    refreshes = [simulator.refreshes for simulator in simulators]
+    group.write_buffer(wait=False)
+    # Every panel was started without waiting for the others, so all of them are refreshing at the same time
+    assert all(simulator.read_busy() == HIGH for simulator in simulators)
+    assert all(display.refresh_pending for display in group)
+    assert [simulator.refreshes for simulator in simulators] == [count + 1 for count in refreshes]
+    group.wait_until_idle()
+    assert not any(display.refresh_pending for display in group)
+    for display, simulator in zip(group, simulators):
+        assert np.array_equal(SSD1680Simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT),
+                              display.snapshot()[0])
+
+
+def test_busy_displays_go_last():
+    group, simulators = simulated_group(2, time_scale=0.0)
+    simulators[0].time_scale = 0.05
+    group[0].write_buffer(force=True, wait=False)
+    order = []
+    group._each(lambda display: order.append(group.displays.index(display)))
+    assert order == [1, 0]
+    group.wait_until_idle()
+
+
+def test_close_keeps_shared_resources():
+    gpio, spi = PinGPIO(), SharedSpi()
+    transport = RPiTransport.__new__(RPiTransport)
+    transport._gpio, transport._spi, transport._owns_spi = gpio, spi, False
+    transport._DC, transport._CS, transport._BUSY, transport._RESET = 27, 22, 4, 17
+    group = PanelGroup([WeAct213(transport=transport)], spi=spi)
+    group[0].close()
+    assert gpio.cleaned == [[27, 22, 17, 4]]
+    assert not spi.closed
+    group.close()
+    assert spi.closed
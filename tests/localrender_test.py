@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from raspberrypi_epd.localrender import Render
+
+
+def reference_pixels(width, height, data):
+    """Pixel by pixel decoding, as the render used to do it"""
+    masks = [0x80, 0x40, 0x20, 0x10, 0x08, 0x04, 0x02, 0x01]
+    pixels = np.zeros((height, width), dtype=np.uint8)
+    for y in range(height):
+        past_lines = int((width / 8) * y)
+        for x in range(width):
+            pixels[y, x] = 1 if data[past_lines + int(x / 8)] & masks[x % 8] else 0
+    return pixels
+
+
+@pytest.mark.parametrize("width, height", [(128, 250), (12, 10)])
+def test_render_matches_pixel_decoding(width, height):
+    data = np.random.default_rng(1).integers(0, 256, int(width * height / 8), dtype=np.uint8)
+    render = Render(width, height, data)
+    render.render()
+    image = np.array(render._image.convert("L")) // 255
+    assert np.array_equal(image, reference_pixels(width, height, data))
+
+
+def test_three_color_preview():
+    bw = np.array([0xF0, 0xFF], dtype=np.uint8)
+    red = np.array([0x00, 0x81], dtype=np.uint8)
+    render = Render(8, 2, bw, red)
+    render.render()
+    colors = np.array(render._image.convert("RGB"))
+    assert tuple(colors[0, 0]) == (255, 255, 255) and tuple(colors[0, 7]) == (0, 0, 0)
+    assert tuple(colors[1, 0]) == (255, 0, 0) and tuple(colors[1, 1]) == (255, 255, 255)
+    with pytest.raises(ValueError):
+        Render(8, 2, bw, red[:1])
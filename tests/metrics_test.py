@@ -0,0 +1,42 @@
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.metrics import Metrics, StageStats
+from raspberrypi_epd.simulator import SSD1680Simulator
+
+
+def test_stage_stats():
+    stats = StageStats()
+    for elapsed in (0.05, 2, 3, 7000):
+        stats.add(elapsed)
+    assert stats.count == 4
+    assert stats.minimum == 0.05 and stats.maximum == 7000
+    assert stats.histogram[0] == 1 and stats.histogram[3] == 2 and stats.histogram[-1] == 1
+    assert StageStats().mean == 0.0
+
+
+def test_display_metrics():
+    frames = []
+    metrics = Metrics(on_frame=frames.append)
+    simulator = SSD1680Simulator(time_scale=0.001)
+    display = WeAct213(transport=simulator, metrics=metrics)
+    display.init()
+    metrics.reset()
+    bytes_written, transfers = simulator.bytes_written, simulator.spi_transfers
+    display.draw_rectangle(10, 10, 50, 80, Color.BLACK)
+    display.fill_circle(60, 120, 20, Color.RED)
+    display.write_buffer()
+    # Nested draw calls are measured once
+    assert metrics.stages["draw"].count == 2
+    assert metrics.stages["serialize"].count == 1
+    assert metrics.stages["refresh"].count == 1
+    assert metrics.stages["busy"].count == 1
+    assert metrics.bytes_sent == simulator.bytes_written - bytes_written
+    assert metrics.spi_transactions == simulator.spi_transfers - transfers
+    assert metrics.frames == 1 and frames == [metrics.last_frame]
+    assert frames[0]["bytes_sent"] == metrics.bytes_sent
+    # The frame includes the wait for its own refresh
+    assert frames[0]["busy"] > 0.0 and frames[0]["refresh"] >= frames[0]["busy"]
+    assert "1 frames" in metrics.summary()
+    display.metrics = None
+    display.draw_line(0, 0, 100, 100, Color.BLACK)
+    display.write_buffer()
+    assert metrics.stages["draw"].count == 2 and metrics.frames == 1
@@ -0,0 +1,26 @@
+import subprocess
+import sys
+import pytest
+import raspberrypi_epd
+
+
+def loaded_modules(code: str):
+    probe = f"import sys\n{code}\nprint(' '.join(sys.modules))"
+    return subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True).stdout.split()
+
+
+def test_import_is_lazy():
+    modules = loaded_modules("import raspberrypi_epd\nraspberrypi_epd.DisplayBuffer(128, 250).serialize()")
+    assert "raspberrypi_epd.buffer" in modules
+    for heavy in ("raspberrypi_epd.epd_display", "asyncio", "PIL", "bdfparser", "spidev", "RPi"):
+        assert heavy not in modules
+
+
+def test_lazy_names():
+    assert raspberrypi_epd.WeAct213.__module__ == "raspberrypi_epd.epd_display"
+    assert raspberrypi_epd.Color.RED.value == 2
+    assert "Sparkline" in dir(raspberrypi_epd)
+    assert set(raspberrypi_epd.__all__) >= {"NOP", "Transport", "WeAct213", "Render", "load_font"}
+    assert not set(raspberrypi_epd.__all__) & {"np", "time", "importlib", "commands", "transport"}
+    with pytest.raises(AttributeError):
+        raspberrypi_epd.Missing
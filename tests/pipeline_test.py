@@ -0,0 +1,42 @@
+import numpy as np
+from raspberrypi_epd.epd_display import WeAct213, Color
+from raspberrypi_epd.pipeline import FramePipeline
+from raspberrypi_epd.simulator import SSD1680Simulator
+
+
+def test_frames_are_coalesced():
+    simulator = SSD1680Simulator(time_scale=0.05)
+    display = WeAct213(transport=simulator)
+    display.init()
+    # Every frame differs from the previous ones, so each frame written refreshes the display
+    display.fill(Color.WHITE)
+    refreshes = simulator.refreshes
+    pipeline = FramePipeline(display)
+    for y in range(10):
+        display.draw_line(0, y * 10, 100, y * 10, Color.BLACK)
+        pipeline.submit()
+    assert pipeline.flush(timeout=5)
+    pipeline.close()
+    # The first frame is written while the others replace each other, only the newest one is written next
+    assert pipeline.frames_submitted == 10
+    assert pipeline.frames_written == simulator.refreshes - refreshes
+    assert pipeline.frames_written + pipeline.frames_dropped == 10
+    assert pipeline.frames_written < 10
+    expected = display.snapshot()[0]
+    assert np.array_equal(simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT), expected)
+
+
+def test_drawing_after_submit_does_not_change_the_frame():
+    simulator = SSD1680Simulator(time_scale=0.05)
+    display = WeAct213(transport=simulator)
+    display.init()
+    pipeline = FramePipeline(display)
+    # Only the canvas is touched while the pipeline is open, the worker owns the display
+    display.canvas.clear_screen(Color.WHITE.value)
+    display.fill_rectangle(0, 0, 8, 10, Color.BLACK)
+    pipeline.submit()
+    display.fill_rectangle(64, 100, 8, 10, Color.BLACK)
+    pipeline.close()
+    panel = simulator.panel_bytes(simulator.bw_display, WeAct213.WIDTH, WeAct213.HEIGHT).reshape(WeAct213.HEIGHT, -1)
+    assert np.all(panel[:10, 0] == 0)
+    assert np.all(panel[100:110, 8] == 0xFF)
@@ -0,0 +1,49 @@
+import numpy as np
+import raspberrypi_epd.commands as cmd
+from raspberrypi_epd.epd_display import WeAct213
+from raspberrypi_epd.sequence import CommandSequence
+from raspberrypi_epd.simulator import SSD1680Simulator
+from raspberrypi_epd.transport import LOW, HIGH
+
+
+def test_segments_are_joined():
+    sequence = (
+        CommandSequence()
+        .add(cmd.DATA_ENTRY_MODE, 0x03)
+        .add(cmd.SET_RAM_Y_STARTEND, 0x00, 0x00, np.array([0xF9, 0x00]))
+        .add(cmd.DISPLAY_UPDATE_CONTROL_2, 0xF4)
+        .add(cmd.MASTER_ACTIVATION)
+        .add(cmd.NOP)
+    )
+    assert len(sequence) == 5
+    assert sequence.segments == [(LOW, b"\x11"), (HIGH, b"\x03"), (LOW, b"\x45"), (HIGH, b"\x00\x00\xf9\x00"),
+                                 (LOW, b"\x22"), (HIGH, b"\xf4"), (LOW, b"\x20\x7f")]
+    combined = CommandSequence().add(cmd.SW_RESET) + sequence
+    assert combined.segments[0] == (LOW, b"\x12\x11")
+    assert len(combined) == 6 and len(sequence) == 5
+
+
+def test_run():
+    simulator = SSD1680Simulator()
+    data = np.arange(300, dtype=np.uint8)
+    sequence = WeAct213.FULL_WINDOW_SEQUENCE + CommandSequence().add(cmd.WRITE_RAM_BW, data)
+    sequence.run(simulator, max_transfer_size=128)
+    # CS once, then DC for each command/data run, and the transfers of the data are split
+    assert simulator.gpio_writes == 2 + 12
+    assert simulator.spi_transfers == 11 + 3
+    assert simulator.cs == HIGH and simulator.dc == HIGH
+    assert [command for command, _ in simulator.commands] == [0x11, 0x44, 0x45, 0x4E, 0x4F, 0x24]
+    assert np.array_equal(simulator.bw_ram[:, : WeAct213.WIDTH // 8].ravel()[:300], data)
+
+
+def test_refresh_area_transitions():
+    simulator = SSD1680Simulator()
+    display = WeAct213(transport=simulator)
+    display.init()
+    display.init_partial()
+    gpio_writes, transfers = simulator.gpio_writes, simulator.spi_transfers
+    display.refresh_area(8, 16, 32, 40)
+    # Window and update commands go in a single sequence
+    assert simulator.gpio_writes - gpio_writes == 2 + 14
+    assert simulator.spi_transfers - transfers == 13
+    assert (simulator.x_window, simulator.y_window) == ((1, 4), (16, 55))
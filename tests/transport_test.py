@@ -0,0 +1,68 @@
+import time
+import pytest
+from raspberrypi_epd.epd_display import WeAct213
+from raspberrypi_epd.simulator import SSD1680Simulator
+from raspberrypi_epd.transport import RPiTransport
+
+
+class EdgeGPIO:
+    """GPIO module whose BUSY line falls after a number of edge waits"""
+    FALLING = 2
+
+    def __init__(self, busy_waits, edge_detection=True):
+        self.busy_waits = busy_waits
+        self.edge_detection = edge_detection
+        self.edge_waits = 0
+        self.reads = 0
+
+    def input(self, pin):
+        self.reads += 1
+        return 1 if self.busy_waits > 0 else 0
+
+    def wait_for_edge(self, pin, edge, timeout=None):
+        if not self.edge_detection:
+            raise RuntimeError("Conflicting edge detection already enabled for this GPIO channel")
+        self.edge_waits += 1
+        self.busy_waits -= 1
+        return pin if self.busy_waits == 0 else None
+
+
+def rpi_transport(gpio):
+    transport = RPiTransport.__new__(RPiTransport)
+    transport._gpio = gpio
+    transport._BUSY = 4
+    return transport
+
+
+def test_rpi_transport_waits_for_the_edge():
+    gpio = EdgeGPIO(busy_waits=3)
+    assert rpi_transport(gpio).wait_while_busy(1.0)
+    assert gpio.edge_waits == 3
+
+
+def test_rpi_transport_falls_back_to_polling(monkeypatch):
+    monkeypatch.setattr(RPiTransport, "POLL_INTERVAL", 0)
+    gpio = EdgeGPIO(busy_waits=1, edge_detection=False)
+    transport = rpi_transport(gpio)
+    assert not transport.wait_while_busy(0.01)
+    gpio.busy_waits = 0
+    assert transport.wait_while_busy(0.01)
+
+
+def test_busy_time_is_measured():
+    simulator = SSD1680Simulator(time_scale=0.005)
+    display = WeAct213(transport=simulator)
+    display.init()
+    display.write_buffer()
+    # Partial refresh of 750 ms scaled to 3.75 ms
+    assert display.last_busy_time >= 3.7
+    assert display.total_busy_time >= display.last_busy_time
+
+
+def test_busy_timeout():
+    simulator = SSD1680Simulator(time_scale=1)
+    display = WeAct213(transport=simulator, busy_timeout=20)
+    start = time.monotonic()
+    with pytest.raises(TimeoutError):
+        display.init()
+    assert time.monotonic() - start < 1